@@ -23,22 +23,24 @@ log("Faronix control started")
 
 from builder.nginx.faronix_nginx import nginx_generator
 from builder.fstab.faronix_fstab import fstab_render, apply_fstab_from_manifest
+from faronix_templating import bundle_path, compile_bundle  # type: ignore
 
 # Load required paths
 MANIFEST =  Path(os.getenv('MANIFEST'))
 SYSCONF = Path(os.getenv('SYSCONF'))
 BUILDER = Path(os.getenv('BUILDER'))
+BIN = Path(__file__).resolve().parent
 
 
-def run_script(path: Path, args=[]):
+def run_script(path: Path, args=[]) -> int:
     if not path.exists():
         log(f"Script not found: {path}", "ERROR")
         sys.exit(1)
-    subprocess.run([sys.executable, str(path)] + args)
+    return subprocess.run([sys.executable, str(path)] + args).returncode
 
 def handle_fstab(args):
     if args.action == "apply":
-        run_script(BUILDER / "fstab"/ "faronix_fstab.py")
+        return run_script(BUILDER / "fstab"/ "faronix_fstab.py")
     elif args.action == "status":
         subprocess.run(["systemctl", "status", "-t", "mount"])
     elif args.action == "render":
@@ -51,7 +53,7 @@ def handle_fstab(args):
 
 def handle_nginx(args):
     if args.action == "render":
-        run_script(BUILDER / "nginx" / "faronix_nginx.py")
+        return run_script(BUILDER / "nginx" / "faronix_nginx.py")
     elif args.action == "status":
         subprocess.run([ "sudo", "nginx", "-t"])
     elif args.action == "reload":
@@ -65,12 +67,87 @@ def handle_nginx(args):
 
 def handle_systemd(args):
     if args.action == "generate":
-        run_script(BUILDER / "systemd" / "faronix_systemd.py")
+        return run_script(BUILDER / "systemd" / "faronix_systemd.py")
     elif args.action == "status":
         subprocess.run(["systemctl", "list-units", "--type=service", "--all"])
     else:
         log(f"Unknown systemd action: {args.action}", "ERROR")
 
+def handle_generate(args):
+    extra = [args.spec] if args.spec else []
+    if args.all:
+        extra.append("--all")
+    if args.jobs:
+        extra += ["--jobs", str(args.jobs)]
+    if args.plan:
+        extra.append("--plan")
+    if args.force:
+        extra.append("--force")
+    if args.watch:
+        extra.append("--watch")
+    if args.profile:
+        extra.append("--profile")
+    if args.flatten:
+        extra.append("--flatten")
+    # forwarded to a running serve-builder; runs in-process when there is none
+    return run_script(BIN / "faronix_server.py", ["generate"] + extra)
+
+def handle_validate(args):
+    extra = list(args.specs)
+    if args.jobs:
+        extra += ["--jobs", str(args.jobs)]
+    if args.json:
+        extra.append("--json")
+    if args.strict:
+        extra.append("--strict")
+    return run_script(BIN / "faronix_server.py", ["validate"] + extra)
+
+def handle_serve_builder(args):
+    return run_script(BIN / "faronix_server.py", ["serve"])
+
+def handle_builder(args):
+    return run_script(BIN / "faronix_server.py", [args.action] + args.args)
+
+def handle_templates(args):
+    if args.action == "compile":
+        # app generator + ctl_django bundles (needs yofaron_config)
+        code = run_script(BIN / "faronix_generator.py", ["--compile-templates"])
+        if code:
+            return code
+        for name in ("nginx", "systemd", "fstab"):
+            tpl_dir = BUILDER / name / "tpl"
+            if not tpl_dir.is_dir():
+                continue
+            count, skipped = compile_bundle([tpl_dir], bundle_path(tpl_dir, name))
+            log(f"Compiled {count} {name} templates ({len(skipped)} skipped)")
+    else:
+        log(f"Unknown templates action: {args.action}", "ERROR")
+
+def handle_gc(args):
+    extra = ["gc"]
+    if args.keep is not None:
+        extra += ["--keep", str(args.keep)]
+    if args.dry_run:
+        extra.append("--dry-run")
+    return run_script(BIN / "faronix_artifacts.py", extra)
+
+def handle_artifacts(args):
+    if args.action == "list":
+        return run_script(BIN / "faronix_artifacts.py", ["list"] + ([args.name] if args.name else []))
+    elif args.action == "rollback":
+        if not args.name:
+            log("rollback needs an artifact name", "ERROR")
+            return 1
+        return run_script(BIN / "faronix_artifacts.py", ["rollback", args.name] + (["--to", args.to] if args.to else []))
+    else:
+        log(f"Unknown artifacts action: {args.action}", "ERROR")
+
+def handle_bundle(args):
+    extra = ["--since", args.since]
+    if args.output:
+        extra += ["--output", args.output]
+    return run_script(BIN / "faronix_bundle.py", extra)
+
 def handle_manifest(args):
     if args.action == "list":
         for f in sorted(MANIFEST.glob("*.manifestrc")):
@@ -104,6 +181,58 @@ def main():
     p_systemd.add_argument("action", choices=["generate", "status"])
     p_systemd.set_defaults(func=handle_systemd)
 
+    # generate
+    p_generate = subparsers.add_parser("generate", help="Yofaron spec generator")
+    p_generate.add_argument("spec", nargs="?", help="Spec file (default: latest)")
+    p_generate.add_argument("--all", action="store_true", help="Every active spec, in parallel")
+    p_generate.add_argument("--jobs", type=int, help="Worker processes for --all")
+    p_generate.add_argument("--plan", action="store_true", help="List stale outputs only")
+    p_generate.add_argument("--force", action="store_true", help="Ignore the build cache")
+    p_generate.add_argument("--watch", action="store_true", help="Rebuild on spec/template changes")
+    p_generate.add_argument("--profile", action="store_true", help="Per-template render timings + JSONL trace")
+    p_generate.add_argument("--flatten", action="store_true", help="Inline static component includes into partials")
+    p_generate.set_defaults(func=handle_generate)
+
+    # validate
+    p_validate = subparsers.add_parser("validate", help="Validate specs (default: all of JSON_DIR)")
+    p_validate.add_argument("specs", nargs="*", help="Spec files, relative to JSON_DIR")
+    p_validate.add_argument("--jobs", type=int, help="Worker processes")
+    p_validate.add_argument("--json", action="store_true", help="Machine-readable output")
+    p_validate.add_argument("--strict", action="store_true", help="Check component configs against the catalog")
+    p_validate.set_defaults(func=handle_validate)
+
+    # warm generator server + client
+    p_serve = subparsers.add_parser("serve-builder", help="Keep a warm generator on a Unix socket")
+    p_serve.set_defaults(func=handle_serve_builder)
+
+    p_builder = subparsers.add_parser("builder", help="Send a command to the warm generator")
+    p_builder.add_argument("action", choices=["generate", "validate", "index", "sync", "ping", "stop"])
+    p_builder.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the command")
+    p_builder.set_defaults(func=handle_builder)
+
+    # templates
+    p_templates = subparsers.add_parser("templates", help="Jinja template bundles")
+    p_templates.add_argument("action", choices=["compile"])
+    p_templates.set_defaults(func=handle_templates)
+
+    # artifact store
+    p_gc = subparsers.add_parser("gc", help="Prune unreferenced generated artifacts")
+    p_gc.add_argument("--keep", type=int, help="Versions kept per artifact")
+    p_gc.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    p_gc.set_defaults(func=handle_gc)
+
+    p_artifacts = subparsers.add_parser("artifacts", help="Generated artifact versions")
+    p_artifacts.add_argument("action", choices=["list", "rollback"])
+    p_artifacts.add_argument("name", nargs="?", help="Artifact, e.g. home_nav.html")
+    p_artifacts.add_argument("--to", help="sha256 prefix to roll back to (default: previous)")
+    p_artifacts.set_defaults(func=handle_artifacts)
+
+    # incremental deploy
+    p_bundle = subparsers.add_parser("bundle", help="Delta tarball of outputs changed since a build manifest")
+    p_bundle.add_argument("--since", required=True, help="Build manifest of the deployed tree")
+    p_bundle.add_argument("-o", "--output", help="Tarball path (default: faronix-delta-<time>.tar.gz)")
+    p_bundle.set_defaults(func=handle_bundle)
+
     # manifest
     p_manifest = subparsers.add_parser("manifest", help="Manifest utilities")
     p_manifest.add_argument("action", choices=["list", "show"])
@@ -114,7 +243,8 @@ def main():
     args = parser.parse_args()
 
     if hasattr(args, "func"):
-        args.func(args)
+        # a failed generate/validate/... run fails the CLI too (CI, deploy hooks)
+        sys.exit(args.func(args) or 0)
     else:
         parser.print_help()
 
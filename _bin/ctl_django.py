@@ -1,81 +1,180 @@
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from django.core.management.base import BaseCommand
-import json
-from jinja2 import Environment, FileSystemLoader
+from django.core.management.base import BaseCommand, CommandError
+
+# builder/ holds the generator modules (and yofaron_config)
+sys.path.insert(0, str(Path("builder").resolve()))
+from faronix_templating import app_env  # noqa: E402
+
+PARALLEL_MIN = 8  # batches smaller than this render in-process
+
+_env = None  # per process: the parent's, or inherited by forked workers
+
+
+def _get_env():
+    global _env
+    if _env is None:
+        # Shared py/ + html/ environment; "tpl_py/..." and "tpl_html/..." names still resolve
+        from yofaron_config import TPL_HTML_DIR, TPL_PY_DIR
+
+        _env = app_env(TPL_PY_DIR, TPL_HTML_DIR)
+    return _env
+
+
+def snippet_paths(pattern: str) -> list[Path]:
+    """--json argument → snippet files: one file, every *.json/*.jsonc in a directory, or a glob."""
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.suffix.lower() in (".json", ".jsonc") and p.is_file())
+    if glob.has_magic(pattern):
+        return sorted(Path(p) for p in glob.glob(pattern, recursive=True) if Path(p).is_file())
+    return [path]
+
+
+def render_snippet(json_path: str, mode: str, output_root: str) -> dict:
+    """
+    Render one JSON snippet. Returns {"path", "outputs": [...], "ms", "error"};
+    errors are reported, not raised, so one bad snippet does not stop a batch.
+    """
+    from faronix_validate import read_spec
+    from generate_component_index import find_component
+
+    started = time.perf_counter()
+    result = {"path": json_path, "outputs": [], "ms": 0.0, "error": None}
+    try:
+        ctx = read_spec(Path(json_path))
+        component = ctx.get("component") if isinstance(ctx, dict) else None
+        if not component:
+            raise ValueError("Missing 'component' field in JSON")
+        # resolved against the index loaded once per process (inherited by workers)
+        template_file = find_component(component)
+        if not template_file:
+            raise ValueError(f"Component '{component}' not found in component_index.json")
+
+        env = _get_env()
+
+        def render(name, outdir, suffix):
+            output = Path(output_root) / outdir / f"{component}.{suffix}"
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(env.get_template(name).render(**ctx))
+            result["outputs"].append(str(output))
+
+        if mode in ("html", "all"):
+            render(template_file, "components", "html")
+        if mode in ("view", "all") and "view_template" in ctx:
+            render(ctx["view_template"], "views", "py")
+        if mode in ("form", "all") and "form_template" in ctx:
+            render(ctx["form_template"], "forms", "py")
+        if mode in ("model", "all") and "model_template" in ctx:
+            render(ctx["model_template"], "models", "py")
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def _display(path: str) -> str:
+    try:
+        return str(Path(path).resolve().relative_to(Path.cwd()))
+    except ValueError:
+        return path
 
 
 class Command(BaseCommand):
     help = "Scaffold components, views, forms, and models using Yofaron JSON + Jinja2 system."
 
     def add_arguments(self, parser):
-        parser.add_argument("--json", type=str, help="Path to JSON snippet file")
+        parser.add_argument(
+            "--json",
+            type=str,
+            help="JSON snippet file, a directory of snippets, or a glob (quote it)",
+        )
         parser.add_argument(
             "--mode",
             type=str,
-            choices=["html", "view", "form", "model", "all"],
+            choices=["html", "view", "form", "model", "all", "spec"],
             default="html",
         )
         parser.add_argument("--output", type=str, default="builder/templates/output")
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=None,
+            help="Worker processes for batches (default: one per core; 1 = in-process)",
+        )
 
     def handle(self, *args, **opts):
-        json_path = Path(opts["json"])
         mode = opts["mode"]
-        output_root = Path(opts["output"])
-
-        if not json_path.exists():
-            self.stderr.write(f"❌ JSON not found: {json_path}")
+        paths = snippet_paths(opts["json"] or "")
+        missing = [p for p in paths if not p.exists()]
+        if not paths or missing:
+            self.stderr.write(f"❌ JSON not found: {missing[0] if missing else opts['json']}")
             return
 
-        with open(json_path) as f:
-            ctx = json.load(f)
+        if mode == "spec":
+            # full index → validate → render → register pipeline, in-process
+            # (the generator keeps per-run state in module globals: one spec at a time)
+            from faronix_generator import run_pipeline
 
-        # Load the component index
-        index_path = Path("builder/tpl/component_index.json")
-        if not index_path.exists():
-            self.stderr.write("❌ Missing builder/tpl/component_index.json")
+            failed = [p for p in paths if run_pipeline(p.resolve()) != 0]
+            for p in failed:
+                self.stderr.write(f"❌ Pipeline failed for {p}")
+            if failed and len(paths) > 1:
+                raise CommandError(f"{len(failed)} of {len(paths)} specs failed")
             return
 
-        with open(index_path) as f:
-            component_map = json.load(f)
-
-        # Resolve component template
-        component = ctx.get("component")
-        if not component:
-            self.stderr.write("❌ Missing 'component' field in JSON")
-            return
-
-        template_file = None
-        for folder, files in component_map.items():
-            if component in [f.replace(".tpl", "") for f in files]:
-                template_file = f"{folder}/{component}.tpl.html"
-                break
-
-        if not template_file:
-            self.stderr.write(
-                f"❌ Component '{component}' not found in component_index.json"
-            )
+        if len(paths) == 1:
+            result = render_snippet(str(paths[0]), mode, opts["output"])
+            if result["error"]:
+                self.stderr.write(f"❌ {result['error']}")
+            for output in result["outputs"]:
+                self.stdout.write(f"✅ {_display(output)}")
             return
 
-        # Setup Jinja environment
-        env = Environment(
-            loader=FileSystemLoader("builder/tpl"), trim_blocks=True, lstrip_blocks=True
+        self._batch(paths, mode, opts["output"], opts["jobs"])
+
+    def _batch(self, paths: list[Path], mode: str, output_root: str, jobs: int | None) -> None:
+        from generate_component_index import load_component_index
+
+        started = time.perf_counter()
+        load_component_index()  # once, before the pool forks; workers inherit it
+        _get_env()
+        jobs = jobs or os.cpu_count() or 1
+        args = [(str(p), mode, output_root) for p in paths]
+        if jobs == 1 or len(paths) < PARALLEL_MIN:
+            jobs = 1
+            results = [render_snippet(*a) for a in args]
+        else:
+            jobs = min(jobs, len(paths))
+            chunksize = max(1, len(args) // (jobs * 4))
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(render_snippet, *zip(*args), chunksize=chunksize))
+
+        owners: dict[str, list[str]] = {}
+        for r in results:
+            name = Path(r["path"]).name
+            if r["error"]:
+                self.stderr.write(f"❌ {name} ({r['ms']:.1f} ms): {r['error']}")
+                continue
+            self.stdout.write(f"✅ {name} ({r['ms']:.1f} ms): {', '.join(map(_display, r['outputs'])) or 'nothing to render'}")
+            for output in r["outputs"]:
+                owners.setdefault(output, []).append(name)
+        for output, names in sorted(owners.items()):
+            if len(names) > 1:
+                # outputs are named after the component: snippets for the same one collide
+                self.stderr.write(f"⚠️  {_display(output)} written by {len(names)} snippets: {', '.join(names)}")
+
+        failed = [r for r in results if r["error"]]
+        slowest = max(results, key=lambda r: r["ms"])
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(
+            f"📦 {len(results) - len(failed)} of {len(results)} snippets rendered "
+            f"({sum(len(r['outputs']) for r in results)} outputs) on {jobs} worker(s) "
+            f"in {elapsed:.0f} ms; slowest {Path(slowest['path']).name} {slowest['ms']:.1f} ms"
         )
-
-        def render(name, ctx_obj, outdir, suffix):
-            tpl = env.get_template(name)
-            output = output_root / outdir / f"{component}.{suffix}"
-            output.parent.mkdir(parents=True, exist_ok=True)
-            output.write_text(tpl.render(**ctx_obj))
-            self.stdout.write(f"✅ {output.relative_to(Path.cwd())}")
-
-        if mode in ("html", "all"):
-            render(template_file, ctx, "components", "html")
-
-        if mode in ("view", "all") and "view_template" in ctx:
-            render(ctx["view_template"], ctx, "views", "py")
-
-        if mode in ("form", "all") and "form_template" in ctx:
-            render(ctx["form_template"], ctx, "forms", "py")
-
-        if mode in ("model", "all") and "model_template" in ctx:
-            render(ctx["model_template"], ctx, "models", "py")
+        if failed:
+            raise CommandError(f"{len(failed)} of {len(results)} snippets failed")
@@ -0,0 +1,235 @@
+# builder/faronix_artifacts.py
+"""
+Content-addressed store for generated partials.
+
+Rendered partials (tab navs, tab forms) are stored once per distinct content
+under builder/_artifacts/objects/<aa>/<sha256>.html. The stable names Django
+loads (templates/partials/<view>_nav.html, <tab>_form.html) are hard links
+to the current object, switched atomically by the generator's OutputWriter,
+so identical renders share bytes and no timestamped copies pile up.
+
+builder/_artifacts/refs.json keeps, per stable name, the last N versions
+(newest first); those objects stay on disk for rollback.
+
+    python faronix_artifacts.py list [name]
+    python faronix_artifacts.py rollback <name> [--to <sha256-prefix>]
+    python faronix_artifacts.py gc [--keep N] [--dry-run]
+
+gc trims histories to N versions, deletes objects no history references,
+and removes the timestamped *_<YYYY-mm-dd_HH-MM-SS>.html partials older
+generator versions left in templates/partials.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+ARTIFACT_KEEP = int(os.getenv("FARONIX_ARTIFACT_KEEP", "5"))
+REFS_SCHEMA = 1
+OBJECT_MODE = 0o444  # shared by every hard link: nothing may write through one
+LEGACY_RE = re.compile(r"_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.html$")
+
+
+def sha256_text(s: str) -> str:
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    """
+    refs.json schema:
+      {"schema": 1,
+       "refs": {"/abs/templates/partials/x_nav.html":
+                  [{"sha256": "...", "ts": 1700000000}, ...]}}   # newest first
+    """
+
+    def __init__(self, root: Path, *, keep: int = ARTIFACT_KEEP, suffix: str = ".html"):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.refs_path = self.root / "refs.json"
+        self.keep = keep
+        self.suffix = suffix
+        self.refs: dict[str, list[dict]] = self._load()
+
+    # ---------- persistence
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.refs_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("schema") != REFS_SCHEMA:
+            return {}
+        return data.get("refs", {})
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.refs_path.with_name(self.refs_path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"schema": REFS_SCHEMA, "refs": self.refs}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.refs_path)
+
+    # ---------- objects
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}{self.suffix}"
+
+    def put(self, content: str) -> tuple[str, Path]:
+        """
+        Store `content` (once) and return (sha256, object path). Objects are
+        read-only: the stable names are hard links to them, so an in-place
+        write to templates/partials/x.html would otherwise change every
+        version that shares the object. Rewrite outputs with atomic_write().
+        """
+        digest = sha256_text(content)
+        obj = self.object_path(digest)
+        try:
+            mode = obj.stat().st_mode
+        except FileNotFoundError:
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp = obj.with_name(f".{obj.name}.{os.getpid()}.tmp")
+            tmp.write_text(content, encoding="utf-8")
+            tmp.chmod(OBJECT_MODE)
+            os.replace(tmp, obj)  # concurrent writers produce identical bytes
+        else:
+            if mode & 0o222:
+                obj.chmod(OBJECT_MODE)  # stored before objects were read-only
+        return digest, obj
+
+    # ---------- history
+    def record(self, name: str, digest: str) -> None:
+        """Make `digest` the current version of stable path `name`."""
+        key = str(Path(name).resolve())
+        history = [v for v in self.refs.get(key, []) if v["sha256"] != digest]
+        history.insert(0, {"sha256": digest, "ts": int(time.time())})
+        self.refs[key] = history[: self.keep]
+
+    def resolve(self, name: str) -> str | None:
+        """Stable path key for a full path or a bare file name (e.g. 'home_nav.html')."""
+        key = str(Path(name).resolve())
+        if key in self.refs:
+            return key
+        matches = [k for k in self.refs if Path(k).name == name]
+        return matches[0] if len(matches) == 1 else None
+
+    def rollback(self, name: str, to: str | None = None) -> str:
+        """
+        Point stable `name` at an older version (the previous one, or the one
+        whose sha256 starts with `to`). Returns the sha256 now linked.
+        """
+        key = self.resolve(name)
+        if key is None:
+            raise KeyError(f"no artifact history for {name}")
+        history = self.refs[key]
+        if to:
+            target = next((v for v in history if v["sha256"].startswith(to)), None)
+            if target is None:
+                raise KeyError(f"{to} is not among the kept versions of {name}")
+        elif len(history) > 1:
+            target = history[1]
+        else:
+            raise KeyError(f"{name} has no earlier version")
+        obj = self.object_path(target["sha256"])
+        if not obj.exists():
+            raise FileNotFoundError(f"object {target['sha256'][:12]} was garbage-collected")
+        link_into_place(obj, Path(key))
+        history.remove(target)
+        history.insert(0, target)
+        self.save()
+        return target["sha256"]
+
+    # ---------- gc
+    def gc(self, *, keep: int | None = None, legacy_dirs=(), dry_run: bool = False) -> dict:
+        keep = self.keep if keep is None else keep
+        for key in list(self.refs):
+            self.refs[key] = self.refs[key][:keep]
+        live = {v["sha256"] for versions in self.refs.values() for v in versions}
+        doomed = []
+        if self.objects.is_dir():
+            for obj in self.objects.glob("*/*"):
+                if obj.name.startswith("."):
+                    doomed.append(obj)  # temp left by an interrupted put()
+                elif obj.name[: -len(self.suffix)] not in live:
+                    doomed.append(obj)
+        for d in legacy_dirs:
+            if Path(d).is_dir():
+                doomed.extend(p for p in Path(d).iterdir() if LEGACY_RE.search(p.name))
+        freed = 0
+        for path in doomed:
+            try:
+                freed += path.stat().st_size
+                if not dry_run:
+                    path.unlink()
+            except OSError:
+                continue
+        if not dry_run:
+            self.save()
+        return {"removed": len(doomed), "bytes": freed, "paths": [str(p) for p in doomed]}
+
+
+def link_into_place(source: Path, target: Path) -> None:
+    """Atomically make `target` a hard link to `source` (a copy across filesystems)."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    stage_link(source, tmp)
+    os.replace(tmp, target)
+
+
+def stage_link(source: Path, tmp: Path) -> None:
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)  # EXDEV, or no hard links on this filesystem
+
+
+def _default_store() -> tuple[ArtifactStore, Path]:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from yofaron_config import REGISTRY, TEMPLATE_PARTIALS_PATH
+
+    return ArtifactStore(REGISTRY.parent / "_artifacts"), TEMPLATE_PARTIALS_PATH
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Generated artifact store")
+    sub = ap.add_subparsers(dest="action", required=True)
+    p_list = sub.add_parser("list", help="Show kept versions per stable name")
+    p_list.add_argument("name", nargs="?")
+    p_rb = sub.add_parser("rollback", help="Relink a stable name to an earlier version")
+    p_rb.add_argument("name")
+    p_rb.add_argument("--to", help="sha256 (prefix) of the version to restore")
+    p_gc = sub.add_parser("gc", help="Prune unreferenced artifacts and legacy timestamped partials")
+    p_gc.add_argument("--keep", type=int, default=None, help=f"Versions kept per name (default {ARTIFACT_KEEP})")
+    p_gc.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args(argv)
+
+    store, partials = _default_store()
+    if args.action == "list":
+        for key, versions in sorted(store.refs.items()):
+            if args.name and store.resolve(args.name) != key:
+                continue
+            print(f"📦 {key}")
+            for i, v in enumerate(versions):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(v["ts"]))
+                print(f"   {'*' if i == 0 else ' '} {v['sha256'][:12]}  {stamp}")
+        return 0
+    if args.action == "rollback":
+        try:
+            digest = store.rollback(args.name, args.to)
+        except (KeyError, FileNotFoundError) as e:
+            print(f"❌ {e.args[0]}")
+            return 1
+        print(f"⏪ {args.name} → {digest[:12]}")
+        return 0
+    result = store.gc(keep=args.keep, legacy_dirs=[partials], dry_run=args.dry_run)
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"🧹 {verb} {result['removed']} file(s), {result['bytes'] / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+# builder/faronix_buildcache.py
+"""
+Persistent build cache for the generator.
+
+Every output written by render_to_file() gets a fingerprint built from its
+inputs: the spec content hash, the render context, the hashes of the
+template and its {% include %}/{% extends %} closure, the uppercase
+env.globals coming from yofaron_config, and the generator version.
+Outputs whose fingerprint matches the previous run are skipped without
+rendering or reading the old file.
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from jinja2 import TemplateNotFound
+
+from faronix_output import atomic_write
+
+CACHE_SCHEMA = 1
+
+# {% include "x" %}, {% extends 'x' %}, {% import "x" as y %}, {% from "x" import y %}
+# Regex instead of env.parse(): tpl_html also holds Django-syntax components
+# ({% include ... with a=b %}) that Jinja cannot parse.
+REF_RE = re.compile(r"{%-?\s*(?:include|extends|import|from)\s+([^\s%]+)")
+LITERAL_RE = re.compile(r"""^(["'])(.+)\1$""")
+
+
+def sha256_text(s: str) -> str:
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+def sha256_file(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _stable_default(o):
+    # Paths stringify; dummy forms and other objects hash by type only so the
+    # digest never depends on memory addresses.
+    if isinstance(o, Path):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return sorted(o, key=str)
+    return f"<{type(o).__name__}>"
+
+
+def digest(obj) -> str:
+    return sha256_text(json.dumps(obj, sort_keys=True, default=_stable_default))
+
+
+class BuildCache:
+    """
+    Cache file schema:
+      {
+        "schema": 1,
+        "outputs": {
+          "/abs/path/out.py": {
+            "steps": [
+              {"fingerprint": "...", "template": "x.tpl.py",
+               "spec_path": "/abs/spec.json", "spec": "...",
+               "context": "...", "templates": {"x.tpl.py": "..."},
+               "globals": "...", "version": "...",
+               "options": {...},                   # only when set, e.g. flatten
+               "inlined": {"tpl/x.tpl.html": "..."}}  # not in the fingerprint
+            ]
+          }
+        }
+      }
+    "steps" holds one entry per render_to_file() call that targeted the path
+    during a run, in call order (some outputs are rendered more than once).
+    "inlined" lists the runtime templates a post-render pass copied into the
+    output (see faronix_flatten); they are only known after rendering, so
+    they are compared by hash on the next run instead of fingerprinted.
+    """
+
+    def __init__(self, path: Path, env, version: str, *, plan=False, force=False, closure=None):
+        self.path = Path(path)
+        self.env = env
+        # name -> ({name: sha256 | None}, dynamic), e.g. from the component
+        # catalog; None reads the sources through env.loader instead
+        self.closure = closure
+        self.version = version
+        self.plan = plan
+        self.force = force
+        self.spec_hash = None
+        self.spec_path = None
+        self.globals_hash = digest(
+            {k: v for k, v in env.globals.items() if k.isupper()}
+        )
+        self.outputs = self._load()
+        self._steps: dict[str, list[dict]] = {}
+        self._dirty: set[str] = set()
+        self._closures: dict[str, tuple[dict, bool]] = {}
+        self.stale: list[tuple[Path, list[str]]] = []
+        self.fresh: list[Path] = []
+
+    # ---------- persistence
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("schema") != CACHE_SCHEMA:
+            return {}
+        return data.get("outputs", {})
+
+    def save(self) -> None:
+        if self.plan:
+            return
+        for key, steps in self._steps.items():
+            if steps:
+                self.outputs[key] = {"steps": steps}
+            else:
+                self.outputs.pop(key, None)
+        atomic_write(self.path, json.dumps({"schema": CACHE_SCHEMA, "outputs": self.outputs}, indent=2))
+
+    # ---------- worker hand-off
+    def export(self) -> dict:
+        """Per-run state a pool worker sends back to the parent."""
+        return {"steps": self._steps, "stale": self.stale, "fresh": self.fresh}
+
+    def merge(self, exports: list[dict]) -> list[str]:
+        """
+        Fold worker exports into this cache, in the order given. Outputs that
+        more than one worker rendered are dropped from the cache (their final
+        content depends on scheduling) and returned so the caller can warn.
+        """
+        owners: dict[str, int] = {}
+        for exp in exports:
+            for key, steps in exp["steps"].items():
+                owners[key] = owners.get(key, 0) + 1
+                self._steps[key] = steps
+            self.stale.extend(exp["stale"])
+            self.fresh.extend(exp["fresh"])
+        collisions = sorted(k for k, n in owners.items() if n > 1)
+        for key in collisions:
+            self._steps[key] = []
+        return collisions
+
+    # ---------- inputs
+    def begin_spec(self, spec_path: Path) -> None:
+        self.spec_path = str(Path(spec_path).resolve())
+        self.spec_hash = sha256_file(spec_path)
+
+    def specs_using(self, template_names: set[str], resolve=None) -> set[str]:
+        """
+        Spec paths whose cached outputs were rendered from any of these
+        templates. `resolve` maps the names recorded in the cache (as the
+        templates referenced each other) to the form `template_names` uses.
+        """
+        found = set()
+        for entry in self.outputs.values():
+            for step in entry.get("steps", []):
+                if not step.get("spec_path"):
+                    continue
+                names = step.get("templates", {}).keys()
+                if resolve is not None:
+                    names = {resolve(n) for n in names}
+                if template_names & names:
+                    found.add(step["spec_path"])
+        return found
+
+    def template_closure(self, name: str) -> tuple[dict, bool]:
+        """
+        Return ({template_name: sha256 | None}, has_dynamic_refs) for `name`
+        and everything it includes/extends, resolved through env.loader
+        (or looked up in the catalog passed as `closure`).
+        """
+        if name in self._closures:
+            return self._closures[name]
+        if self.closure is not None:
+            self._closures[name] = self.closure(name)
+            return self._closures[name]
+        hashes: dict[str, str | None] = {}
+        dynamic = False
+        todo = [name]
+        while todo:
+            current = todo.pop()
+            if current in hashes:
+                continue
+            try:
+                source, _, _ = self.env.loader.get_source(self.env, current)
+            except TemplateNotFound:
+                hashes[current] = None
+                continue
+            hashes[current] = sha256_text(source)
+            for ref in REF_RE.findall(source):
+                m = LITERAL_RE.match(ref)
+                if m:
+                    todo.append(m.group(2))
+                else:
+                    dynamic = True
+        self._closures[name] = (hashes, dynamic)
+        return self._closures[name]
+
+    # ---------- per-output decisions
+    def check(
+        self, template_name: str, context: dict, output_path: Path, *, options: dict | None = None
+    ) -> tuple[dict, list[str]]:
+        """
+        Fingerprint one render and compare it against the previous run.
+        Returns (step, reasons); an empty reason list means the output is fresh.
+        """
+        templates, dynamic = self.template_closure(template_name)
+        step = {
+            "template": template_name,
+            "spec_path": self.spec_path,
+            "spec": self.spec_hash,
+            "context": digest(context),
+            "templates": templates,
+            "globals": self.globals_hash,
+            "version": self.version,
+        }
+        if options:
+            step["options"] = options
+        step["fingerprint"] = digest(step)
+
+        key = str(Path(output_path).resolve())
+        index = len(self._steps.setdefault(key, []))
+        self._steps[key].append(step)
+
+        previous = self.outputs.get(key, {}).get("steps", [])
+        old = previous[index] if index < len(previous) else None
+
+        reasons = []
+        if self.force:
+            reasons.append("forced")
+        if old is None:
+            reasons.append("new output")
+        elif old.get("fingerprint") != step["fingerprint"]:
+            reasons.extend(self._diff(old, step))
+        else:
+            reasons.extend(self._inlined_changes(old))
+        if dynamic:
+            reasons.append("dynamic include")
+        if key in self._dirty:
+            # an earlier render this run already rewrote the file
+            reasons.append("rewritten earlier in run")
+        if not reasons and not Path(output_path).exists():
+            reasons.append("output missing")
+
+        if reasons:
+            self._dirty.add(key)
+            self.stale.append((Path(output_path), reasons))
+        else:
+            if old.get("inlined"):
+                step["inlined"] = old["inlined"]  # still in the output we keep
+            self.fresh.append(Path(output_path))
+        return step, reasons
+
+    def record_inlined(self, output_path: Path, hashes: dict) -> None:
+        """Attach the templates inlined into output_path's last render (name -> sha256)."""
+        steps = self._steps.get(str(Path(output_path).resolve()))
+        if steps and hashes:
+            steps[-1]["inlined"] = hashes
+
+    def _inlined_changes(self, old: dict) -> list[str]:
+        return [
+            f"inlined template changed: {name}"
+            for name, h in sorted(old.get("inlined", {}).items())
+            if self.template_closure(name)[0].get(name) != h
+        ]
+
+    @staticmethod
+    def _diff(old: dict, new: dict) -> list[str]:
+        reasons = []
+        if old.get("version") != new["version"]:
+            reasons.append(f"generator version {old.get('version')} → {new['version']}")
+        if old.get("template") != new["template"]:
+            reasons.append(f"template switched to {new['template']}")
+        if old.get("spec") != new["spec"]:
+            reasons.append("spec changed")
+        if old.get("context") != new["context"]:
+            reasons.append("context changed")
+        if old.get("globals") != new["globals"]:
+            reasons.append("env.globals changed")
+        if old.get("options") != new.get("options"):
+            reasons.append(f"options {old.get('options') or {}} → {new.get('options') or {}}")
+        old_tpls = old.get("templates", {})
+        for name, h in sorted(new["templates"].items()):
+            if old_tpls.get(name) != h:
+                reasons.append(f"template changed: {name}")
+        return reasons or ["fingerprint changed"]
+
+    def report(self) -> None:
+        print(f"🧭 Build plan: {len(self.stale)} stale, {len(self.fresh)} fresh")
+        for path, reasons in self.stale:
+            print(f"  - {path}: {', '.join(reasons)}")
@@ -0,0 +1,217 @@
+# builder/faronix_bundle.py
+"""
+Build manifest and incremental deploy bundles.
+
+The generator keeps builder/_build_manifest.json up to date with every file
+it produces:
+
+  {"schema": 1, "root": "/abs/project", "generated_at": "...Z",
+   "outputs": {"core/views/home.py": {"sha256": "...", "size": 123,
+                                      "spec": "home.json" | null}}}
+
+Paths are relative to the project root; "spec" is the spec file that
+produced the output (null for shared outputs such as urls_autogen.py).
+
+`bundle --since <manifest>` compares it with the manifest of what is
+deployed and packs only the difference:
+
+    python faronix_bundle.py --since deployed.json [-o delta.tar.gz]
+
+The tarball holds the changed files under files/, MANIFEST.json (the new
+manifest), DELETED (paths to remove) and apply.sh. On the app server:
+
+    tar xzf delta.tar.gz -C /tmp/delta && /tmp/delta/apply.sh /srv/app
+
+apply.sh verifies every file's sha256, moves each into place atomically,
+removes deleted outputs and leaves MANIFEST.json as
+<target>/.faronix-manifest.json, the --since for the next bundle. A copy of
+the new manifest is also written next to the tarball.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+MANIFEST_SCHEMA = 1
+DEPLOYED_MANIFEST = ".faronix-manifest.json"
+
+APPLY_SH = r"""#!/bin/sh
+# Apply a faronix delta bundle: apply.sh <project dir>
+set -eu
+HERE=$(cd "$(dirname "$0")" && pwd)
+TARGET=${1:?usage: apply.sh <project dir>}
+applied=0
+# a delete-only bundle may come without files/ (older bundles, hand-made tars)
+if [ -d "$HERE/files" ]; then
+    cd "$HERE/files"
+    if [ -s "$HERE/SHA256SUMS" ]; then
+        sha256sum -c --quiet "$HERE/SHA256SUMS"
+    fi
+    find . -type f | while IFS= read -r f; do
+        rel=${f#./}
+        mkdir -p "$TARGET/$(dirname "$rel")"
+        cp -p "$f" "$TARGET/$rel.faronix-new"
+        mv -f "$TARGET/$rel.faronix-new" "$TARGET/$rel"
+    done
+    applied=$(find . -type f | wc -l)
+fi
+if [ -s "$HERE/DELETED" ]; then
+    while IFS= read -r rel; do
+        rm -f "$TARGET/$rel"
+    done < "$HERE/DELETED"
+fi
+cp "$HERE/MANIFEST.json" "$TARGET/.faronix-manifest.json"
+echo "applied $applied file(s), removed $(wc -l < "$HERE/DELETED") to $TARGET"
+"""
+
+
+def _utcnow_iso() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _sha256_file(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def load_manifest(path: Path) -> dict:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"schema": MANIFEST_SCHEMA, "outputs": {}}
+    if not isinstance(data, dict) or data.get("schema") != MANIFEST_SCHEMA:
+        return {"schema": MANIFEST_SCHEMA, "outputs": {}}
+    return data
+
+
+def _relative(path: str, root: Path) -> str:
+    p = Path(path)
+    try:
+        return p.resolve().relative_to(root).as_posix()
+    except ValueError:
+        return str(p)  # outside the project: kept absolute, never bundled
+
+
+def update_build_manifest(manifest_path: Path, root: Path, entries: dict[str, dict]) -> None:
+    """
+    Merge {abs path: {"sha256", "size", "spec"}} into the build manifest and
+    drop outputs that no longer exist. Written atomically.
+    """
+    root = Path(root).resolve()
+    data = load_manifest(manifest_path)
+    outputs = data.get("outputs", {})
+    for path, entry in entries.items():
+        spec = entry.get("spec")
+        outputs[_relative(path, root)] = {
+            "sha256": entry["sha256"],
+            "size": entry["size"],
+            "spec": Path(spec).name if spec else None,
+        }
+    outputs = {k: v for k, v in sorted(outputs.items()) if (root / k).exists()}
+    data = {"schema": MANIFEST_SCHEMA, "root": str(root), "generated_at": _utcnow_iso(), "outputs": outputs}
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, manifest_path)
+
+
+def diff_manifests(old: dict, new: dict) -> tuple[list[str], list[str]]:
+    """(changed or added paths, deleted paths) going from old to new."""
+    old_out, new_out = old.get("outputs", {}), new.get("outputs", {})
+    changed = [p for p, e in new_out.items() if old_out.get(p, {}).get("sha256") != e["sha256"]]
+    deleted = [p for p in old_out if p not in new_out]
+    return sorted(changed), sorted(deleted)
+
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes, mode: int = 0o644) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = mode
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+
+def _add_dir(tar: tarfile.TarFile, name: str) -> None:
+    info = tarfile.TarInfo(name)
+    info.type = tarfile.DIRTYPE
+    info.mode = 0o755
+    info.mtime = int(time.time())
+    tar.addfile(info)
+
+
+def build_bundle(current: dict, since: dict, output: Path) -> dict:
+    """
+    Write the delta tarball from `since` to `current`. Files whose content no
+    longer matches the manifest (edited by hand after generation) are left
+    out and reported. Returns {"files", "deleted", "bytes", "stale"}.
+    """
+    root = Path(current["root"])
+    changed, deleted = diff_manifests(since, current)
+    files, stale, sums = [], [], []
+    for rel in changed:
+        path = root / rel
+        if Path(rel).is_absolute() or _sha256_file(path) != current["outputs"][rel]["sha256"]:
+            stale.append(rel)
+            continue
+        files.append(rel)
+        sums.append(f"{current['outputs'][rel]['sha256']}  {rel}\n")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    with tarfile.open(tmp, "w:gz") as tar:
+        _add_dir(tar, "files")  # present even when the delta only deletes
+        for rel in files:
+            tar.add(root / rel, arcname=f"files/{rel}")
+        _add_bytes(tar, "MANIFEST.json", json.dumps(current, indent=2).encode("utf-8"))
+        _add_bytes(tar, "DELETED", "".join(f"{rel}\n" for rel in deleted).encode("utf-8"))
+        _add_bytes(tar, "SHA256SUMS", "".join(sums).encode("utf-8"))
+        _add_bytes(tar, "apply.sh", APPLY_SH.encode("utf-8"), mode=0o755)
+    os.replace(tmp, output)
+    return {"files": files, "deleted": deleted, "bytes": output.stat().st_size, "stale": stale}
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Package generated outputs changed since a manifest")
+    ap.add_argument("--since", type=Path, required=True, help="Manifest of the deployed build")
+    ap.add_argument("-o", "--output", type=Path, default=None, help="Tarball (default: faronix-delta-<time>.tar.gz)")
+    ap.add_argument("--manifest", type=Path, default=None, help="Current build manifest (default: the generator's)")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from yofaron_config import REGISTRY
+
+    current_path = args.manifest or REGISTRY.parent / "_build_manifest.json"
+    current = load_manifest(current_path)
+    if not current.get("outputs"):
+        print(f"❌ No build manifest at {current_path}; run the generator first")
+        return 1
+    if not args.since.exists():
+        print(f"❌ Manifest not found: {args.since}")
+        return 1
+    since = load_manifest(args.since)
+    output = args.output or Path(f"faronix-delta-{time.strftime('%Y%m%d-%H%M%S')}.tar.gz")
+
+    result = build_bundle(current, since, output)
+    output.with_name(output.name.split(".tar")[0] + ".manifest.json").write_text(
+        json.dumps(current, indent=2), encoding="utf-8"
+    )
+    for rel in result["stale"]:
+        print(f"⚠️  {rel}: changed on disk since generation, not bundled")
+    print(
+        f"📦 {output}: {len(result['files'])} changed, {len(result['deleted'])} deleted "
+        f"of {len(current['outputs'])} outputs ({result['bytes'] / 1024:.1f} KB)"
+    )
+    return 1 if result["stale"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# builder/faronix_flatten.py
+"""
+Include flattening for generated Django partials (generator --flatten).
+
+A partial that pulls runtime components in through {% include %} chains
+makes Django resolve and render every include on every request. flatten()
+inlines the includes it can prove equivalent, so each partial compiles to
+one template:
+
+  {% include "tpl/forms/TextField.tpl.html" with name=n value=v %}
+    → {% with name=n value=v %}<TextField source>{% endwith %}
+
+Only static, context-sharing includes are inlined. Left as they are:
+  - dynamic names ({% include tab.template %}),
+  - "only" includes (Django has no tag that isolates the context),
+  - templates with {% extends %} or {% block %}: an included template's
+    blocks are its own, inlined they would join the partial's block tree,
+  - names the resolver does not know, recursive includes, and anything
+    deeper than FLATTEN_DEPTH.
+{% load %} tags of inlined templates are hoisted to the top of the partial
+(after its {% extends %}, if any). {% verbatim %} and {% comment %} bodies
+are never touched.
+"""
+import re
+from dataclasses import dataclass, field
+
+FLATTEN_DEPTH = 8
+
+INCLUDE_RE = re.compile(
+    r"""{%-?\s*include\s+(?P<q>["'])(?P<name>[^"']+)(?P=q)(?P<rest>(?:[^%]|%(?!}))*?)\s*-?%}"""
+)
+ANY_INCLUDE_RE = re.compile(r"{%-?\s*include\s")
+LOAD_RE = re.compile(r"{%-?\s*load\s+[^%]+?\s*-?%}[ \t]*\n?")
+EXTENDS_RE = re.compile(r"{%-?\s*extends\s[^%]*%}")
+BLOCK_RE = re.compile(r"{%-?\s*(?:block|extends)\s")
+OPAQUE_RE = re.compile(
+    r"{%\s*(verbatim|comment)\b[^%]*%}.*?{%\s*end\1\s*%}", re.DOTALL
+)
+
+
+@dataclass
+class Flattened:
+    text: str
+    inlined: list[str] = field(default_factory=list)  # template names, in first-use order
+    skipped: list[tuple[str, str]] = field(default_factory=list)  # (name or tag, reason)
+
+
+def _parse_rest(rest: str) -> tuple[str | None, bool]:
+    """'with a=b c=d only' → ("a=b c=d", only)."""
+    words = rest.split()
+    only = bool(words) and words[-1] == "only"
+    if only:
+        words = words[:-1]
+    if not words:
+        return None, only
+    if words[0] == "with":
+        return " ".join(words[1:]), only
+    return "", only  # not valid Django; leave it for Django to report
+
+
+def flatten(source: str, load_source, *, max_depth: int = FLATTEN_DEPTH) -> Flattened:
+    """
+    Inline the static includes of `source`. load_source(name) returns the
+    included template's source, or None when it cannot be resolved.
+    """
+    result = Flattened(text=source)
+    loads: list[str] = []
+
+    def expand(text: str, stack: tuple[str, ...]) -> str:
+        out, pos = [], 0
+        for opaque in OPAQUE_RE.finditer(text):
+            out.append(expand_plain(text[pos:opaque.start()], stack))
+            out.append(opaque.group(0))
+            pos = opaque.end()
+        out.append(expand_plain(text[pos:], stack))
+        return "".join(out)
+
+    def expand_plain(text: str, stack: tuple[str, ...]) -> str:
+        def replace(m: re.Match) -> str:
+            name, tag = m.group("name"), m.group(0)
+            args, only = _parse_rest(m.group("rest"))
+            if only:
+                return skip(name, tag, "'only' include")
+            if args == "" or (args is not None and "=" not in args):
+                return skip(name, tag, "unsupported include arguments")
+            if name in stack:
+                return skip(name, tag, "recursive include")
+            if len(stack) >= max_depth:
+                return skip(name, tag, f"deeper than {max_depth} includes")
+            body = load_source(name)
+            if body is None:
+                return skip(name, tag, "not in the component library")
+            if BLOCK_RE.search(OPAQUE_RE.sub("", body)):
+                return skip(name, tag, "uses {% block %}/{% extends %}")
+            for load in LOAD_RE.findall(body):
+                load = load.strip()
+                if load not in loads:
+                    loads.append(load)
+            body = expand(LOAD_RE.sub("", body), stack + (name,))
+            if name not in result.inlined:
+                result.inlined.append(name)
+            return f"{{% with {args} %}}{body}{{% endwith %}}" if args else body
+
+        return INCLUDE_RE.sub(replace, text)
+
+    def skip(name: str, tag: str, reason: str) -> str:
+        result.skipped.append((name, reason))
+        return tag
+
+    text = expand(source, ())
+    visible = OPAQUE_RE.sub("", text)
+    for m in ANY_INCLUDE_RE.finditer(visible):
+        tag = visible[m.start():visible.find("%}", m.start()) + 2]
+        if not INCLUDE_RE.match(tag):
+            result.skipped.append((tag, "dynamic include"))
+    if loads:
+        existing = [l.strip() for l in LOAD_RE.findall(text)]
+        hoisted = "".join(f"{l}\n" for l in loads if l not in existing)
+        ext = EXTENDS_RE.search(text)
+        if hoisted and ext:
+            at = ext.end()
+            text = f"{text[:at]}\n{hoisted}{text[at:].lstrip(chr(10))}"
+        elif hoisted:
+            text = hoisted + text
+    result.text = text
+    return result
@@ -1,8 +1,13 @@
 # yofaron_generate.py
-import ast, json, re, os, sys, glob
+import ast, json, re, os, sys, glob, time
+import argparse
+import hashlib
+import contextlib
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import shutil
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2 import TemplateNotFound
 import subprocess
 from datetime import datetime
 
@@ -29,30 +34,54 @@ from yofaron_config import (
     BASE_DIR,
     TEMPLATE_PARTIALS_PATH,
 )
-
-
-ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-
-sot_file = (JSON_DIR.glob("yofaron_scaffolded_*.json*"),)  # handles .json and .jsonc
-files = sorted(
-    JSON_DIR.glob("yofaron_scaffolded_*.json*"),  # handles .json and .jsonc
-    key=lambda p: p.stat().st_mtime,
-    reverse=True,
+from faronix_artifacts import ArtifactStore
+from faronix_buildcache import BuildCache
+from faronix_bundle import update_build_manifest
+from faronix_flatten import flatten
+from faronix_minify import minify_html
+from faronix_speccatalog import SpecCatalog
+from faronix_jsonc import read_jsonc
+from faronix_output import OutputWriter, atomic_write
+from faronix_registry import Registry
+from faronix_profile import RenderProfiler, context_size
+from faronix_validate import compile_validator, validate_spec
+from generate_component_index import (
+    closure as template_closure,
+    default_form_template,
+    dependents,
+    load_component_index,
+    resolve as resolve_template,
 )
+from faronix_templating import APP_OPTIONS, app_env, bundle_path, compile_bundle
 
 
 PY = sys.executable
+GENERATOR_VERSION = "0.1.0"  # bump when generator logic changes output
+BUILD_CACHE_PATH = REGISTRY.parent / "_build_cache.json"
+SPEC_CATALOG_PATH = REGISTRY.parent / "_spec_catalog.pickle"
+OUTPUT_MANIFEST_PATH = REGISTRY.parent / "_output_manifest.json"
+BUILD_MANIFEST_PATH = REGISTRY.parent / "_build_manifest.json"  # deploy view, see faronix_bundle
+PROFILE_TRACE_PATH = REGISTRY.parent / "_render_trace.jsonl"
+ARTIFACT_ROOT = REGISTRY.parent / "_artifacts"
+REGISTRY_DB_PATH = REGISTRY.with_suffix(".sqlite3")
+build_cache: BuildCache | None = None  # set by generate_all()
+output_writer: OutputWriter | None = None  # staged writes of the current run
+profiler: RenderProfiler | None = None  # set by --profile
+flatten_includes = False  # set by --flatten
+minify_partials = False  # per spec ("minify": true), see _spec_options()
+current_spec: str | None = None  # spec producing the outputs being rendered (None: shared)
+artifact_store = ArtifactStore(ARTIFACT_ROOT)
+
+log = logging.getLogger("faronix.generator")
 PATTERN = re.compile(r"yofaron_scaffolded_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.json")
 SCAFFOLDED_REGEX = PATTERN
 
 
-env = Environment(
-    loader=FileSystemLoader(
-        [str(TPL_PY_DIR), str(TPL_HTML_DIR), str(ROOT), str(PROJECT_ROOT), "."]
-    ),
-    trim_blocks=True,
-    lstrip_blocks=True,
-)
+ENV_OPTIONS = APP_OPTIONS
+TPL_DIR = TPL_PY_DIR.parent
+
+# shared py/ + html/ environment (see faronix_templating); bare names resolve in py/, then html/
+env = app_env(TPL_PY_DIR, TPL_HTML_DIR)
 
 env.globals["MODEL_TYPE_MAP"] = MODEL_TYPE_MAP
 env.globals["JSON_DIR"] = JSON_DIR
@@ -61,63 +90,21 @@ env.globals["TPL_HTML_DIR"] = TPL_HTML_DIR
 env.globals["MODEL_PATH"] = MODEL_PATH
 env.globals["DEFAULT_CONFIG"] = DEFAULT_CONFIG
 
-print(
-    "DEBUG PATHS: ROOT =",
-    ROOT,
-    "\n PROJECT_ROOT=",
-    PROJECT_ROOT,
-    "\n CONFIG_DIR  =",
-    CONFIG_DIR,
-    "\n JSON_DIR    =",
-    JSON_DIR,
-    "\n TPL_HTML_DIR     =",
-    TPL_HTML_DIR,
-    "\n TPL_PY_DIR     =",
-    TPL_PY_DIR,
-    "\n OUTPUT_DIR  =",
-    "\n OUTPUT_DIR  =",
-    OUTPUT_DIR,
-    "\n VIEW_PATH   =",
-    VIEW_PATH,
-    "\n URLS_PATH   =",
-    URLS_PATH,
-    "\n FORM_PATH   =",
-    FORM_PATH,
-    "\n MODEL_PATH  =",
-    MODEL_PATH,
-    "\n BASE_DIR    =",
-    BASE_DIR,
-    "\n TEMPLATE_PATH_HTML =",
-)
+
+def _log_paths() -> None:
+    log.debug(
+        "paths:\n ROOT         = %s\n PROJECT_ROOT = %s\n CONFIG_DIR   = %s\n JSON_DIR     = %s"
+        "\n TPL_HTML_DIR = %s\n TPL_PY_DIR   = %s\n OUTPUT_DIR   = %s\n VIEW_PATH    = %s"
+        "\n URLS_PATH    = %s\n FORM_PATH    = %s\n MODEL_PATH   = %s\n BASE_DIR     = %s",
+        ROOT, PROJECT_ROOT, CONFIG_DIR, JSON_DIR, TPL_HTML_DIR, TPL_PY_DIR, OUTPUT_DIR,
+        VIEW_PATH, URLS_PATH, FORM_PATH, MODEL_PATH, BASE_DIR,
+    )
 
 
 def _utcnow_iso():
     return datetime.utcnow().isoformat() + "Z"
 
 
-def _strip_jsonc(s: str) -> str:
-    # remove // line comments
-    s = re.sub(r"//.*?$", "", s, flags=re.MULTILINE)
-    # remove /* ... */ block comments
-    s = re.sub(r"/\*.*?\*/", "", s, flags=re.DOTALL)
-    return s
-
-
-def camel(s: str) -> str:
-    parts = re.split(r"[^a-zA-Z0-9]+", str(s))
-    return "".join(p[:1].upper() + p[1:] for p in parts if p)
-
-
-env.filters["camel"] = camel
-
-
-def pyrepr(v):
-    return repr(v)
-
-
-env.filters["pyrepr"] = pyrepr
-
-
 def rank_from_role(role):
     return ROLE_RANK.get(role, 1000)
 
@@ -134,12 +121,15 @@ def run(cmd):
 
 def read_json_any(path: Path) -> dict:
     """
-    Read .json or .jsonc, strip comments if needed, and parse.
+    Read .json or .jsonc (comments and trailing commas allowed), and parse.
+    Syntax errors are JSONCError/JSONDecodeError with the file's line/column.
     """
-    raw = path.read_text(encoding="utf-8")
     if path.suffix.lower() == ".jsonc":
-        raw = _strip_jsonc(raw)
-    return json.loads(raw)
+        return read_jsonc(path)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+spec_catalog = SpecCatalog(SPEC_CATALOG_PATH, JSON_DIR, read_json_any)
 
 
 def _safe_read_json(path: Path) -> dict | None:
@@ -153,35 +143,21 @@ def latest_spec() -> Path | None:
     if not JSON_DIR.exists():
         return None
     # pick newest timestamped spec; include .jsonc if you use it
-    files = sorted(
-        [
-            p
-            for p in JSON_DIR.glob("yofaron_scaffolded_*.json*")
-            if p.name != "_in_service.json"
-        ],
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-    if files:
-        return files[0]
+    for e in spec_catalog.scan():  # newest first
+        if Path(e["path"]).name.startswith("yofaron_scaffolded_"):
+            return Path(e["path"])
     # optional fallback
     return DEFAULT_SOT if DEFAULT_SOT.exists() else None
 
 
 def _is_layout_spec(p: Path) -> bool:
-    data = _safe_read_json(p)
-    return bool(data) and data.get("kind") == "layout"
+    e = spec_catalog.get(p)
+    return bool(e) and e["kind"] == "layout"
 
 
 def _view_slug_from_spec(p: Path) -> str | None:
-    data = _safe_read_json(p)
-    if not data:
-        return None
-    if vs := data.get("view_slug"):
-        return vs
-    if vn := data.get("view_name"):
-        return re.sub(r"\W+", "_", vn.strip().lower())
-    return None
+    e = spec_catalog.get(p)
+    return e["view_slug"] if e else None
 
 
 def normalize_field_types(ctx: dict) -> None:
@@ -193,25 +169,8 @@ def normalize_field_types(ctx: dict) -> None:
 
 
 def validate_ctx(ctx: dict) -> list[str]:
-    errs = []
-    for k in ("app_label", "view_name", "tabs"):
-        if k not in ctx:
-            errs.append(f"missing key: {k}")
-
-    slugs = []
-    for t in ctx.get("tabs", []):
-        if "slug" not in t:
-            errs.append("tab missing slug")
-            continue
-        if t["slug"] in slugs:
-            errs.append(f"duplicate tab slug: {t['slug']}")
-        slugs.append(t["slug"])
-        if "form_template" not in t:
-            errs.append(f"tab {t['slug']} missing form_template")
-
-    if ctx.get("model") and not isinstance(ctx.get("fields"), list):
-        errs.append("model declared but 'fields' is not a list")
-    return errs
+    """Structural spec checks (no component index); see faronix_validate."""
+    return compile_validator().check(ctx)
 
 
 def ensure_sot(path: Path) -> None:
@@ -221,6 +180,25 @@ def ensure_sot(path: Path) -> None:
         print(f"🆕 Created {path} (empty starter). Edit it and rerun.")
 
 
+def _tab_cache(spec: dict, view_name: str) -> dict:
+    """
+    Tab "cache" directive → cached_partial() options for the generated view:
+    ttl in seconds (default 300), vary by "rank" (default), "lti" and/or
+    "user", and the views whose Created/Updated/Deleted events invalidate it
+    (this view always; invalidate_on adds others). Runs before validate_ctx(),
+    which rejects malformed directives, so bad values are skipped, not raised on.
+    """
+    ttl, vary, extra = spec.get("ttl", 300), spec.get("vary", ["rank"]), spec.get("invalidate_on", [])
+    if not isinstance(extra, list):
+        extra = []
+    sources = [view_name.lower()] + [v.lower() for v in extra if isinstance(v, str)]
+    return {
+        "ttl": ttl if isinstance(ttl, int) else 300,
+        "vary": [v for v in vary if isinstance(v, str)] if isinstance(vary, list) else ["rank"],
+        "invalidate_on": list(dict.fromkeys(sources)),
+    }
+
+
 def load_ctx(json_path: Path) -> dict:
     if not json_path.exists():
         json_path.parent.mkdir(parents=True, exist_ok=True)
@@ -232,18 +210,8 @@ def load_ctx(json_path: Path) -> dict:
 
     ctx = read_json_any(json_path)  # <-- JSONC-aware
 
-    # --- Run component index generator and load index ---
-    subprocess.run([sys.executable, "builder/generate_component_index.py"], check=True)
-    index_path = Path("builder/component_index.json")
-    component_index = None
-    if index_path.exists():
-        with index_path.open() as f:
-            index_data = json.load(f)
-            # Flatten all components into a single list
-            all_components = []
-            for comps in index_data.get("components", {}).values():
-                all_components.extend(comps)
-            component_index = all_components
+    # --- Component index (built once per process, see load_component_index) ---
+    index_data = load_component_index()
 
     # Auto-fill missing app_label
     if "app_label" not in ctx or ctx["app_label"] is None:
@@ -257,120 +225,183 @@ def load_ctx(json_path: Path) -> dict:
         tab["required_rank"] = 100
         # Auto-pick form_template if missing or empty
         if "form_template" not in tab or not tab["form_template"]:
-            tpl_name = component_index[0] if component_index else "FormTemplate"
-            if not tpl_name.endswith(".tpl.html"):
-                tpl_name = f"{tpl_name}.tpl.html"
-            tab["form_template"] = tpl_name
+            tab["form_template"] = default_form_template(index_data)
     ctx["role_ranks"] = ROLE_RANK
     ctx["allowed_tabs"] = [t["slug"] for t in ctx.get("tabs", []) if t.get("slug")]
+    ctx["tab_cache"] = {
+        t["slug"]: _tab_cache(t["cache"], ctx.get("view_name", ""))
+        for t in ctx.get("tabs", [])
+        if t.get("slug") and isinstance(t.get("cache"), dict)
+    }
     normalize_field_types(ctx)
     return ctx
 
 
+registry = Registry(REGISTRY_DB_PATH, legacy_json=REGISTRY)
+
+
 def load_registry() -> dict:
     """
-    Load builder/_in_service.json or return a fresh skeleton.
-    Schema:
+    Snapshot of the spec registry (builder/_in_service.sqlite3, see
+    faronix_registry). Schema:
       {
         "generated_at": "...Z",
         "layout": "builder/json/yofaron_layout_base.json" | null,
         "specs": [
-          {"path": ".../yofaron_scaffolded_*.json", "view_slug": "admin", "mtime": 1757641909, "active": true}
+          {"path": ".../yofaron_scaffolded_*.json", "view_slug": "admin", "app_label": "core",
+           "mtime": 1757641909, "active": true}
         ]
       }
     """
-    if REGISTRY.exists():
-        data = _safe_read_json(REGISTRY)
-        if isinstance(data, dict):
-            # ensure keys exist
-            data.setdefault("generated_at", _utcnow_iso())
-            data.setdefault("layout", None)
-            data.setdefault("specs", [])
-            return data
-        print("⚠️  _in_service.json malformed; starting fresh.")
-    return {"generated_at": _utcnow_iso(), "layout": None, "specs": []}
+    return registry.load()
 
 
 def save_registry(reg: dict) -> None:
-    reg["generated_at"] = _utcnow_iso()
-    REGISTRY.parent.mkdir(parents=True, exist_ok=True)
-    REGISTRY.write_text(json.dumps(reg, indent=2), encoding="utf-8")
-    print(f"📘 Registry updated → {REGISTRY}")
+    registry.replace(reg)
+    _export_registry()
 
 
-def write_in_service_file(spec_paths: list[Path]):
-    registry_path = ROOT / "builder" / "_in_service.json"
-    registry_path.parent.mkdir(parents=True, exist_ok=True)
+def _export_registry() -> None:
+    # _in_service.json stays readable for external tools; rewritten only on change
+    if registry.export_json(REGISTRY):
+        print(f"📘 Registry updated → {REGISTRY_DB_PATH.name} (exported {REGISTRY.name})")
 
-    data = {
-        "scaffolded": [str(p) for p in spec_paths],
-        "generated_at": datetime.utcnow().isoformat() + "Z",
-    }
 
-    registry_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    print(f"📘 Wrote source-of-truth registry → {registry_path}")
+def write_in_service_file(spec_paths: list[Path]):
+    with registry.transaction():
+        for p in spec_paths:
+            registry.upsert_spec(str(p))
+    _export_registry()
+    print(f"📘 Wrote source-of-truth registry → {REGISTRY_DB_PATH}")
 
 
-def discover_specs() -> tuple[list[Path], list[Path]]:
-    if not JSON_DIR.exists():
-        return ([], [])
-    files = [
-        p for p in JSON_DIR.glob("*.json*") if p.name != "_in_service.json"
-    ]  # *.json and *.jsonc
-    files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-
+def _discover_entries() -> tuple[list[dict], list[dict]]:
+    """(layouts, modules) catalog entries for *.json / *.jsonc, newest first."""
     layouts, modules = [], []
-    for p in files:
-        try:
-            data = read_json_any(p)
-        except Exception:
+    for e in spec_catalog.scan():
+        if e["error"]:
             continue
-        if data.get("kind") == "layout":
-            layouts.append(p)
-        else:
-            modules.append(p)
+        (layouts if e["kind"] == "layout" else modules).append(e)
     return (layouts, modules)
 
 
+def discover_specs() -> tuple[list[Path], list[Path]]:
+    layouts, modules = _discover_entries()
+    return ([Path(e["path"]) for e in layouts], [Path(e["path"]) for e in modules])
+
+
 def sync_registry(
     auto_pick_latest_layout: bool = True, prune_missing: bool = False
 ) -> dict:
-    reg = load_registry()
-    layouts, modules = discover_specs()
-
-    # existing layout path in registry
-    current_layout = Path(reg.get("layout")) if reg.get("layout") else None
-
-    if auto_pick_latest_layout and layouts:
-        # sort layouts by modified time (newest first)
-        latest_layout = sorted(layouts, key=lambda p: p.stat().st_mtime, reverse=True)[
-            0
-        ]
-        if not current_layout or current_layout.resolve() != latest_layout.resolve():
-            reg["layout"] = str(latest_layout)
-            print(f"🎯 Updated layout in registry → {latest_layout.name}")
-        else:
-            print(f"⏭ Layout unchanged → {current_layout.name}")
-
-    save_registry(reg)
+    layouts, modules = _discover_entries()
+
+    # one transaction: concurrent runs/watchers serialise here instead of clobbering
+    with registry.transaction():
+        current = registry.layout()
+        if auto_pick_latest_layout and layouts:
+            # catalog entries are already newest first
+            latest_layout = Path(layouts[0]["path"])
+            if not current or Path(current).resolve() != latest_layout.resolve():
+                registry.set_layout(str(latest_layout))
+                print(f"🎯 Updated layout in registry → {latest_layout.name}")
+            else:
+                print(f"⏭ Layout unchanged → {Path(current).name}")
+
+        # register module specs (new ones start active; existing flags are kept).
+        # Wizard snapshots are kept per save, but only the newest one per
+        # view_slug is active: a new snapshot supersedes the older ones.
+        newest_snapshot = {}
+        for spec in modules:  # newest first
+            p = Path(spec["path"])
+            is_new = registry.upsert_spec(
+                str(p),
+                view_slug=spec["view_slug"],
+                app_label=spec["app_label"],
+                mtime=spec["mtime_ns"] // 1_000_000_000,
+            )
+            if is_new:
+                print(f"➕ Registered spec → {p.name}")
+            if not p.name.startswith("yofaron_scaffolded_"):
+                continue
+            newest = newest_snapshot.setdefault(spec["view_slug"], (p, is_new))
+            if newest[0] != p and newest[1] and registry.set_active(str(p), False):
+                print(f"⏸  Superseded snapshot → {p.name} (by {newest[0].name})")
+        if prune_missing:
+            for gone in registry.prune_missing():
+                print(f"🗑  Unregistered missing spec → {Path(gone).name}")
+        reg = registry.load()
+
+    _export_registry()
     render_project_urls_autogen(reg)
 
     return reg
 
 
-def write_if_changed(path: Path, content: str) -> None:
-    old = path.read_text(encoding="utf-8") if path.exists() else None
-    if old != content:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content, encoding="utf-8")
+def active_spec_paths(reg: dict) -> list[Path]:
+    """Active module specs from either registry schema ("specs" or "scaffolded")."""
+    paths = [Path(e["path"]) for e in reg.get("specs", []) if e.get("active", True)]
+    paths += [Path(p) for p in reg.get("scaffolded", [])]
+    unique = {str(p.resolve()): p for p in paths if p.exists()}
+    return [unique[k] for k in sorted(unique)]
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    if output_writer is not None:
+        # staged; becomes visible when the run commits
+        changed = output_writer.write(path, content, spec=current_spec)
+    else:
+        old = path.read_text(encoding="utf-8") if path.exists() else None
+        changed = old != content
+        if changed:
+            atomic_write(path, content)
+        data = content.encode("utf-8")
+        update_build_manifest(BUILD_MANIFEST_PATH, ROOT, {
+            str(path): {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data), "spec": current_spec}
+        })
+    if changed:
         print(f"✅ Generated: {path}")
     else:
         print(f"⏭  Unchanged: {path}")
+    return changed
+
+
+def write_artifact(path: Path, content: str) -> bool:
+    """
+    Store content once in the artifact store and stage path as a link to it.
+    History is recorded by _record_artifacts() after the run commits.
+    """
+    if output_writer is None:
+        return write_if_changed(path, content)
+    digest, obj = artifact_store.put(content)
+    changed = output_writer.link(path, obj, digest, content, spec=current_spec)
+    if changed:
+        print(f"✅ Generated: {path} → {digest[:12]}")
+    else:
+        print(f"⏭  Unchanged: {path}")
+    return changed
+
+
+def _record_artifacts(writer: OutputWriter) -> None:
+    if not writer.artifacts:
+        return
+    store = ArtifactStore(ARTIFACT_ROOT)  # re-read: gc/rollback may have run meanwhile
+    for path, digest in sorted(writer.artifacts.items()):
+        store.record(path, digest)
+    store.save()
 
 
 def render_to_file(
-    template_name: str, context: dict, output_path: Path, *, optional: bool = False
+    template_name: str,
+    context: dict,
+    output_path: Path,
+    *,
+    optional: bool = False,
+    artifact: bool = False,
 ) -> None:
+    """
+    Render template_name into output_path. artifact=True stores the result
+    in the content-addressed artifact store and links output_path to it.
+    """
     # Auto-fill missing app_label in context
     if "app_label" not in context and "view_name" in context:
         context["app_label"] = context["view_name"].lower()
@@ -380,20 +411,158 @@ def render_to_file(
     # If context is a tab context, auto-fill form_template
     if "tab" in context and "form_template" not in context["tab"]:
         context["tab"]["form_template"] = "FormTemplate.tpl.html"
+    if _cache_skip(template_name, context, output_path):
+        _profile(template_name, context, output_path, "planned" if build_cache.plan else "cached")
+        return
+    started = time.perf_counter()
     try:
         tpl = env.get_template(template_name)
     except TemplateNotFound:
         if optional:
             print(f"ℹ️  Skipped (template not found): {template_name}")
+            _profile(template_name, context, output_path, "not_found")
             return
         raise
-    out = tpl.render(**context)
+    compiled = time.perf_counter()
+    out = _postprocess(tpl.render(**context), output_path)
+    rendered = time.perf_counter()
     # Debug output for view file generation
-    if output_path.match(str(VIEW_PATH / "*.py")):
-        print(f"[DEBUG] Rendering {output_path}")
-        print(f"[DEBUG] Context: {json.dumps(context, default=str, indent=2)}")
-        print(f"[DEBUG] Output:\n{out[:500]}{'...' if len(out) > 500 else ''}")
-    write_if_changed(output_path, out)
+    if log.isEnabledFor(logging.DEBUG) and output_path.match(str(VIEW_PATH / "*.py")):
+        log.debug("Rendering %s", output_path)
+        log.debug("Context: %s", json.dumps(context, default=str, indent=2))
+        log.debug("Output:\n%s%s", out[:500], "..." if len(out) > 500 else "")
+    changed = (write_artifact if artifact else write_if_changed)(output_path, out)
+    _profile(
+        template_name, context, output_path, "written" if changed else "unchanged",
+        compile_s=compiled - started, render_s=rendered - compiled, out=out,
+    )
+
+
+def _profile(template_name: str, context: dict, output_path: Path, status: str, *,
+             compile_s: float = 0.0, render_s: float = 0.0, out: str = "") -> None:
+    """Hand one render_to_file() call to the --profile recorder (no-op otherwise)."""
+    if profiler is None:
+        return
+    spec = build_cache.spec_path if build_cache is not None else None
+    profiler.record(
+        template_name,
+        output_path,
+        status=status,
+        compile_s=compile_s,
+        render_s=render_s,
+        output_bytes=len(out.encode("utf-8")),
+        context_bytes=context_size(context),
+        spec=Path(spec).name if spec else None,
+    )
+
+
+def _cache_skip(template_name: str, context: dict, output_path: Path) -> bool:
+    """True when the build cache says this render can be skipped (or we only plan)."""
+    if build_cache is None:
+        return False
+    _, reasons = build_cache.check(template_name, context, output_path, options=_render_options(output_path))
+    if build_cache.plan:
+        return True
+    if not reasons:
+        print(f"⏭  Cached: {output_path}")
+        return True
+    return False
+
+
+def _is_partial(output_path: Path) -> bool:
+    return output_path.suffix == ".html" and output_path.is_relative_to(TEMPLATE_PARTIALS_PATH)
+
+
+def _render_options(output_path: Path) -> dict | None:
+    """Post-render passes that apply to output_path (part of its build-cache fingerprint)."""
+    if not _is_partial(output_path):
+        return None
+    options = {"flatten": flatten_includes, "minify": minify_partials}
+    return {k: v for k, v in options.items() if v} or None
+
+
+@contextlib.contextmanager
+def _spec_options(ctx: dict, spec: Path | None = None):
+    """Per-spec output options (and the producing spec) while rendering ctx's outputs."""
+    global minify_partials, current_spec
+    saved = minify_partials, current_spec
+    minify_partials, current_spec = bool(ctx.get("minify")), str(spec) if spec else None
+    try:
+        yield
+    finally:
+        minify_partials, current_spec = saved
+
+
+def _postprocess(out: str, output_path: Path) -> str:
+    """
+    Post-render passes (flatten, then minify) on the rendered string. Runs
+    before the output is staged or stored, never on a written file: partials
+    are hard links into the artifact store.
+    """
+    options = _render_options(output_path) or {}
+    if options.get("flatten"):
+        out = _flatten_partial(out, output_path)
+    if options.get("minify"):
+        minified = minify_html(out)
+        before, after = len(out.encode("utf-8")), len(minified.encode("utf-8"))
+        if before:
+            print(f"🗜  Minified {output_path.name}: {before} → {after} bytes (-{100 * (before - after) / before:.0f}%)")
+        out = minified
+    return out
+
+
+def _runtime_source(name: str) -> str | None:
+    """Source of a Django-side include ("tpl/forms/TextField.tpl.html") via the component catalog."""
+    index = load_component_index()
+    key = resolve_template(index, name)
+    if key is None or not key.startswith("html/"):
+        return None
+    try:
+        return Path(index["templates"][key]["path"]).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _flatten_partial(out: str, output_path: Path) -> str:
+    """--flatten: inline the static runtime includes of a generated partial (see faronix_flatten)."""
+    result = flatten(out, _runtime_source)
+    for name, reason in result.skipped:
+        log.info("Not inlined into %s: %s (%s)", output_path.name, name, reason)
+    if result.inlined:
+        print(f"🧩 Inlined {len(result.inlined)} include(s) into {output_path.name}")
+        if build_cache is not None:
+            index = load_component_index()
+            build_cache.record_inlined(output_path, {
+                name: template_closure(index, name)[0].get(name) for name in result.inlined
+            })
+    return result.text
+
+
+def render_merged_to_file(
+    template_name: str, contexts: list[dict], output_path: Path, *, optional: bool = False
+) -> None:
+    """Render template_name once per context (in the given order) into one output."""
+    merged = {"merged": contexts}
+    if _cache_skip(template_name, merged, output_path):
+        _profile(template_name, merged, output_path, "planned" if build_cache.plan else "cached")
+        return
+    started = time.perf_counter()
+    try:
+        tpl = env.get_template(template_name)
+    except TemplateNotFound:
+        if optional:
+            print(f"ℹ️  Skipped (template not found): {template_name}")
+            _profile(template_name, merged, output_path, "not_found")
+            return
+        raise
+    compiled = time.perf_counter()
+    out = _postprocess("\n\n".join(tpl.render(**c).rstrip() for c in contexts) + "\n", output_path)
+    rendered = time.perf_counter()
+    changed = write_if_changed(output_path, out)
+    _profile(
+        template_name, merged, output_path, "written" if changed else "unchanged",
+        compile_s=compiled - started, render_s=rendered - compiled, out=out,
+    )
 
 
 def render_project_urls_autogen(reg: dict):
@@ -410,19 +579,16 @@ def _build_active_specs_for_urls(reg: dict) -> list[dict]:
         if not e.get("active", True):
             continue
         p = Path(e["path"])
-        try:
-            data = read_json_any(
-                p
-            )  # if you use the jsonc-aware loader; else json.loads(p.read_text())
-        except Exception:
+        spec = spec_catalog.get(p)  # parsed once, re-read only when changed
+        if spec is None or spec["error"]:
             continue
-        view_name = data.get("view_name") or p.stem
-        view_slug = data.get("view_slug") or re.sub(r"\W+", "_", view_name.lower())
+        view_name = spec["view_name"] or p.stem
+        view_slug = spec["view_slug"] or re.sub(r"\W+", "_", view_name.lower())
         specs.append(
             {
                 "view_name": view_name,
                 "view_slug": view_slug,
-                "app_label": data.get("app_label", "core"),
+                "app_label": spec["app_label"],
             }
         )
     # keep stable order (by slug)
@@ -489,24 +655,43 @@ def write_sidebar_fragment(ctx: dict):
         items = [item]
     fragment = {"heading": heading, "items": items}
 
-    path.write_text(json.dumps(fragment, indent=2), encoding="utf-8")
+    write_if_changed(path, json.dumps(fragment, indent=2))
     print(f"📌 Sidebar fragment written: {path}")
 
 
-def write_public_sidebar(source_dir="sidemenu_bar", output_file="static/sidebar.json"):
+def _read_output_json(path: Path):
+    """JSON of an output as this run will commit it: the staged version if there is one."""
+    text = output_writer.staged(path) if output_writer is not None else None
+    if text is None:
+        text = path.read_text(encoding="utf-8")
+    return json.loads(text)
+
+
+def write_public_sidebar(source_dir=None, output_file=None, *, write: bool = True) -> dict:
+    """
+    Merge sidemenu_bar/*.json into static/sidebar.json and return it. The
+    file is staged like every other output (committed with the run); with
+    write=False (--plan) it is only built.
+    """
     from collections import defaultdict
 
-    source_path = Path(source_dir)
+    source_path = Path(source_dir) if source_dir else ROOT / "sidemenu_bar"
+    out_path = Path(output_file) if output_file else ROOT / "static" / "sidebar.json"
     sidebar_data = defaultdict(list)
 
-    # Combine all sidemenu_bar/*.json fragments
-    for json_file in sorted(source_path.glob("*.json")):
-        with open(json_file, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except Exception as e:
-                print(f"⚠️ Skipping {json_file.name} due to parse error: {e}")
-                continue
+    # Combine all sidemenu_bar/*.json fragments (staged ones included)
+    fragments = {p.resolve() for p in source_path.glob("*.json")}
+    if output_writer is not None:
+        fragments |= {
+            Path(k) for k in output_writer.pending
+            if Path(k).parent == source_path.resolve() and k.endswith(".json")
+        }
+    for json_file in sorted(fragments):
+        try:
+            data = _read_output_json(json_file)
+        except Exception as e:
+            print(f"⚠️ Skipping {json_file.name} due to parse error: {e}")
+            continue
 
         if "sidebar" in data:
             for section in data["sidebar"]:
@@ -532,30 +717,241 @@ def write_public_sidebar(source_dir="sidemenu_bar", output_file="static/sidebar.
         "tabbed": is_tabbed,
     }
 
-    out_path = Path(output_file)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(combined, f, indent=2)
+    if write:
+        write_if_changed(out_path, json.dumps(combined, indent=2))
+        print(
+            f"📦 Sidebar JSON compiled → {out_path} ({'Tabbed' if is_tabbed else 'Single link mode'})"
+        )
+    return combined
+
 
-    print(
-        f"📦 Sidebar JSON compiled → {out_path} ({'Tabbed' if is_tabbed else 'Single link mode'})"
-    )
+def compile_template_bundles() -> None:
+    """
+    Precompile the tpl/ tree: one bundle per template namespace (py/, html/),
+    shared by the generator, faronix_startup and ctl_django.
+    """
+    for namespace, roots in (
+        ("py", [TPL_PY_DIR]),
+        ("html", [TPL_HTML_DIR]),
+    ):
+        target = bundle_path(TPL_DIR, namespace)
+        count, skipped = compile_bundle(roots, target, **ENV_OPTIONS)
+        print(f"📦 Compiled {count} templates → {target}")
+        for item in skipped:
+            print(f"  ⏭  not compiled (served from source): {item}")
 
 
 # ---------- main
-def generate_all(json_path: Path):
+def new_build_cache(*, plan: bool = False, force: bool = False, refresh: bool = True) -> BuildCache:
+    """
+    Build cache whose template fingerprints come from the component catalog
+    (one stat per template instead of reading every include closure).
+    refresh=False trusts the in-memory catalog, e.g. in pool workers the
+    parent refreshed it for.
+    """
+    if refresh:
+        load_component_index(refresh=True)
+    return BuildCache(
+        BUILD_CACHE_PATH, env, GENERATOR_VERSION, plan=plan, force=force,
+        closure=lambda name: template_closure(load_component_index(), name),
+    )
+
+
+def generate_all(
+    json_path: Path, *, plan: bool = False, force: bool = False, ctx: dict | None = None
+):
+    """
+    Render every output for one spec. Outputs whose build-cache fingerprint
+    is unchanged are skipped; plan=True only reports what is stale and why,
+    force=True ignores the cache. Pass ctx when the caller already loaded
+    (and validated) the spec.
+    """
+    global build_cache, output_writer
     # Also render to builder/templates/tpl_py and tpl_html for test coverage
 
+    if ctx is None:
+        ctx = _prepare_ctx(json_path)
+    build_cache = new_build_cache(plan=plan, force=force)
+    build_cache.begin_spec(json_path)
+    output_writer = OutputWriter(OUTPUT_MANIFEST_PATH)
+    try:
+        with _spec_options(ctx, json_path):
+            _generate_outputs(ctx)
+        _render_shared([ctx])
+    except BaseException:
+        output_writer.abort()
+        raise
+    finally:
+        cache, build_cache = build_cache, None
+        writer, output_writer = output_writer, None
+    if plan:
+        cache.report()
+    else:
+        writer.commit()
+        _record_artifacts(writer)
+        update_build_manifest(BUILD_MANIFEST_PATH, ROOT, writer.produced())
+        cache.save()
+
+
+def _prepare_ctx(json_path: Path, *, check: bool = True) -> dict:
     ctx = load_ctx(json_path)
     # Always set view_slug in context
-    import re  # Ensure re is available in local scope for patch logic
-
     if "view_slug" not in ctx:
         ctx["view_slug"] = re.sub(r"\W+", "_", ctx.get("view_name", "view").lower())
-    errs = validate_ctx(ctx)
+    errs = validate_ctx(ctx) if check else []
     if errs:
         raise SystemExit("❌ Validation failed:\n- " + "\n- ".join(errs))
+    return ctx
+
+
+def _generate_worker(
+    json_path: str, plan: bool, force: bool, profile: bool = False, flatten_partials: bool = False
+) -> dict:
+    """
+    ProcessPoolExecutor task: render the per-spec outputs of one spec.
+    The module-level env and component index stay warm in each worker. The build
+    cache is only read here; the parent merges the returned steps and saves.
+    """
+    global build_cache, output_writer, profiler, flatten_includes
+    flatten_includes = flatten_partials
+    build_cache = new_build_cache(plan=plan, force=force, refresh=False)
+    build_cache.begin_spec(Path(json_path))
+    output_writer = OutputWriter(OUTPUT_MANIFEST_PATH)
+    # fresh recorder: a forked worker must not resend the parent's records
+    profiler = RenderProfiler(PROFILE_TRACE_PATH) if profile else None
+    try:
+        ctx = _prepare_ctx(Path(json_path))
+        with _spec_options(ctx, json_path):
+            _generate_outputs(ctx)
+        return {
+            "path": json_path,
+            "ctx": ctx,
+            "cache": build_cache.export(),
+            "output": output_writer.export(),
+            "profile": profiler.export() if profiler else [],
+        }
+    except BaseException:
+        output_writer.abort()
+        raise
+    finally:
+        build_cache = output_writer = profiler = None
+
+
+def generate_registered(*, plan: bool = False, force: bool = False, jobs: int | None = None) -> int:
+    """
+    Generate every active spec in _in_service.json over a process pool,
+    then write the shared outputs (static/sidebar.json, per-view sidebar
+    partials, core/views/repo.py, config/urls_autogen.py) once, in
+    view_slug order. Workers only stage their files; the run is committed
+    as a whole, and if any spec fails nothing is written.
+    Returns the number of failed specs.
+    """
+    global build_cache, output_writer
+    build_cache = new_build_cache(plan=plan, force=force, refresh=False)
+    output_writer = OutputWriter(OUTPUT_MANIFEST_PATH)
+    try:
+        reg = load_registry() if plan else sync_registry()
+        specs = active_spec_paths(reg)
+        if not specs:
+            print("❌ No active specs in the registry.")
+            return 0
+        # built before the pool forks, so workers inherit it
+        load_component_index(refresh=not plan)
+
+        workers = jobs or os.cpu_count() or 1
+        print(f"🚀 Generating {len(specs)} specs on {workers} workers")
+        results, failed = [], []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_generate_worker, str(p), plan, force, profiler is not None, flatten_includes): p
+                for p in specs
+            }
+            for fut in as_completed(futures):
+                try:
+                    results.append(fut.result())
+                except (Exception, SystemExit) as e:
+                    failed.append(futures[fut])
+                    print(f"❌ {futures[fut].name}: {e}")
+
+        # reduce: deterministic order regardless of completion order; specs
+        # sharing a view_slug go oldest first, so the newest one wins the merge
+        results.sort(key=lambda r: (r["ctx"]["view_slug"], Path(r["path"]).stat().st_mtime_ns, r["path"]))
+        collisions = build_cache.merge([r["cache"] for r in results])
+        output_writer.merge([r["output"] for r in results])
+        if profiler is not None:
+            profiler.merge([r["profile"] for r in results])
+        for path in collisions:
+            print(f"⚠️  Written by more than one spec (last writer wins): {path}")
+        if failed:
+            output_writer.abort()
+        else:
+            _render_shared([r["ctx"] for r in results])
+            if not plan:
+                render_project_urls_autogen(reg)
+    except BaseException:
+        output_writer.abort()
+        raise
+    finally:
+        cache, build_cache = build_cache, None
+        writer, output_writer = output_writer, None
+    if plan:
+        cache.report()
+    elif not failed:
+        writer.commit()
+        _record_artifacts(writer)
+        update_build_manifest(BUILD_MANIFEST_PATH, ROOT, writer.produced())
+        cache.save()
+    if failed:
+        print(f"❌ {len(failed)} of {len(specs)} specs failed; run not committed")
+    else:
+        print(f"🎉 Generated {len(results)} specs, 0 failed")
+    return len(failed)
+
+
+def _render_shared(ctxs: list[dict]) -> None:
+    """
+    Outputs shared by every spec: the merged static/sidebar.json, the
+    per-view sidebar partials rendered from it, and the single
+    core/views/repo.py (+ webhook/hx helpers) covering every model spec.
+    ctxs must already be in a stable order.
+    """
+    plan = build_cache is not None and build_cache.plan
+    # ✅ First, merge sidemenu_bar/*.json → static/sidebar.json (staged with the run)
+    sidebar_json = write_public_sidebar(write=not plan)
+
+    # ✅ Then inject the same dict into the sidebar partials
+    for ctx in ctxs:
+        with _spec_options(ctx):
+            render_to_file(
+                "panels/SideMenu.tpl.html",
+                {"sidebar": sidebar_json},
+                TEMPLATE_PARTIALS_PATH / f"{ctx['view_slug']}_sidebar.html",
+            )
+
+    models = [ctx for ctx in ctxs if ctx.get("model")]
+    if not models:
+        return
+    if len(models) == 1:
+        render_to_file("repo.tpl.py", models[0], VIEW_PATH / "repo.py")
+    else:
+        render_merged_to_file("repo.tpl.py", models, VIEW_PATH / "repo.py")
+    # use secure version if you created it; else keep basic
+    # render_to_file("webhook_wrapper_secure.tpl.py", ctx, VIEW_PATH / "webhook_wrapper.py", optional=True)
+    render_to_file(
+        "webhook_wrapper.tpl.py",
+        models[0],
+        VIEW_PATH / "webhook_wrapper.py",
+        optional=True,
+    )
+    render_to_file(
+        "hx_helpers.tpl.py", models[0], VIEW_PATH / "hx_helpers.py", optional=True
+    )
+
+
+def _generate_outputs(ctx: dict):
+    """Per-spec outputs; nothing here is shared with other specs."""
     view_slug = ctx["view_slug"]
+    plan = build_cache.plan
 
     # Ensure partials directory exists
     partials_dir = Path("templates/partials")
@@ -567,52 +963,54 @@ def generate_all(json_path: Path):
         ctx,
         TEMPLATE_PARTIALS_PATH / f"{view_slug}_partial.html",
     )
-    nav_filename = f"{view_slug}_nav_{ts}.html"
-    render_to_file("panels/TabNav.tpl.html", ctx, TEMPLATE_PARTIALS_PATH / nav_filename)
     render_to_file(
-        "panels/TabNav.tpl.html", ctx, TEMPLATE_PARTIALS_PATH / f"{view_slug}_nav.html"
+        "panels/TabNav.tpl.html",
+        ctx,
+        TEMPLATE_PARTIALS_PATH / f"{view_slug}_nav.html",
+        artifact=True,
     )
     # Only append a single route line, no duplicate imports or app_name
     url_file = URLS_PATH / f"{ctx['view_slug']}_urls.py"
     route_line = f'    path("{ctx["view_slug"]}/", {ctx["view_slug"]}, name="{ctx["view_slug"]}"),\n'
     import_line = f'from core.views.{ctx["view_slug"]} import {ctx["view_slug"]}\n'
     # If file exists, preserve only the import/app_name block and unique route lines
-    if url_file.exists():
-        lines = url_file.read_text(encoding="utf-8").splitlines()
-        header = []
-        routes = set()
-        in_routes = False
-        for line in lines:
-            if line.strip().startswith("urlpatterns += ["):
-                in_routes = True
-                continue
-            if in_routes:
-                if line.strip() == "]":
-                    in_routes = False
-                continue
-            # Remove previous import for this view_slug
-            if line.strip().startswith("from core.views.") and ctx["view_slug"] in line:
-                continue
-            header.append(line)
-        # Only keep unique route lines
-        routes.add(route_line)
-        url_file.write_text(
-            "\n".join(header)
-            + "\n"
-            + import_line
-            + "\nurlpatterns += [\n"
-            + "".join(routes)
-            + "]\n",
-            encoding="utf-8",
-        )
-    else:
-        url_file.write_text(
-            "# --- Only add new routes, do not overwrite existing ---\n"
-            "from django.urls import path\n" + import_line + "\n"
-            f"app_name = \"{ctx['app_label']}\"\n\n"
-            "urlpatterns += [\n" + route_line + "]\n",
-            encoding="utf-8",
-        )
+    if not plan:
+        if url_file.exists():
+            lines = url_file.read_text(encoding="utf-8").splitlines()
+            header = []
+            routes = set()
+            in_routes = False
+            for line in lines:
+                if line.strip().startswith("urlpatterns += ["):
+                    in_routes = True
+                    continue
+                if in_routes:
+                    if line.strip() == "]":
+                        in_routes = False
+                    continue
+                # Remove previous import for this view_slug
+                if line.strip().startswith("from core.views.") and ctx["view_slug"] in line:
+                    continue
+                header.append(line)
+            # Only keep unique route lines
+            routes.add(route_line)
+            write_if_changed(
+                url_file,
+                "\n".join(header)
+                + "\n"
+                + import_line
+                + "\nurlpatterns += [\n"
+                + "".join(routes)
+                + "]\n",
+            )
+        else:
+            write_if_changed(
+                url_file,
+                "# --- Only add new routes, do not overwrite existing ---\n"
+                "from django.urls import path\n" + import_line + "\n"
+                f"app_name = \"{ctx['app_label']}\"\n\n"
+                "urlpatterns += [\n" + route_line + "]\n",
+            )
     render_to_file(
         "urls_template.tpl.py",
         ctx,
@@ -621,26 +1019,12 @@ def generate_all(json_path: Path):
     # Render main content partial for htmx
     partial_ctx = ctx.copy()
     partial_ctx["is_partial"] = True
-    partial_filename = f"{view_slug}_partial_{ts}.html"
     render_to_file(
         "view_content_partial.tpl.html",
         ctx,
         TEMPLATE_PARTIALS_PATH / f"{view_slug}_partial.html",
     )
 
-    # ✅ First, merge sidemenu_bar/*.json → static/sidebar.json
-    write_public_sidebar(source_dir="sidemenu_bar", output_file="static/sidebar.json")
-
-    # ✅ Then load and inject it into your template render
-    with open("static/sidebar.json", "r", encoding="utf-8") as f:
-        sidebar_json = json.load(f)
-    sidebar_filename = f"{view_slug}_sidebar_{ts}.html"
-    render_to_file(
-        "panels/SideMenu.tpl.html",
-        {"sidebar": sidebar_json},
-        TEMPLATE_PARTIALS_PATH / f"{view_slug}_sidebar.html",
-    )
-
     # Per-tab forms + partial templates
     for tab in ctx.get("tabs", []):
         tab_ctx = {"tab": tab, "view": ctx}
@@ -663,11 +1047,11 @@ def generate_all(json_path: Path):
                     return iter([DummyField()])
 
             tab_ctx["form"] = DummyForm()
-        form_filename = f"{tab['slug']}_form_{ts}.html"
         render_to_file(
             "panels/FormTemplate.tpl.html",
             tab_ctx,
-            TEMPLATE_PARTIALS_PATH / form_filename,
+            TEMPLATE_PARTIALS_PATH / f"{tab['slug']}_form.html",
+            artifact=True,
         )
         render_to_file(
             "form_class.tpl.py", tab_ctx, FORM_PATH / f"{tab['slug']}_form.py"
@@ -675,26 +1059,10 @@ def generate_all(json_path: Path):
 
     # Optional DB/CRUD scaffolds
     if ctx.get("model"):
-        # Model + repo/webhooks + HX helper
+        # Model (repo/webhooks + HX helper are shared, see _render_shared)
         render_to_file(
             "model_class.tpl.py", ctx, MODEL_PATH / f"{ctx['model'].lower()}.py"
         )
-        render_to_file(
-            "repo.tpl.py",
-            ctx,
-            VIEW_PATH / "repo.py",
-        )
-        # use secure version if you created it; else keep basic
-        # render_to_file("webhook_wrapper_secure.tpl.py", ctx, VIEW_PATH / "webhook_wrapper.py", optional=True)
-        render_to_file(
-            "webhook_wrapper.tpl.py",
-            ctx,
-            VIEW_PATH / "webhook_wrapper.py",
-            optional=True,
-        )
-        render_to_file(
-            "hx_helpers.tpl.py", ctx, VIEW_PATH / "hx_helpers.py", optional=True
-        )
 
         # Base CRUD (optional if you haven’t added templates yet)
         render_to_file(
@@ -728,45 +1096,173 @@ def generate_all(json_path: Path):
         )
 
 
-def main():
-    args = sys.argv[1:]
-    spec = None
-    no_index = "--no-index" in args
-    no_validate = "--no-validate" in args
-    dry = "--dry-run" in args
+def rebuild_changed(paths: set[Path]) -> None:
+    """
+    Watch-mode rebuild: regenerate the specs touched by `paths`. A changed
+    spec regenerates itself; a changed template regenerates the specs whose
+    cached outputs used it or a template that includes/extends it, per the
+    component catalog (the build cache then re-renders only those
+    outputs). Reuses the warm env and in-memory component index.
+    """
+    started = time.perf_counter()
+    specs: set[Path] = set()
+    templates: set[str] = set()
+    for p in paths:
+        if p.is_relative_to(JSON_DIR):
+            if p == JSON_DIR or p.is_dir():
+                specs.update(q for q in JSON_DIR.glob("*.json*") if q.name != "_in_service.json")
+            elif p.suffix.lower() in (".json", ".jsonc") and p.name != "_in_service.json":
+                specs.add(p)
+            continue
+        for ns, root in (("py", TPL_PY_DIR), ("html", TPL_HTML_DIR)):
+            if p.is_relative_to(root):
+                templates.add("*" if p.is_dir() else f"{ns}/{p.relative_to(root).as_posix()}")
+
+    if templates:
+        index = load_component_index(refresh=True)
+        if "*" in templates:
+            specs.update(active_spec_paths(load_registry()))
+        else:
+            # the changed templates plus everything that includes/extends them
+            affected = templates | dependents(index, templates)
+            cache = BuildCache(BUILD_CACHE_PATH, env, GENERATOR_VERSION)
+            specs.update(
+                Path(s) for s in cache.specs_using(affected, lambda n: resolve_template(index, n) or n)
+            )
+    if not specs:
+        return
 
-    if "--spec" in args:
-        i = args.index("--spec")
+    registered = {str(Path(e["path"]).resolve()) for e in load_registry()["specs"]}
+    registry_changed = False
+    built = 0
+    for spec in sorted(specs):
+        if not spec.exists():
+            print(f"🗑  Spec removed: {spec.name}")
+            registry_changed = True
+            continue
+        if _is_layout_spec(spec):
+            continue
         try:
-            spec = Path(args[i + 1])
-        except Exception:
-            print("❌ --spec requires a filename")
-            sys.exit(2)
-    else:
-        spec = latest_spec()
-        if not spec:
-            print("❌ No yofaron_scaffolded_*.json found. Run the wizard first.")
-            sys.exit(2)
-
-    print(f"📄 Using spec: {spec}")
+            generate_all(spec)
+        except (Exception, SystemExit) as e:
+            print(f"❌ {spec.name}: {e}")
+            continue
+        built += 1
+        registry_changed |= str(spec.resolve()) not in registered
+    if registry_changed:
+        sync_registry(prune_missing=True)
+    print(f"⚡ Rebuilt {built} spec(s) in {(time.perf_counter() - started) * 1000:.0f} ms")
 
-    if not no_index:
-        run([PY, "generate_component_index.py"])
 
-    if not no_validate:
-        # 🔑 now always call yofaron_validator.py
-        run([PY, "yofaron_validator.py", spec.name])
+def watch_and_rebuild(*, poll: bool = False) -> int:
+    from faronix_watch import watch
 
-    if dry:
+    load_component_index()
+    try:
+        watch([JSON_DIR, TPL_PY_DIR, TPL_HTML_DIR], rebuild_changed, poll=poll)
+    except KeyboardInterrupt:
+        print("\n👋 Watch stopped")
+    return 0
+
+
+def run_pipeline(
+    spec: Path,
+    *,
+    index: bool = True,
+    validate: bool = True,
+    dry_run: bool = False,
+    plan: bool = False,
+    force: bool = False,
+) -> int:
+    """
+    index → validate → render → register for one spec, in this process.
+    Used by main(), the wizard and ctl_django. Returns an exit code.
+    """
+    if index:
+        load_component_index(refresh=True)
+
+    ctx = _prepare_ctx(spec, check=False)
+    if validate:
+        errs = validate_spec(ctx, load_component_index())
+        if errs:
+            print("❌ Validation failed:")
+            for e in errs:
+                print("  -", e)
+            return 1
+        print("✅ Spec validated successfully")
+
+    if dry_run:
         print("ℹ️ Dry-run: skipping generation.")
-        return
+        return 0
 
-    run([PY, "yofaron_generate.py", spec.name])
+    generate_all(spec, plan=plan, force=force, ctx=ctx)
+    if not plan:
+        sync_registry()
     print("🎉 yofaron scaffolding complete")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Yofaron spec generator")
+    parser.add_argument("spec", nargs="?", help="Spec file (relative to JSON_DIR)")
+    parser.add_argument("--spec", dest="spec_opt", help=argparse.SUPPRESS)
+    parser.add_argument("--all", action="store_true", help="Generate every active spec in the registry in parallel")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for --all (default: one per core)")
+    parser.add_argument("--plan", action="store_true", help="List stale outputs and why, write nothing")
+    parser.add_argument("--force", action="store_true", help="Ignore the build cache")
+    parser.add_argument("--compile-templates", action="store_true", help="Precompile tpl/ into template bundles and exit")
+    parser.add_argument("--no-index", action="store_true", help="Reuse the existing component index")
+    parser.add_argument("--no-validate", action="store_true", help="Skip spec validation")
+    parser.add_argument("--dry-run", action="store_true", help="Index and validate only")
+    parser.add_argument("--watch", action="store_true", help="Regenerate affected specs whenever specs or templates change")
+    parser.add_argument("--poll", action="store_true", help="With --watch: poll mtimes instead of using inotify")
+    parser.add_argument("--profile", action="store_true", help="Record per-template compile/render timings")
+    parser.add_argument(
+        "--flatten",
+        action="store_true",
+        default=os.getenv("FARONIX_FLATTEN") == "1",
+        help="Inline static {% include %}s of tpl_html components into generated partials",
+    )
+    parser.add_argument("--profile-trace", type=Path, default=PROFILE_TRACE_PATH, help="JSONL trace written by --profile")
+    parser.add_argument(
+        "--log-level",
+        default=os.getenv("FARONIX_LOG_LEVEL", "WARNING"),
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Generator log level (DEBUG shows paths and rendered view contexts)",
+    )
+    opts = parser.parse_args(argv)
 
+    logging.basicConfig(level=opts.log_level, format="%(levelname)s %(name)s: %(message)s")
+    logging.getLogger().setLevel(opts.log_level)  # also when already configured (serve-builder)
+    _log_paths()
 
-if __name__ == "__main__":
-    cli_path = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    global profiler, flatten_includes
+    if opts.profile:
+        profiler = RenderProfiler(opts.profile_trace)
+    flatten_includes = opts.flatten
+    try:
+        return _run_main(opts)
+    finally:
+        flatten_includes = False
+        if profiler is not None:
+            profiler.finish()
+            profiler = None
+
+
+def _run_main(opts) -> int:
+    if opts.watch:
+        return watch_and_rebuild(poll=opts.poll)
+
+    if opts.compile_templates:
+        compile_template_bundles()
+        return 0
+
+    if opts.all:
+        failed = generate_registered(plan=opts.plan, force=opts.force, jobs=opts.jobs)
+        return 1 if failed else 0
+
+    name = opts.spec or opts.spec_opt
+    cli_path = Path(name) if name else None
     if cli_path and not cli_path.is_absolute():
         cli_path = JSON_DIR / cli_path
 
@@ -775,7 +1271,18 @@ if __name__ == "__main__":
         print(
             "❌ No spec file found in builder/json/. Run the wizard or place a yofaron_scaffolded_*.json here."
         )
-        sys.exit(1)
+        return 1
 
     print(f"📄 Using spec: {sot}")
-    generate_all(sot)
+    return run_pipeline(
+        sot,
+        index=not opts.no_index,
+        validate=not opts.no_validate,
+        dry_run=opts.dry_run,
+        plan=opts.plan,
+        force=opts.force,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
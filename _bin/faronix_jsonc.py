@@ -0,0 +1,220 @@
+# builder/faronix_jsonc.py
+"""
+JSONC reader for specs: JSON plus // and /* */ comments and trailing commas.
+
+Single forward scan, string-aware: a C-level search jumps between the only
+places that can need work ('//', '/*', and a ',' before a closing bracket)
+and each hit is checked against the string state of its own line (JSON
+strings cannot span lines), so "https://..." inside a value is never
+mistaken for a comment. Comments and trailing commas are blanked in place
+(same length, newlines kept) rather than removed, which means every offset
+the json decoder reports is an offset in the original file: errors carry the
+real line/column.
+
+A document that needs no blanking is handed to json.loads as-is (no copy);
+otherwise the scan produces the one cleaned buffer the decoder needs. Files
+are read and scanned in chunks (load/read_jsonc), carrying only an
+undecided token across chunk boundaries.
+"""
+import json
+import re
+from pathlib import Path
+
+# "..." with escapes; JSON strings cannot span lines
+_STRING = r'"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+# /* ... */ written without lazy .*? so a failed match cannot rescan the file
+_BLOCK = r"/\*[^*]*\*+(?:[^*/][^*]*\*+)*/"
+_LINE = r"//[^\n]*"
+
+# where work may be needed: comment starts, and commas before a closing bracket
+# (or before the end of a chunk, whose follower is not known yet)
+COMMENT_RE = re.compile(r"/[/*]")
+TRAILING_RE = re.compile(r",\s*(?=[\]}]|\Z)")
+STRING_RE = re.compile(_STRING)
+# longest stretch of one line that is outside any string
+LINE_OUTSIDE_RE = re.compile(rf'(?:[^"\n]|{_STRING})*')
+# whitespace and comments between a comma and whatever follows it
+GAP_RE = re.compile(rf"(?:\s|{_LINE}|{_BLOCK})*")
+_NOT_NEWLINE = re.compile(r"[^\n]")
+
+CHUNK_SIZE = 1 << 20
+
+
+class JSONCError(json.JSONDecodeError):
+    """JSONDecodeError whose lineno/colno point into the original .jsonc file."""
+
+    def __init__(self, msg: str, doc: str, pos: int, source: str | None = None):
+        super().__init__(f"{source}: {msg}" if source else msg, doc, pos)
+        self.reason = msg
+        self.source = source
+
+
+def _blank(text: str) -> str:
+    if "\n" not in text:
+        return " " * len(text)
+    return _NOT_NEWLINE.sub(" ", text)
+
+
+def _scan(text: str, *, final: bool = True) -> tuple[list[str], int, bool]:
+    """
+    Clean `text`. Returns (parts, consumed, changed): "".join(parts) is the
+    cleaned text[:consumed] and `changed` is False when nothing was blanked.
+    With final=False the scan stops before anything the rest of the input
+    could change (an open comment or string, a comma at the end, a final '/').
+    """
+    parts: list[str] = []
+    n = len(text)
+    none = n + 1
+    pos = 0  # text[:pos] is already in parts
+    safe = 0  # known to be outside strings and comments
+    changed = False
+    comment_at = comma_at = comma_follow = -1
+    while True:
+        # two cheap literal-led searches instead of one alternation
+        if comment_at < safe:
+            m = COMMENT_RE.search(text, safe)
+            comment_at = m.start() if m else none
+        if comma_at < safe:
+            m = TRAILING_RE.search(text, safe)
+            comma_at, comma_follow = (m.start(), m.end()) if m else (none, none)
+        p = min(comment_at, comma_at)
+        if p == none:
+            break
+
+        # string state of p: re-lex its line from the last safe point
+        nl = text.rfind("\n", safe, p)
+        start = nl + 1 if nl >= 0 else safe
+        if "\\" in text[start:p]:
+            q = LINE_OUTSIDE_RE.match(text, start, p).end()
+        elif text.count('"', start, p) % 2:
+            q = text.rfind('"', start, p)  # no escapes: quote parity decides
+        else:
+            q = p
+        if q < p:
+            s = STRING_RE.match(text, q)  # p is inside the string opened at q
+            if s is not None:
+                safe = s.end()
+                continue
+            eol = text.find("\n", q)
+            if eol < 0:
+                if not final:  # string may close in the next chunk
+                    parts.append(text[pos:q])
+                    return parts, q, changed
+                break  # unterminated string: json.loads reports it
+            safe = eol
+            continue
+
+        if p == comma_at:
+            if comma_follow == n:
+                if not final:  # the follower is in the next chunk
+                    parts.append(text[pos:p])
+                    return parts, p, changed
+            else:
+                parts.append(text[pos:p])
+                parts.append(" ")
+                pos = p + 1
+                changed = True
+            safe = p + 1
+            continue
+
+        # a comment; a comma right before it may still be a trailing one
+        k = p - 1
+        while k >= pos and text[k] in " \t\r\n":
+            k -= 1
+        comma = k if k >= pos and text[k] == "," else None
+        stop = p if comma is None else comma
+        if text[p + 1] == "/":
+            end = text.find("\n", p)
+            if end < 0:
+                if not final:
+                    parts.append(text[pos:stop])
+                    return parts, stop, changed
+                end = n
+        else:
+            end = text.find("*/", p + 2)
+            if end < 0:
+                if final:
+                    raise JSONCError("Unterminated block comment", text, p)
+                parts.append(text[pos:stop])
+                return parts, stop, changed
+            end += 2
+        if comma is not None:
+            follow = GAP_RE.match(text, end).end()
+            if not final and text[follow : follow + 1] in ("", "/"):
+                parts.append(text[pos:comma])
+                return parts, comma, changed
+            if follow < n and text[follow] in "]}":
+                parts.append(text[pos:comma])
+                parts.append(" ")
+                pos = comma + 1
+        parts.append(text[pos:p])
+        parts.append(_blank(text[p:end]))
+        pos = safe = end
+        changed = True
+
+    if final:
+        parts.append(text[pos:])
+        return parts, n, changed
+    # stop at the first unterminated string, before a '/' that may start a
+    # comment and before a comma whose follower is not known yet (strings
+    # cannot span lines, so lexing can start at the last newline)
+    cut = LINE_OUTSIDE_RE.match(text, max(safe, text.rfind("\n") + 1)).end()
+    if cut == n and text.endswith("/"):
+        cut -= 1
+    cut = max(cut, pos)
+    tail = text[pos:cut]
+    kept = tail.rstrip(" \t\r\n,")
+    if "," in tail[len(kept) :]:
+        tail = kept
+        cut = pos + len(kept)
+    parts.append(tail)
+    return parts, cut, changed
+
+
+def _decode(doc: str, source: str | None):
+    try:
+        return json.loads(doc)
+    except json.JSONDecodeError as e:
+        raise JSONCError(e.msg, e.doc, e.pos, source) from None
+
+
+def loads(text: str, *, source: str | None = None):
+    try:
+        parts, _, changed = _scan(text)
+    except JSONCError as e:
+        raise JSONCError(e.reason, text, e.pos, source) from None
+    if not changed:
+        return _decode(text, source)  # plain JSON: decode the original string
+    return _decode("".join(parts), source)
+
+
+def load(fp, *, source: str | None = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Parse JSONC from a text file object, scanning it chunk by chunk. Only the
+    cleaned document is accumulated for the decoder; a token cut by a chunk
+    boundary is carried over and rescanned with the next chunk.
+    """
+    parts: list[str] = []
+    offset = 0  # length of the input already consumed into parts
+    carry = ""
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        buf = carry + chunk if carry else chunk
+        cleaned, used, _ = _scan(buf, final=False)
+        parts.extend(cleaned)
+        offset += used
+        carry = buf[used:]
+    try:
+        cleaned, _, _ = _scan(carry)
+    except JSONCError as e:
+        raise JSONCError(e.reason, "".join(parts) + carry, offset + e.pos, source) from None
+    parts.extend(cleaned)
+    return _decode("".join(parts), source)
+
+
+def read_jsonc(path: Path):
+    path = Path(path)
+    with path.open(encoding="utf-8") as fp:
+        return load(fp, source=path.name)
@@ -0,0 +1,150 @@
+# builder/faronix_minify.py
+"""
+HTML minification for generated partials and the handler_base templates.
+
+minify_html() shrinks Django template source without changing what it
+renders:
+  - whitespace next to a block-level tag (<div>, </tr>, <li>...) goes,
+    whitespace between attributes becomes one space, and other whitespace
+    runs collapse to one space, or one newline if the run had one (a space
+    between inline elements can render, so it stays),
+  - HTML comments are dropped, except conditional comments and comments that
+    contain Django tags (Django still runs those),
+  - <pre>, <textarea>, <script> and <style> bodies, Django tags
+    ({% %}, {{ }}, {# #}) and {% verbatim %} blocks are copied untouched.
+
+    python faronix_minify.py templates/            # minify *.html in place
+    python faronix_minify.py --check a.html b.html # report savings only
+"""
+import argparse
+import re
+import shutil
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from faronix_output import atomic_write
+
+# Kept verbatim. Order matters: the first alternative that matches wins.
+PROTECTED_RE = re.compile(
+    r"{%\s*verbatim\s*%}.*?{%\s*endverbatim\s*%}"
+    r"|<(pre|textarea|script|style)\b.*?</\1\s*>"
+    r"|{%.*?%}|{{.*?}}|{#.*?#}",
+    re.DOTALL | re.IGNORECASE,
+)
+COMMENT_RE = re.compile(r"<!--(?!\[if|<!|>)(.*?)-->", re.DOTALL)
+PLACEHOLDER_RE = re.compile(r"\x00(\d+)\x00")  # a protected region, see minify_html()
+SPACE_RE = re.compile(r"\s+")
+BLOCK_TAGS = (
+    "address|article|aside|blockquote|body|br|dd|details|dialog|div|dl|dt|fieldset|figcaption|figure"
+    "|footer|form|h[1-6]|head|header|hr|html|li|link|main|meta|nav|ol|optgroup|option|p|section"
+    "|summary|table|tbody|td|tfoot|th|thead|title|tr|ul"
+)
+TAG_RE = re.compile(r"""<[A-Za-z/][^<>"']*(?:(?:"[^"]*"|'[^']*')[^<>"']*)*>""")
+QUOTED_RE = re.compile(r"""("[^"]*"|'[^']*')""")
+BLOCK_TAG_RE = re.compile(rf"</?(?:{BLOCK_TAGS})\b", re.IGNORECASE)
+
+
+@dataclass
+class MinifyStats:
+    files: int = 0
+    before: int = 0
+    after: int = 0
+
+    def add(self, before: str, after: str) -> None:
+        self.files += 1
+        self.before += len(before.encode("utf-8"))
+        self.after += len(after.encode("utf-8"))
+
+    def __str__(self) -> str:
+        saved = self.before - self.after
+        pct = 100 * saved / self.before if self.before else 0.0
+        return f"{self.files} file(s), {self.before} → {self.after} bytes (-{saved}, {pct:.1f}%)"
+
+
+def _collapse(m: re.Match) -> str:
+    return "\n" if "\n" in m.group(0) else " "
+
+
+def _minify_tag(m: re.Match) -> str:
+    # quoted attribute values keep their whitespace (title="a\nb" renders it)
+    parts = QUOTED_RE.split(m.group(0))
+    tag = "".join(p if i % 2 else SPACE_RE.sub(" ", p) for i, p in enumerate(parts))
+    return re.sub(r"\s+(/?>)$", r"\1", tag)
+
+
+def _minify_text(text: str) -> str:
+    """Minify markup whose protected regions are placeholders."""
+    text = COMMENT_RE.sub(lambda m: m.group(0) if PLACEHOLDER_RE.search(m.group(1)) else "", text)
+    pieces, pos = [], 0  # text, tag, text, tag, ..., text
+    for m in TAG_RE.finditer(text):
+        pieces += [text[pos:m.start()], _minify_tag(m)]
+        pos = m.end()
+    pieces.append(text[pos:])
+    for i in range(0, len(pieces), 2):
+        t = pieces[i]
+        if i and BLOCK_TAG_RE.match(pieces[i - 1]):
+            t = t.lstrip()
+        if i + 1 < len(pieces) and BLOCK_TAG_RE.match(pieces[i + 1]):
+            t = t.rstrip()
+        pieces[i] = SPACE_RE.sub(_collapse, t)
+    return "".join(pieces)
+
+
+def minify_html(source: str) -> str:
+    # Protected regions are swapped for placeholders rather than cut out, so
+    # a tag that holds one (href="{% url 'x' %}") is still seen as one tag.
+    kept = []
+
+    def hold(m: re.Match) -> str:
+        kept.append(m.group(0))
+        return f"\x00{len(kept) - 1}\x00"
+
+    text = _minify_text(PROTECTED_RE.sub(hold, source))
+    return PLACEHOLDER_RE.sub(lambda m: kept[int(m.group(1))], text).strip()
+
+
+def minify_file(path: Path, stats: MinifyStats, *, check: bool = False) -> bool:
+    """
+    Minify one file in place (unless check); True when it shrank. Written as
+    a new file moved over the old one: generated partials are hard links
+    into the artifact store, which an in-place write would change too.
+    """
+    before = path.read_text(encoding="utf-8")
+    after = minify_html(before)
+    stats.add(before, after)
+    if after == before:
+        return False
+    if not check:
+        atomic_write(path, after)
+    return True
+
+
+def copy_minified(src, dst, *, stats: MinifyStats):
+    """shutil.copytree() copy_function: *.html is minified on the way, anything else copied."""
+    src, dst = Path(src), Path(dst)
+    if src.suffix != ".html":
+        return shutil.copy2(src, dst)
+    before = src.read_text(encoding="utf-8")
+    after = minify_html(before)
+    stats.add(before, after)
+    atomic_write(dst, after)
+    return dst
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Minify Django HTML templates")
+    ap.add_argument("paths", nargs="+", type=Path, help="Files or directories (*.html, recursively)")
+    ap.add_argument("--check", action="store_true", help="Report savings, change nothing")
+    args = ap.parse_args(argv)
+
+    stats = MinifyStats()
+    for p in args.paths:
+        for f in sorted(p.rglob("*.html")) if p.is_dir() else [p]:
+            minify_file(f, stats, check=args.check)
+    print(f"🗜  {'Would minify' if args.check else 'Minified'} {stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+# builder/faronix_output.py
+"""
+Transactional output writer for the generator.
+
+During a run every generated file is staged next to its target as a hidden
+temp file (".name.<pid>.<n>.tmp", which Django's autoreloader ignores; n
+keeps two stages of one target in the same worker apart) and only moved
+into place by commit():
+
+  1. fsync each staged temp file,
+  2. os.replace() it over the target (each file switches atomically, so an
+     import never sees a half-written view),
+  3. fsync every touched directory once, at the end,
+  4. save the manifest.
+
+abort() deletes the temp files, so a run that fails leaves the tree exactly
+as it was. The manifest maps output path → sha256/size/mtime_ns of what the
+writer last put there; an output whose hash and on-disk stat both match is
+recognised as unchanged without being read.
+"""
+import hashlib
+import itertools
+import json
+import os
+from pathlib import Path
+
+from faronix_artifacts import stage_link
+
+MANIFEST_SCHEMA = 1
+
+
+def sha256_text(s: str) -> str:
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+_tmp_counter = itertools.count()
+
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.{os.getpid()}.{next(_tmp_counter)}.tmp")
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # e.g. platforms without directory fds
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, content: str) -> None:
+    """One-off temp-file + os.replace write (outside a transactional run)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_path(path)
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class OutputWriter:
+    """
+    Manifest schema:
+      {"schema": 1,
+       "outputs": {"/abs/out.py": {"sha256": "...", "size": 123, "mtime_ns": 0}}}
+    """
+
+    def __init__(self, manifest_path: Path, *, fsync: bool = True):
+        self.manifest_path = Path(manifest_path)
+        self.fsync = fsync
+        self.outputs: dict[str, dict] = self._load()
+        # abs path -> {"tmp": str, "sha256": str, "size": int}
+        self.pending: dict[str, dict] = {}
+        # abs path -> sha256 of outputs staged via link() (artifact store objects)
+        self.artifacts: dict[str, str] = {}
+        # abs path -> spec that produced it (None: shared), for every output of the run
+        self.producers: dict[str, str | None] = {}
+        self.unchanged = 0
+
+    # ---------- persistence
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("schema") != MANIFEST_SCHEMA:
+            return {}
+        return data.get("outputs", {})
+
+    def _save(self) -> None:
+        atomic_write(
+            self.manifest_path,
+            json.dumps({"schema": MANIFEST_SCHEMA, "outputs": self.outputs}, indent=2, sort_keys=True),
+        )
+
+    # ---------- staging
+    def _on_disk(self, key: str, digest: str, content: str) -> bool:
+        """True when the target already holds `content`."""
+        path = Path(key)
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        entry = self.outputs.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"] == digest  # manifest is current: no read needed
+        # unknown or touched outside the generator: compare once, then remember it
+        if st.st_size != len(content.encode("utf-8")):
+            return False
+        try:
+            same = path.read_text(encoding="utf-8") == content
+        except (OSError, UnicodeDecodeError):
+            return False
+        if same:
+            self.outputs[key] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        return same
+
+    def write(self, path: Path, content: str, *, spec: str | None = None) -> bool:
+        """Stage `content` for `path`; False when the output is already up to date."""
+        key = str(Path(path).resolve())
+        self.producers[key] = spec
+        digest = sha256_text(content)
+        staged = self.pending.get(key)
+        if staged is not None and staged["sha256"] == digest:
+            return False
+        if staged is None and self._on_disk(key, digest, content):
+            self.unchanged += 1
+            return False
+        target = Path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _tmp_path(target)
+        data = content.encode("utf-8")
+        tmp.write_bytes(data)
+        if staged is not None and staged["tmp"] != str(tmp):
+            Path(staged["tmp"]).unlink(missing_ok=True)  # staged by a pool worker
+        self.pending[key] = {"tmp": str(tmp), "sha256": digest, "size": len(data)}
+        return True
+
+    def link(self, path: Path, source: Path, digest: str, content: str, *, spec: str | None = None) -> bool:
+        """
+        Stage `path` as a hard link to the content-addressed object `source`
+        (see faronix_artifacts). Every call is remembered in self.artifacts,
+        changed or not, so the caller can record artifact history after commit.
+        """
+        key = str(Path(path).resolve())
+        self.artifacts[key] = digest
+        self.producers[key] = spec
+        staged = self.pending.get(key)
+        if staged is not None and staged["sha256"] == digest:
+            return False
+        if staged is None:
+            try:
+                if os.path.samefile(key, source):
+                    self.unchanged += 1
+                    return False
+            except OSError:
+                pass
+        target = Path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _tmp_path(target)
+        stage_link(Path(source), tmp)
+        if staged is not None and staged["tmp"] != str(tmp):
+            Path(staged["tmp"]).unlink(missing_ok=True)
+        self.pending[key] = {"tmp": str(tmp), "sha256": digest, "size": len(content.encode("utf-8"))}
+        return True
+
+    def staged(self, path: Path) -> str | None:
+        """Content staged for `path` in this run, or None."""
+        staged = self.pending.get(str(Path(path).resolve()))
+        if staged is None:
+            return None
+        return Path(staged["tmp"]).read_text(encoding="utf-8")
+
+    # ---------- worker hand-off
+    def export(self) -> dict:
+        """Staged files a pool worker hands to the parent (which commits them)."""
+        pending, self.pending = self.pending, {}
+        artifacts, self.artifacts = self.artifacts, {}
+        producers, self.producers = self.producers, {}
+        return {
+            "pending": pending,
+            "outputs": self.outputs,
+            "unchanged": self.unchanged,
+            "artifacts": artifacts,
+            "producers": producers,
+        }
+
+    def merge(self, exports: list[dict]) -> list[str]:
+        """
+        Adopt worker exports in the order given. When several workers staged
+        the same output the last one wins and the others' temp files are
+        dropped; those paths are returned.
+        """
+        collisions = []
+        for exp in exports:
+            for key, entry in exp["outputs"].items():
+                self.outputs.setdefault(key, entry)
+            for key, staged in exp["pending"].items():
+                old = self.pending.get(key)
+                if old is not None:
+                    collisions.append(key)
+                    if old["tmp"] != staged["tmp"]:
+                        Path(old["tmp"]).unlink(missing_ok=True)
+                self.pending[key] = staged
+            self.unchanged += exp["unchanged"]
+            self.artifacts.update(exp.get("artifacts", {}))
+            self.producers.update(exp.get("producers", {}))
+        return sorted(set(collisions))
+
+    # ---------- transaction end
+    def commit(self) -> int:
+        """Move every staged file into place; returns how many were written."""
+        if not self.pending:
+            if self.outputs:
+                self._save()
+            return 0
+        if self.fsync:
+            for staged in self.pending.values():
+                fd = os.open(staged["tmp"], os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        dirs = set()
+        for key, staged in sorted(self.pending.items()):
+            os.replace(staged["tmp"], key)
+            st = os.stat(key)
+            self.outputs[key] = {"sha256": staged["sha256"], "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            dirs.add(Path(key).parent)
+        if self.fsync:
+            for d in sorted(dirs):
+                _fsync_dir(d)
+        written = len(self.pending)
+        self.pending = {}
+        self._save()
+        print(f"💾 Committed {written} output(s) across {len(dirs)} dir(s), {self.unchanged} unchanged")
+        return written
+
+    def produced(self) -> dict[str, dict]:
+        """After commit: {abs path: {"sha256", "size", "spec"}} for every output of the run."""
+        return {
+            key: {"sha256": self.outputs[key]["sha256"], "size": self.outputs[key]["size"], "spec": spec}
+            for key, spec in self.producers.items()
+            if key in self.outputs
+        }
+
+    def abort(self) -> int:
+        """Drop every staged file; the previous outputs stay untouched."""
+        for staged in self.pending.values():
+            Path(staged["tmp"]).unlink(missing_ok=True)
+        dropped = len(self.pending)
+        self.pending = {}
+        if dropped:
+            print(f"↩️  Discarded {dropped} staged output(s); nothing was written")
+        return dropped
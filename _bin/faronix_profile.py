@@ -0,0 +1,123 @@
+# builder/faronix_profile.py
+"""
+Render profiling for `faronix generate --profile`.
+
+render_to_file() hands one record per call to RenderProfiler.record():
+  template      template name
+  output        output path
+  spec          spec file the render belongs to (if any)
+  status        written | unchanged | cached | planned | not_found
+  skipped       True unless the output was (re)written
+  compile_ms    env.get_template() time: bundle/bytecode load or compile
+                (templates pulled in by {% include %} are compiled lazily and
+                show up in the includer's render_ms on first use)
+  render_ms     tpl.render() time
+  output_bytes  rendered size (0 when skipped before rendering)
+  context_bytes size of the JSON-serialised context
+
+At the end of a run the records go to a JSONL trace and a per-template
+summary table (sorted by total time) is printed.
+"""
+import json
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+
+def context_size(context: dict) -> int:
+    return len(json.dumps(context, default=str))
+
+
+class RenderProfiler:
+    def __init__(self, trace_path: Path):
+        self.trace_path = Path(trace_path)
+        self.records: list[dict] = []
+
+    def record(self, template: str, output: Path, *, status: str, compile_s: float = 0.0,
+               render_s: float = 0.0, output_bytes: int = 0, context_bytes: int = 0,
+               spec: str | None = None) -> None:
+        self.records.append(
+            {
+                "ts": round(time.time(), 3),
+                "pid": os.getpid(),
+                "template": template,
+                "output": str(output),
+                "spec": spec,
+                "status": status,
+                "skipped": status != "written",
+                "compile_ms": round(compile_s * 1000, 3),
+                "render_ms": round(render_s * 1000, 3),
+                "output_bytes": output_bytes,
+                "context_bytes": context_bytes,
+            }
+        )
+
+    # ---------- worker hand-off
+    def export(self) -> list[dict]:
+        records, self.records = self.records, []
+        return records
+
+    def merge(self, exports: list[list[dict]]) -> None:
+        for records in exports:
+            self.records.extend(records)
+
+    # ---------- output
+    def write_trace(self) -> None:
+        self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.trace_path.open("w", encoding="utf-8") as f:
+            for rec in self.records:
+                f.write(json.dumps(rec) + "\n")
+        print(f"🧾 Render trace ({len(self.records)} records) → {self.trace_path}")
+
+    def summary(self) -> list[dict]:
+        per = defaultdict(list)
+        for rec in self.records:
+            per[rec["template"]].append(rec)
+        rows = []
+        for template, recs in per.items():
+            rendered = sorted(r["render_ms"] for r in recs if r["render_ms"])
+            rows.append(
+                {
+                    "template": template,
+                    "calls": len(recs),
+                    "skipped": sum(r["skipped"] for r in recs),
+                    "compile_ms": sum(r["compile_ms"] for r in recs),
+                    "render_ms": sum(rendered),
+                    "render_p50_ms": _pct(rendered, 50),
+                    "render_p95_ms": _pct(rendered, 95),
+                    "output_bytes": sum(r["output_bytes"] for r in recs),
+                    "context_bytes": max(r["context_bytes"] for r in recs),
+                }
+            )
+        rows.sort(key=lambda r: r["compile_ms"] + r["render_ms"], reverse=True)
+        return rows
+
+    def report(self) -> None:
+        rows = self.summary()
+        if not rows:
+            return
+        print(
+            f"\n⏱  {'template':38} {'calls':>5} {'skip':>5} {'compile':>9} {'render':>9} "
+            f"{'p50':>7} {'p95':>7} {'out KB':>8} {'ctx KB':>7}"
+        )
+        for r in rows:
+            print(
+                f"   {r['template'][:38]:38} {r['calls']:>5} {r['skipped']:>5} "
+                f"{r['compile_ms']:>7.1f}ms {r['render_ms']:>7.1f}ms "
+                f"{r['render_p50_ms']:>7.2f} {r['render_p95_ms']:>7.2f} "
+                f"{r['output_bytes'] / 1024:>8.1f} {r['context_bytes'] / 1024:>7.1f}"
+            )
+        total = sum(r["compile_ms"] + r["render_ms"] for r in rows)
+        print(f"   {'total':38} {sum(r['calls'] for r in rows):>5} {'':>5} {total:>17.1f}ms")
+
+    def finish(self) -> None:
+        self.write_trace()
+        self.report()
+
+
+def _pct(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[k]
@@ -0,0 +1,261 @@
+# builder/faronix_registry.py
+"""
+SQLite registry of in-service specs (builder/_in_service.sqlite3).
+
+Replaces rewriting builder/_in_service.json on every sync. The database runs
+in WAL mode with a busy timeout, so parallel generator runs and --watch
+update it in short IMMEDIATE transactions instead of clobbering each other's
+files, and readers never block writers. Specs are indexed by view_slug and
+app_label.
+
+_in_service.json is still written (export_json) for tools that read it, in
+the same schema load() returns:
+
+  {"generated_at": "...Z",
+   "layout": "builder/json/yofaron_layout_base.json" | null,
+   "specs": [{"path": "...", "view_slug": "admin", "app_label": "core",
+              "mtime": 1757641909, "active": true}]}
+
+The first open of a new database imports an existing _in_service.json
+(either the "specs" or the older "scaffolded" schema).
+"""
+import contextlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+SCHEMA_VERSION = 1
+
+DDL = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS specs (
+    path      TEXT PRIMARY KEY,
+    view_slug TEXT,
+    app_label TEXT,
+    mtime     INTEGER,
+    active    INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS specs_view_slug ON specs (view_slug);
+CREATE INDEX IF NOT EXISTS specs_app_label ON specs (app_label);
+"""
+
+
+def _utcnow_iso() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class Registry:
+    def __init__(self, db_path: Path, *, legacy_json: Path | None = None):
+        self.db_path = Path(db_path)
+        self.legacy_json = Path(legacy_json) if legacy_json else None
+        self._conn: sqlite3.Connection | None = None
+        self._pid = None
+        self._depth = 0
+
+    # ---------- connection
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # one connection per process: a forked pool worker must not reuse the parent's
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = self._connect()
+            self._pid = os.getpid()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(DDL)  # idempotent
+        with self._tx(conn):
+            # checked inside the write lock: exactly one process imports
+            if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                self._import_legacy(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return conn
+
+    @contextlib.contextmanager
+    def _tx(self, conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Write transaction (BEGIN IMMEDIATE: other writers wait, readers don't).
+        Nested use joins the outer transaction. generated_at is bumped when
+        the transaction changed anything.
+        """
+        if self._depth:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+        conn = self.conn
+        before = conn.total_changes
+        self._depth = 1
+        try:
+            with self._tx(conn):
+                yield self
+                if conn.total_changes != before:
+                    self._set_meta("generated_at", _utcnow_iso())
+        finally:
+            self._depth = 0
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    # ---------- legacy import
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        if self.legacy_json is None or not self.legacy_json.exists():
+            return
+        try:
+            data = json.loads(self.legacy_json.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            print(f"⚠️  {self.legacy_json.name} malformed; not imported")
+            return
+        if not isinstance(data, dict):
+            return
+        rows = [
+            (e["path"], e.get("view_slug"), e.get("app_label"), e.get("mtime"), int(e.get("active", True)))
+            for e in data.get("specs", [])
+            if isinstance(e, dict) and e.get("path")
+        ]
+        rows += [(p, None, None, None, 1) for p in data.get("scaffolded", [])]
+        conn.executemany("INSERT OR IGNORE INTO specs VALUES (?, ?, ?, ?, ?)", rows)
+        for key in ("layout", "generated_at"):
+            if data.get(key):
+                conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, data[key]))
+        print(f"📥 Imported {len(rows)} spec(s) from {self.legacy_json.name} → {self.db_path.name}")
+
+    # ---------- meta
+    def _get_meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str | None) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def layout(self) -> str | None:
+        return self._get_meta("layout")
+
+    def set_layout(self, path: str | None) -> None:
+        with self.transaction():
+            if self.layout() != path:
+                self._set_meta("layout", path)
+
+    # ---------- specs
+    def upsert_spec(self, path: str, *, view_slug=None, app_label=None, mtime=None) -> bool:
+        """Insert or refresh one spec; new specs start active, existing flags are kept. True if new."""
+        with self.transaction():
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO specs (path, view_slug, app_label, mtime) VALUES (?, ?, ?, ?)",
+                (path, view_slug, app_label, mtime),
+            )
+            if cur.rowcount:
+                return True
+            self.conn.execute(
+                "UPDATE specs SET view_slug = ?, app_label = ?, mtime = ? WHERE path = ?"
+                " AND (view_slug IS NOT ? OR app_label IS NOT ? OR mtime IS NOT ?)",
+                (view_slug, app_label, mtime, path, view_slug, app_label, mtime),
+            )
+            return False
+
+    def set_active(self, path: str, active: bool) -> bool:
+        with self.transaction():
+            cur = self.conn.execute(
+                "UPDATE specs SET active = ? WHERE path = ? AND active != ?", (int(active), path, int(active))
+            )
+            return cur.rowcount > 0
+
+    def remove(self, path: str) -> bool:
+        with self.transaction():
+            return self.conn.execute("DELETE FROM specs WHERE path = ?", (path,)).rowcount > 0
+
+    def prune_missing(self) -> list[str]:
+        with self.transaction():
+            gone = [r[0] for r in self.conn.execute("SELECT path FROM specs") if not Path(r[0]).exists()]
+            self.conn.executemany("DELETE FROM specs WHERE path = ?", [(p,) for p in gone])
+        return gone
+
+    @staticmethod
+    def _row(r: sqlite3.Row) -> dict:
+        e = {"path": r["path"], "active": bool(r["active"])}
+        for k in ("view_slug", "app_label", "mtime"):
+            if r[k] is not None:
+                e[k] = r[k]
+        return e
+
+    def specs(self, *, active_only: bool = False) -> list[dict]:
+        sql = "SELECT * FROM specs" + (" WHERE active = 1" if active_only else "") + " ORDER BY path"
+        return [self._row(r) for r in self.conn.execute(sql)]
+
+    def by_view_slug(self, view_slug: str) -> list[dict]:
+        rows = self.conn.execute("SELECT * FROM specs WHERE view_slug = ? ORDER BY path", (view_slug,))
+        return [self._row(r) for r in rows]
+
+    def by_app_label(self, app_label: str) -> list[dict]:
+        rows = self.conn.execute("SELECT * FROM specs WHERE app_label = ? ORDER BY path", (app_label,))
+        return [self._row(r) for r in rows]
+
+    # ---------- compatibility
+    def load(self) -> dict:
+        """The whole registry in the _in_service.json schema (one consistent snapshot)."""
+        conn = self.conn
+        if not self._depth:
+            conn.execute("BEGIN")  # read snapshot (WAL: does not block writers)
+        try:
+            return {
+                "generated_at": self._get_meta("generated_at") or _utcnow_iso(),
+                "layout": self.layout(),
+                "specs": self.specs(),
+            }
+        finally:
+            if not self._depth:
+                conn.execute("COMMIT")
+
+    def replace(self, reg: dict) -> None:
+        """Make the registry equal to `reg` (load() schema), in one transaction."""
+        with self.transaction():
+            self._set_meta("layout", reg.get("layout"))
+            keep = {e["path"] for e in reg.get("specs", []) if e.get("path")}
+            for (path,) in self.conn.execute("SELECT path FROM specs").fetchall():
+                if path not in keep:
+                    self.conn.execute("DELETE FROM specs WHERE path = ?", (path,))
+            for e in reg.get("specs", []):
+                if not e.get("path"):
+                    continue
+                self.upsert_spec(
+                    e["path"], view_slug=e.get("view_slug"), app_label=e.get("app_label"), mtime=e.get("mtime")
+                )
+                self.set_active(e["path"], bool(e.get("active", True)))
+
+    def export_json(self, path: Path) -> bool:
+        """Write the registry to `path` (atomically, only when it changed). True if written."""
+        path = Path(path)
+        text = json.dumps(self.load(), indent=2)
+        try:
+            if path.read_text(encoding="utf-8") == text:
+                return False
+        except OSError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+        return True
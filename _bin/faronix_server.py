@@ -0,0 +1,248 @@
+# builder/faronix_server.py
+"""
+Warm generator server (`faronix serve-builder`) and its thin client.
+
+A cold `faronix generate` imports Jinja, builds the Environment, loads
+yofaron_config and the template bundles and indexes the components before it
+renders anything. The server does that once and then answers requests on a
+Unix domain socket, so editor integrations and CI loops pay only for the
+render itself:
+
+    python faronix_server.py serve                  # foreground; Ctrl-C stops it
+    python faronix_server.py generate [generator args...]
+    python faronix_server.py validate [spec...]
+    python faronix_server.py index
+    python faronix_server.py sync
+    python faronix_server.py ping | stop
+
+The client imports nothing but the standard library. When no server is
+listening it runs the command in-process instead (same output, cold start).
+
+Protocol: one JSON request line {"cmd", "args", "cwd"} per connection; the
+server answers with JSON lines {"out": "..."} while the command runs and a
+final {"exit": code}. Requests are served one at a time (the generator keeps
+per-run state in module globals) from the client's working directory.
+The socket defaults to .faronix-builder.sock next to this file; override it
+with FARONIX_BUILDER_SOCKET. Changes to the builder's own .py files or to
+yofaron_config need a server restart; the server warns when it sees them.
+"""
+import json
+import logging
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+SOCKET_PATH = Path(os.getenv("FARONIX_BUILDER_SOCKET", HERE / ".faronix-builder.sock"))
+COMMANDS = ("generate", "validate", "index", "sync", "ping", "stop")
+
+
+# ---------- server
+class _SocketOut:
+    """stdout/stderr replacement that forwards whole lines to the client."""
+
+    def __init__(self, conn: socket.socket):
+        self.conn = conn
+        self.pid = os.getpid()
+        self.buf = ""
+
+    def write(self, s: str) -> int:
+        if os.getpid() != self.pid:
+            # a forked pool worker inherited us: keep its output off the socket
+            return sys.__stdout__.write(s)
+        self.buf += s
+        if "\n" in self.buf:
+            lines, _, self.buf = self.buf.rpartition("\n")
+            self._send({"out": lines + "\n"})
+        return len(s)
+
+    def flush(self) -> None:
+        if self.buf and os.getpid() == self.pid:
+            self._send({"out": self.buf})
+            self.buf = ""
+
+    def isatty(self) -> bool:
+        return False
+
+    def _send(self, msg: dict) -> None:
+        try:
+            self.conn.sendall((json.dumps(msg) + "\n").encode("utf-8"))
+        except OSError:
+            pass  # client went away; finish the command anyway
+
+
+class _CurrentStderr(logging.StreamHandler):
+    """Log handler bound to whatever sys.stderr is now (the current client)."""
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def _source_mtime() -> int:
+    return max((p.stat().st_mtime_ns for p in HERE.glob("*.py")), default=0)
+
+
+def _dispatch(gen, cmd: str, args: list[str]) -> int:
+    if cmd == "generate":
+        return gen.main(args)
+    if cmd == "validate":
+        from faronix_validate import main as validate_main
+
+        return validate_main(args)
+    if cmd == "index":
+        gen.load_component_index(refresh=True)
+        return 0
+    if cmd == "sync":
+        reg = gen.sync_registry()
+        print(f"📘 Registry synced ({len(gen.active_spec_paths(reg))} active specs)")
+        return 0
+    print(f"❌ Unknown command: {cmd}")
+    return 2
+
+
+def _handle(gen, conn: socket.socket, started_mtime: int) -> bool:
+    """Serve one connection; returns False when the server should stop."""
+    with conn, conn.makefile("r", encoding="utf-8") as rfile:
+        try:
+            req = json.loads(rfile.readline() or "{}")
+        except ValueError:
+            req = {}
+        cmd, args = req.get("cmd"), req.get("args") or []
+        out = _SocketOut(conn)
+        if cmd == "ping":
+            out._send({"out": f"pong (pid {os.getpid()})\n"})
+            out._send({"exit": 0})
+            return True
+        if cmd == "stop":
+            out._send({"out": "🛑 builder server stopping\n"})
+            out._send({"exit": 0})
+            return False
+
+        t0 = time.perf_counter()
+        old_cwd = os.getcwd()
+        saved = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr = out
+        try:
+            os.chdir(req.get("cwd") or old_cwd)
+            if _source_mtime() != started_mtime:
+                print("⚠️  Builder sources changed since the server started; restart it to pick them up")
+            code = _dispatch(gen, cmd, args)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if e.code not in (None, 0) and not isinstance(e.code, int):
+                print(e.code)
+        except Exception:
+            import traceback
+
+            traceback.print_exc()
+            code = 1
+        finally:
+            out.flush()
+            sys.stdout, sys.stderr = saved
+            os.chdir(old_cwd)
+        out._send({"exit": code})
+        print(f"[serve-builder] {cmd} {' '.join(args)} → {code} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        return True
+
+
+def serve(path: Path = SOCKET_PATH) -> int:
+    if _connect(path) is not None:
+        print(f"ℹ️  A builder server is already listening on {path}")
+        return 1
+    path.unlink(missing_ok=True)  # stale socket from a crashed server
+
+    t0 = time.perf_counter()
+    sys.path.insert(0, str(HERE))
+    import faronix_generator as gen
+
+    # before any request: generator main()'s basicConfig() then only sets the level
+    logging.basicConfig(handlers=[_CurrentStderr()], format="%(levelname)s %(name)s: %(message)s")
+    gen.load_component_index()
+    started_mtime = _source_mtime()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    os.chmod(path, 0o600)
+    server.listen(16)
+    print(f"🔥 Builder warm in {(time.perf_counter() - t0) * 1000:.0f} ms, listening on {path}")
+    try:
+        while True:
+            conn, _ = server.accept()
+            if not _handle(gen, conn, started_mtime):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        path.unlink(missing_ok=True)
+    return 0
+
+
+# ---------- client
+def _connect(path: Path) -> socket.socket | None:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(cmd: str, args: list[str], path: Path = SOCKET_PATH) -> int | None:
+    """Run `cmd` on the server, streaming its output; None when no server is listening."""
+    sock = _connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile("r", encoding="utf-8") as rfile:
+        sock.sendall((json.dumps({"cmd": cmd, "args": args, "cwd": os.getcwd()}) + "\n").encode("utf-8"))
+        for line in rfile:
+            msg = json.loads(line)
+            if "out" in msg:
+                sys.stdout.write(msg["out"])
+                sys.stdout.flush()
+            elif "exit" in msg:
+                return msg["exit"]
+    print("❌ Builder server closed the connection")
+    return 1
+
+
+def _run_local(cmd: str, args: list[str]) -> int:
+    sys.path.insert(0, str(HERE))
+    import faronix_generator as gen
+
+    try:
+        return _dispatch(gen, cmd, args)
+    except SystemExit as e:
+        if isinstance(e.code, int) or e.code is None:
+            return e.code or 0
+        print(e.code)
+        return 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help") or argv[0] not in ("serve", *COMMANDS):
+        print(__doc__)
+        return 0 if argv and argv[0] in ("-h", "--help") else 2
+    cmd, args = argv[0], argv[1:]
+    if cmd == "serve":
+        return serve()
+    code = request(cmd, args)
+    if code is not None:
+        return code
+    if cmd in ("ping", "stop"):
+        print(f"ℹ️  No builder server on {SOCKET_PATH}")
+        return 1
+    return _run_local(cmd, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# builder/faronix_speccatalog.py
+"""
+Parsed-spec catalog for JSON_DIR.
+
+Each spec is parsed once and kept (with its derived metadata) in a pickle
+under builder/, keyed by (path, mtime_ns, size). discover_specs(),
+latest_spec(), registry sync and the URL autogen read from here, so a sync
+costs one directory scan and re-parses only specs that changed on disk.
+
+Entries are plain dicts:
+  {"path", "mtime_ns", "size", "data", "error",
+   "kind", "view_name", "view_slug", "app_label"}
+"data" is shared between callers: treat it as read-only.
+"""
+import os
+import pickle
+import re
+from pathlib import Path
+
+CATALOG_SCHEMA = 1
+SKIP_NAMES = {"_in_service.json"}
+
+
+def _slug(s: str) -> str:
+    return re.sub(r"\W+", "_", s.strip().lower())
+
+
+def _entry(path: Path, st: os.stat_result, reader) -> dict:
+    entry = {
+        "path": str(path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "data": None,
+        "error": None,
+        "kind": None,
+        "view_name": None,
+        "view_slug": None,
+        "app_label": None,
+    }
+    try:
+        data = reader(path)
+    except Exception as e:
+        entry["error"] = str(e)
+        return entry
+    if not isinstance(data, dict):
+        entry["error"] = "spec is not a JSON object"
+        return entry
+    entry["data"] = data
+    entry["kind"] = "layout" if data.get("kind") == "layout" else "module"
+    entry["view_name"] = data.get("view_name")
+    if data.get("view_slug"):
+        entry["view_slug"] = data["view_slug"]
+    elif data.get("view_name"):
+        entry["view_slug"] = _slug(data["view_name"])
+    entry["app_label"] = data.get("app_label", "core")
+    return entry
+
+
+class SpecCatalog:
+    def __init__(self, path: Path, json_dir: Path, reader):
+        self.path = Path(path)
+        self.json_dir = Path(json_dir)
+        self.reader = reader
+        self.entries: dict[str, dict] = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict:
+        try:
+            with self.path.open("rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return {}
+        if not isinstance(data, dict) or data.get("schema") != CATALOG_SCHEMA:
+            return {}
+        return data.get("entries", {})
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # per-process temp name: parallel runs and watchers save concurrently
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            pickle.dump({"schema": CATALOG_SCHEMA, "entries": self.entries}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def _refresh(self, path: Path, st: os.stat_result) -> dict:
+        key = str(path)
+        entry = self.entries.get(key)
+        if entry is None or entry["mtime_ns"] != st.st_mtime_ns or entry["size"] != st.st_size:
+            entry = self.entries[key] = _entry(path, st, self.reader)
+            self._dirty = True
+        return entry
+
+    def scan(self) -> list[dict]:
+        """Every *.json / *.jsonc spec in json_dir, newest first (one scandir)."""
+        found = []
+        seen = set()
+        try:
+            it = os.scandir(self.json_dir)
+        except FileNotFoundError:
+            it = None
+        if it is not None:
+            with it:
+                for de in it:
+                    if de.name in SKIP_NAMES or ".json" not in de.name or not de.is_file():
+                        continue
+                    path = self.json_dir / de.name
+                    seen.add(str(path))
+                    found.append(self._refresh(path, de.stat()))
+        for key in [k for k in self.entries if Path(k).parent == self.json_dir and k not in seen]:
+            del self.entries[key]
+            self._dirty = True
+        self.save()
+        found.sort(key=lambda e: e["mtime_ns"], reverse=True)
+        return found
+
+    def get(self, path: Path) -> dict | None:
+        """Catalog entry for one spec (re-parsed only if it changed), None if missing."""
+        path = Path(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        entry = self._refresh(path, st)
+        self.save()
+        return entry
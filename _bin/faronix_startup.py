@@ -7,12 +7,12 @@ import sys
 import json
 import time
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 
 # Add builder path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 # Configuration
+from faronix_templating import app_env
 from yofaron_config import (
     ROOT,
     PROJECT_ROOT,
@@ -49,13 +49,7 @@ MODEL_TYPE_MAP = MODEL_TYPE_MAP
 MODULE_DIRS = MODULE_DIRS
 
 
-env = Environment(
-    loader=FileSystemLoader(
-        [str(TPL_PY_DIR), str(TPL_HTML_DIR), str(ROOT), str(PROJECT_ROOT), "."]
-    ),
-    trim_blocks=True,
-    lstrip_blocks=True,
-)
+env = app_env(TPL_PY_DIR, TPL_HTML_DIR)
 env.globals["BUILDER_DIR"] = BUILDER_DIR
 env.globals["DEFAULT_CONFIG"] = DEFAULT_CONFIG
 env.globals["MODEL_TYPE_MAP"] = MODEL_TYPE_MAP
@@ -102,8 +96,20 @@ crispy-bootstrap5
     BASECOPY = Path(".", "builder", "_filecopy", "handler_base")
     PATHBASE = Path(".", "templates")
     if BASECOPY.exists():
-        shutil.copytree(BASECOPY, PATHBASE, dirs_exist_ok=True)
-        print(f"📥 Copied handler_base → {PATHBASE}")
+        if os.getenv("FARONIX_MINIFY_BASE") == "1":
+            from faronix_minify import MinifyStats, copy_minified
+
+            # minified while copying: each template is written once
+            stats = MinifyStats()
+            shutil.copytree(
+                BASECOPY, PATHBASE, dirs_exist_ok=True,
+                copy_function=lambda src, dst: copy_minified(src, dst, stats=stats),
+            )
+            print(f"📥 Copied handler_base → {PATHBASE}")
+            print(f"🗜  Minified handler_base: {stats}")
+        else:
+            shutil.copytree(BASECOPY, PATHBASE, dirs_exist_ok=True)
+            print(f"📥 Copied handler_base → {PATHBASE}")
     CORECOPY = Path(".", "builder", "_filecopy", "handler_core")
     PATHCORE = Path(".", "core")
     if CORECOPY.exists():
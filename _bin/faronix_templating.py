@@ -0,0 +1,354 @@
+# builder/faronix_templating.py
+"""
+Shared Jinja plumbing for every faronix generator/builder.
+
+- register_namespace() / shared_env(): the template environment every builder
+  uses. Templates are addressed as "<namespace>/<name>" (py/, html/, nginx/,
+  systemd/, fstab/); each namespace has explicit root directories that are
+  indexed once, so resolving a name is a dict lookup and a miss is
+  remembered until one of the root directories changes. One Environment
+  (with the shared camel/pyrepr filters and a large in-memory template
+  cache) exists per option set, e.g. the generators' trim_blocks and the
+  system builders' defaults.
+- compile_bundle(): precompile a template tree into a zip of Python modules
+  (what `faronix templates compile` runs).
+
+Bundled templates are only used while their source file is unchanged
+(mtime_ns + size recorded at compile time) and the bundle was compiled with
+the environment's options; anything else is served from source, so a stale
+bundle never renders old output.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from jinja2 import (
+    BaseLoader,
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    ModuleLoader,
+    PrefixLoader,
+    TemplateNotFound,
+    TemplateSyntaxError,
+)
+
+CACHE_ROOT = Path(
+    os.getenv("FARONIX_JINJA_CACHE")
+    or Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "faronix" / "jinja"
+)
+TEMPLATE_SUFFIXES = (".tpl", ".py", ".html")
+NAMESPACES = ("py", "html", "nginx", "systemd", "fstab")
+TEMPLATE_CACHE_SIZE = int(os.getenv("FARONIX_TEMPLATE_CACHE", "2000"))
+# how often (seconds) a cached miss may re-check the roots for new files
+RESCAN_INTERVAL = float(os.getenv("FARONIX_TEMPLATE_RESCAN", "1.0"))
+# names from before namespacing (ctl_django specs, component index paths)
+LEGACY_PREFIXES = {"tpl_py/": "py/", "tpl_html/": "html/"}
+
+
+# ---------- shared filters
+def camel(s: str) -> str:
+    parts = re.split(r"[^a-zA-Z0-9]+", str(s))
+    return "".join(p[:1].upper() + p[1:] for p in parts if p)
+
+
+def pyrepr(v):
+    return repr(v)
+
+
+FILTERS = {"camel": camel, "pyrepr": pyrepr}
+
+
+def bytecode_cache(namespace: str) -> FileSystemBytecodeCache | None:
+    """
+    Bytecode cache shared by every process using `namespace`. Jinja stores the
+    source checksum with each entry, so an edited template is recompiled.
+    """
+    directory = CACHE_ROOT / namespace
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None  # read-only home etc.: compile in memory as before
+    return FileSystemBytecodeCache(str(directory))
+
+
+def bundle_path(root: Path, namespace: str) -> Path:
+    return Path(root) / f"_compiled_{namespace}.zip"
+
+
+def _manifest_path(bundle: Path) -> Path:
+    return bundle.with_suffix(".json")
+
+
+class BundleLoader(ModuleLoader):
+    """ModuleLoader that only serves templates whose source is unchanged."""
+
+    def __init__(self, bundle: Path):
+        super().__init__(str(bundle))
+        manifest = json.loads(_manifest_path(bundle).read_text(encoding="utf-8"))
+        self.manifest: dict = manifest.get("templates", {})
+        self.options: dict | None = manifest.get("options")
+
+    def _fresh(self, name: str) -> bool:
+        entry = self.manifest.get(name)
+        if entry is None:
+            return False
+        try:
+            st = os.stat(entry["path"])
+        except OSError:
+            return False
+        return st.st_mtime_ns == entry["mtime_ns"] and st.st_size == entry["size"]
+
+    def get_source(self, environment, template):
+        # no sources in the bundle; let ChoiceLoader ask the FileSystemLoader
+        raise TemplateNotFound(template)
+
+    def load(self, environment, name, globals=None):
+        if not self._fresh(name):
+            raise TemplateNotFound(name)
+        template = super().load(environment, name, globals)
+        # let env.cache drop it once the source is edited (long-running watch mode)
+        template._uptodate = lambda: self._fresh(name)
+        return template
+
+
+class IndexedLoader(BaseLoader):
+    """
+    Loader over explicit root directories with a name -> path index built by
+    one walk. Hits are a dict lookup; misses are cached, and at most every
+    RESCAN_INTERVAL seconds a miss checks whether a directory under the roots
+    changed (and rescans if so), so probing for optional templates never walks
+    the tree again.
+    """
+
+    def __init__(self, roots):
+        self.roots = [Path(r).resolve() for r in roots]
+        self.index: dict[str, str] = {}
+        self.misses: set[str] = set()
+        self._dirs: dict[str, int] = {}
+        self._checked = 0.0
+        self._scan()
+
+    def _scan(self) -> None:
+        index, dirs = {}, {}
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not d.startswith((".", "__"))]
+                try:
+                    dirs[dirpath] = os.stat(dirpath).st_mtime_ns
+                except OSError:
+                    continue
+                rel = Path(dirpath).relative_to(root).as_posix()
+                for f in filenames:
+                    name = f if rel == "." else f"{rel}/{f}"
+                    index.setdefault(name, os.path.join(dirpath, f))  # first root wins
+        self.index, self._dirs, self.misses = index, dirs, set()
+
+    def _changed(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked < RESCAN_INTERVAL:
+            return False
+        self._checked = now
+        for d, mtime in self._dirs.items():
+            try:
+                if os.stat(d).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return any(str(r) not in self._dirs and r.is_dir() for r in self.roots)
+
+    def lookup(self, template: str) -> str | None:
+        """Path of `template`, or None (negative results are cached)."""
+        path = self.index.get(template)
+        if path is not None:
+            return path
+        changed = self._changed()
+        if template in self.misses and not changed:
+            return None
+        if changed:
+            self._scan()
+        path = self.index.get(template)
+        if path is None:
+            self.misses.add(template)
+        return path
+
+    def get_source(self, environment, template):
+        path = self.lookup(template)
+        if path is None:
+            raise TemplateNotFound(template)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, encoding="utf-8") as f:
+                source = f.read()
+        except OSError:
+            self.index.pop(template, None)  # deleted since the scan
+            raise TemplateNotFound(template)
+
+        def uptodate() -> bool:
+            try:
+                return os.path.getmtime(path) == mtime
+            except OSError:
+                return False
+
+        return source, path, uptodate
+
+    def list_templates(self):
+        return sorted(self.index)
+
+
+class NamespaceLoader(PrefixLoader):
+    """
+    PrefixLoader over the registered namespaces. Names without a namespace
+    prefix are looked up in the `fallback` namespaces, in order.
+    """
+
+    def __init__(self, options: dict, fallback=()):
+        self.options = options
+        self.fallback = tuple(fallback)
+        self.delimiter = "/"
+        self._generation = -1
+        self._mapping: dict = {}
+
+    @property
+    def mapping(self) -> dict:
+        if self._generation != _generation:
+            self._mapping = {ns: _namespace_loader(ns, self.options) for ns in _namespaces}
+            self._generation = _generation
+        return self._mapping
+
+    def get_loader(self, template):
+        template = namespaced(template)
+        prefix, _, name = template.partition(self.delimiter)
+        mapping = self.mapping
+        if name and prefix in mapping:
+            return mapping[prefix], name
+        for ns in self.fallback:
+            if ns in mapping and _namespaces[ns]["loader"].lookup(template) is not None:
+                return mapping[ns], template
+        raise TemplateNotFound(template)
+
+
+def namespaced(name: str) -> str:
+    """Map pre-namespace names ("tpl_html/forms/X.tpl.html") to "html/forms/X.tpl.html"."""
+    for old, new in LEGACY_PREFIXES.items():
+        if name.startswith(old):
+            return new + name[len(old):]
+    return name
+
+
+# ---------- namespace registry (module state: one per process)
+_namespaces: dict[str, dict] = {}  # name -> {"loader": IndexedLoader, "bundle": Path | None}
+_generation = 0
+_envs: dict[tuple, Environment] = {}
+
+
+def register_namespace(name: str, roots, *, bundle: Path | None = None) -> None:
+    """
+    Make templates under `roots` available as "<name>/...". Roots must be
+    explicit template directories; the project root or the working directory
+    would make every miss walk an unrelated tree. Re-registering the same
+    roots is a no-op.
+    """
+    global _generation
+    roots = [Path(r) for r in roots]
+    for r in roots:
+        if str(r) in ("", ".") or r.resolve() in (Path.cwd(), Path.home(), Path("/")):
+            raise ValueError(f"template root for {name!r} must be a template directory, not {r}")
+    current = _namespaces.get(name)
+    resolved = [r.resolve() for r in roots]
+    if current and current["loader"].roots == resolved and current["bundle"] == bundle:
+        return
+    _namespaces[name] = {"loader": IndexedLoader(resolved), "bundle": Path(bundle) if bundle else None}
+    _generation += 1
+
+
+def _options_key(options: dict) -> str:
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _namespace_loader(name: str, options: dict):
+    ns = _namespaces[name]
+    bundle = ns["bundle"]
+    if bundle is not None and bundle.exists() and _manifest_path(bundle).exists():
+        try:
+            loader = BundleLoader(bundle)
+            if loader.options in (None, options):  # None: bundle predates recorded options
+                return ChoiceLoader([loader, ns["loader"]])
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring template bundle {bundle}: {e}")
+    return ns["loader"]
+
+
+def shared_env(*, fallback=(), **options) -> Environment:
+    """
+    The process-wide Environment for `options` over every registered
+    namespace. Bare names (no namespace prefix) resolve in `fallback`.
+    """
+    key = (tuple(fallback), _options_key(options))
+    env = _envs.get(key)
+    if env is None:
+        env = Environment(
+            loader=NamespaceLoader(options, fallback),
+            bytecode_cache=bytecode_cache(f"shared-{key[1]}"),
+            cache_size=TEMPLATE_CACHE_SIZE,
+            **options,
+        )
+        env.filters.update(FILTERS)
+        _envs[key] = env
+    return env
+
+
+APP_OPTIONS = {"trim_blocks": True, "lstrip_blocks": True}
+
+
+def app_env(tpl_py_dir: Path, tpl_html_dir: Path) -> Environment:
+    """
+    Environment of the app generators (faronix_generator, faronix_startup,
+    ctl_django): py/ and html/ registered with their bundles under tpl/,
+    and bare names resolved in py/ then html/.
+    """
+    tpl_dir = Path(tpl_py_dir).parent
+    register_namespace("py", [tpl_py_dir], bundle=bundle_path(tpl_dir, "py"))
+    register_namespace("html", [tpl_html_dir], bundle=bundle_path(tpl_dir, "html"))
+    return shared_env(fallback=("py", "html"), **APP_OPTIONS)
+
+
+def compile_bundle(search_path, target: Path, **options) -> tuple[int, list[str]]:
+    """
+    Compile every template under `search_path` into the zip `target` (plus a
+    freshness manifest next to it). `options` must match the Environment the
+    bundle will be loaded into (trim_blocks etc. are baked into the code).
+    Returns (compiled_count, skipped) where skipped lists templates Jinja
+    could not parse (e.g. Django-syntax runtime components).
+    """
+    target = Path(target)
+    env = Environment(loader=FileSystemLoader([str(p) for p in search_path]), **options)
+    env.filters.update(FILTERS)
+    names = env.list_templates(
+        filter_func=lambda n: n.endswith(TEMPLATE_SUFFIXES)
+        and not Path(n).name.startswith("_compiled_")
+    )
+    templates, skipped = {}, []
+    tmp = target.with_name(target.name + ".tmp")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with ZipFile(tmp, "w", ZIP_DEFLATED) as zf:
+        for name in names:
+            source, filename, _ = env.loader.get_source(env, name)
+            try:
+                code = env.compile(source, name, filename, raw=True, defer_init=True)
+            except TemplateSyntaxError as e:
+                skipped.append(f"{name}: {e.message}")
+                continue
+            zf.writestr(ModuleLoader.get_module_filename(name), code)
+            st = os.stat(filename)
+            templates[name] = {"path": filename, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    os.replace(tmp, target)
+    _manifest_path(target).write_text(
+        json.dumps({"templates": templates, "options": options}, indent=2), encoding="utf-8"
+    )
+    return len(templates), skipped
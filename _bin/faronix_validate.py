@@ -1,81 +1,334 @@
-from email import errors
-import json, sys
-from pathlib import Path
+# builder/faronix_validate.py
+"""
+Spec validation engine.
+
+SPEC_SCHEMA is compiled once per component index into a Validator: a flat
+list of checker closures plus a frozen set of every indexed component name,
+so checking a spec is a handful of dict lookups. The generator's
+validate_ctx() and validate_spec() and the batch CLI below all go through it.
+
+    python faronix_validate.py                    # every spec in JSON_DIR
+    python faronix_validate.py a.json b.jsonc     # (relative to JSON_DIR)
+    python faronix_validate.py --jobs 8 --json
+    python faronix_validate.py --strict           # + component context checks
+
+Batch runs parse and check specs in a process pool once there are enough of
+them to pay for it, and report errors per spec. Problems with the component
+library itself (missing runtime components) are reported once, not per spec.
 
-ROOT = Path(__file__).resolve().parent
-INDEX_PATH = ROOT / "tpl" / "component_index.json"
+--strict also checks that each tab's component config supplies the
+attributes the component reads without a default ("table.headers" for
+DataTable), as recorded in the component catalog; attributes the view fills
+in at request time (SPEC_SCHEMA["runtime_attrs"]) are exempt.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 # minimal runtime components we expect in your /tpl library
 REQUIRED_FORM_COMPONENTS = {"TextField.tpl", "CheckboxField.tpl"}
 GENERIC_TABLE_COMPONENT = "DataTable.tpl"
 
+# Raw specs are checked the way load_ctx() will read them: app_label defaults
+# from view_name and an empty form_template is auto-picked, so neither is required.
+SPEC_SCHEMA = {
+    "required": ("view_name", "tabs"),
+    "list_keys": ("tabs",),
+    "bool_keys": ("minify",),  # per-spec output options
+    "tab_key": "slug",  # required and unique per spec
+    "tab_strings": ("form_template",),  # strings when set
+    "tab_components": (("table", "component"),),
+    "model_lists": ("fields",),  # must be lists when a model is declared
+    "runtime_attrs": {"table": ("rows",)},  # supplied by the view, not the spec (--strict)
+    "cache_vary": ("rank", "lti", "user"),  # tab "cache": {"ttl", "vary", "invalidate_on"}
+}
+PARALLEL_MIN = 256  # below this, a pool costs more than it saves
 
-def main() -> int:
-    if len(sys.argv) < 2:
-        print("Usage: yofaron_validator.py <spec.json>")
-        return 2
 
-    spec_path = ROOT / sys.argv[1]
-    if not spec_path.exists():
-        print(f"❌ Spec not found: {spec_path}")
-        return 2
-    if not INDEX_PATH.exists():
-        print(f"❌ Missing {INDEX_PATH} (run generate_component_index.py first)")
-        return 2
+def _category(comps: dict, name: str) -> list[str]:
+    # component_index.json keys categories as "html/<dir>"; older indexes used "<dir>"
+    return comps.get(f"html/{name}", comps.get(name, []))
 
-    spec = json.loads(spec_path.read_text(encoding="utf-8"))
-    index = json.loads(INDEX_PATH.read_text(encoding="utf-8"))
-    comps = index.get("components", {})
 
+def _index_errors(comps: dict) -> list[str]:
     errors = []
-
-    # required top-level keys
-    for k in ("app_label", "view_name", "tabs"):
-        if k not in spec:
-            errors.append(f"Spec missing key: {k}")
-    # tab checks
-    seen = set()
-    for t in spec.get("tabs", []):
-        slug = t.get("slug")
-        if not slug:
-            errors.append("tab missing slug")
-            continue
-        if slug in seen:
-            errors.append(f"duplicate tab slug: {slug}")
-        seen.add(slug)
-
-        if "form_template" not in t or not isinstance(t["form_template"], str):
-            errors.append(f"tab {slug} missing valid form_template")
-
-        # table component exists?
-        comp = (t.get("table") or {}).get("component")
-        if comp:
-            present = any(comp in names for names in comps.values())
-            if not present:
-                errors.append(f"tab {slug} references missing component '{comp}'")
-
-    # model sanity
-    if spec.get("model") and not isinstance(spec.get("fields"), list):
-        errors.append("model declared but 'fields' is not a list")
-
-    # runtime requirements
-    have_forms = set(comps.get("forms", []))
+    have_forms = set(_category(comps, "forms"))
     missing = sorted(REQUIRED_FORM_COMPONENTS - have_forms)
     if missing:
         errors.append("missing runtime /tpl/forms components: " + ", ".join(missing))
-
-    have_tables = set(comps.get("tables", []))
-    if GENERIC_TABLE_COMPONENT not in have_tables:
+    if GENERIC_TABLE_COMPONENT not in set(_category(comps, "tables")):
         errors.append(f"missing runtime /tpl/tables/{GENERIC_TABLE_COMPONENT}.html")
+    return errors
+
+
+def _requirements(index: dict, schema: dict) -> dict[str, dict[str, frozenset]]:
+    """{component: {config key: attributes the spec must supply}} from the catalog."""
+    runtime = schema.get("runtime_attrs", {})
+    needs: dict[str, dict[str, frozenset]] = {}
+    for key, entry in index.get("templates", {}).items():
+        if not key.startswith("html/"):
+            continue
+        for outer, _ in schema["tab_components"]:
+            attrs = frozenset(
+                a.split(".", 1)[1] for a in entry.get("attributes", []) if a.startswith(f"{outer}.")
+            ) - set(runtime.get(outer, ()))
+            if attrs:
+                needs.setdefault(entry["component"], {})[outer] = attrs
+    return needs
+
+
+def _compile(schema: dict, components: frozenset | None, needs: dict | None = None) -> list:
+    """Schema -> checker functions, each `check(spec, errors)`."""
+    checks = []
+
+    required = tuple(schema["required"])
+
+    def check_required(spec, errors):
+        for k in required:
+            if k not in spec:
+                errors.append(f"Spec missing key: {k}")
+
+    checks.append(check_required)
+
+    list_keys = tuple(schema["list_keys"])
+
+    def check_lists(spec, errors):
+        for k in list_keys:
+            if k in spec and not isinstance(spec[k], list):
+                errors.append(f"'{k}' is not a list")
+
+    checks.append(check_lists)
+
+    bool_keys = tuple(schema.get("bool_keys", ()))
+
+    def check_bools(spec, errors):
+        for k in bool_keys:
+            if k in spec and not isinstance(spec[k], bool):
+                errors.append(f"'{k}' is not true/false")
+
+    checks.append(check_bools)
+
+    key = schema["tab_key"]
+    strings = tuple(schema["tab_strings"])
+    refs = tuple(schema["tab_components"]) if components is not None else ()
+    cache_vary = frozenset(schema.get("cache_vary", ()))
+
+    def check_cache(slug, cache, errors):
+        if not isinstance(cache, dict):
+            errors.append(f"tab {slug}: cache is not an object")
+            return
+        ttl = cache.get("ttl", 300)
+        if not isinstance(ttl, int) or isinstance(ttl, bool) or ttl <= 0:
+            errors.append(f"tab {slug}: cache.ttl must be a positive number of seconds")
+        vary = cache.get("vary", [])
+        if not isinstance(vary, list) or not all(isinstance(v, str) and v in cache_vary for v in vary):
+            errors.append(f"tab {slug}: cache.vary must be a list of {', '.join(sorted(cache_vary))}")
+        sources = cache.get("invalidate_on", [])
+        if not isinstance(sources, list) or not all(isinstance(v, str) and v for v in sources):
+            errors.append(f"tab {slug}: cache.invalidate_on must be a list of view names")
+
+    def check_tabs(spec, errors):
+        tabs = spec.get("tabs")
+        if not isinstance(tabs, list):
+            return
+        seen = set()
+        for t in tabs:
+            if not isinstance(t, dict):
+                errors.append("tab is not an object")
+                continue
+            slug = t.get(key)
+            if not slug:
+                errors.append(f"tab missing {key}")
+                continue
+            if slug in seen:
+                errors.append(f"duplicate tab {key}: {slug}")
+            seen.add(slug)
+            for s in strings:
+                if t.get(s) and not isinstance(t[s], str):
+                    errors.append(f"tab {slug} missing valid {s}")
+            if t.get("cache") not in (None, False):  # false: explicitly uncached
+                check_cache(slug, t["cache"], errors)
+            for outer, inner in refs:
+                ref = t.get(outer)
+                comp = ref.get(inner) if isinstance(ref, dict) else None
+                if comp and comp not in components:
+                    errors.append(f"tab {slug} references missing component '{comp}'")
+                elif comp and needs:
+                    missing = needs.get(comp, {}).get(outer, frozenset()) - ref.keys()
+                    for attr in sorted(missing):
+                        errors.append(f"tab {slug}: component '{comp}' needs {outer}.{attr}")
+
+    checks.append(check_tabs)
+
+    model_lists = tuple(schema["model_lists"])
+
+    def check_model(spec, errors):
+        if spec.get("model"):
+            for k in model_lists:
+                if not isinstance(spec.get(k), list):
+                    errors.append(f"model declared but '{k}' is not a list")
+
+    checks.append(check_model)
+    return checks
+
+
+class Validator:
+    """
+    Compiled checks for one component index (index=None: structure only).
+    check(spec) -> spec errors; index_errors -> problems of the index itself.
+    strict=True adds the component context checks (needs the catalog).
+    """
+
+    def __init__(self, index: dict | None = None, schema: dict = SPEC_SCHEMA, *, strict: bool = False):
+        comps = (index or {}).get("components", {})
+        self.components = (
+            frozenset(name for names in comps.values() for name in names) if index is not None else None
+        )
+        self.index_errors = _index_errors(comps) if index is not None else []
+        needs = _requirements(index, schema) if strict and index is not None else None
+        self._checks = _compile(schema, self.components, needs)
+
+    def check(self, spec: dict) -> list[str]:
+        if not isinstance(spec, dict):
+            return ["spec is not a JSON object"]
+        errors = []
+        for check in self._checks:
+            check(spec, errors)
+        return errors
+
+
+# (index fingerprint, strict) -> Validator; a few entries cover the indexes
+# one process sees (structure-only, the catalog, the catalog after a reload)
+_compiled: dict[tuple[str | None, bool], Validator] = {}
+_COMPILED_MAX = 8
+
+
+def _fingerprint(index: dict | None) -> str | None:
+    if index is None:
+        return None
+    return hashlib.sha256(json.dumps(index, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def compile_validator(index: dict | None = None, *, strict: bool = False) -> Validator:
+    """Validator for `index`, compiled once per index content."""
+    key = (_fingerprint(index), strict)
+    validator = _compiled.get(key)
+    if validator is None:
+        if len(_compiled) >= _COMPILED_MAX:
+            del _compiled[next(iter(_compiled))]  # oldest first
+        validator = _compiled[key] = Validator(index, strict=strict)
+    return validator
+
+
+def validate_spec(spec: dict, index: dict, *, strict: bool = False) -> list[str]:
+    """Check a spec against the component index; returns error messages."""
+    v = compile_validator(index, strict=strict)
+    return v.check(spec) + v.index_errors
+
+
+# ---------- batch
+def read_spec(path: Path) -> dict:
+    if path.suffix.lower() == ".jsonc":
+        from faronix_jsonc import read_jsonc
+
+        return read_jsonc(path)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _check_file(validator: Validator, path: Path) -> tuple[str, list[str]] | None:
+    """(path, errors), or None for layout specs (not module specs)."""
+    try:
+        spec = read_spec(path)
+    except (OSError, ValueError) as e:
+        return str(path), [f"unreadable: {e}"]
+    if isinstance(spec, dict) and spec.get("kind") == "layout":
+        return None
+    return str(path), validator.check(spec)
+
+
+_worker: Validator | None = None
+
+
+def _init_worker(index: dict, strict: bool) -> None:
+    global _worker
+    _worker = Validator(index, strict=strict)
+
+
+def _check_chunk(paths: list[str]) -> list:
+    return [_check_file(_worker, Path(p)) for p in paths]
+
+
+def validate_paths(
+    paths: list[Path], index: dict, *, jobs: int | None = None, strict: bool = False
+) -> dict[str, list[str]]:
+    """Validate spec files; returns {path: errors} (layouts left out), in path order."""
+    paths = sorted(Path(p) for p in paths)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) < PARALLEL_MIN:
+        v = compile_validator(index, strict=strict)
+        results = [_check_file(v, p) for p in paths]
+    else:
+        size = max(16, len(paths) // (jobs * 4))
+        chunks = [[str(p) for p in paths[i : i + size]] for i in range(0, len(paths), size)]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(index, strict)) as pool:
+            results = [r for chunk in pool.map(_check_chunk, chunks) for r in chunk]
+    return dict(r for r in results if r is not None)
+
+
+def spec_files(json_dir: Path) -> list[Path]:
+    if not json_dir.is_dir():
+        return []
+    return [
+        p for p in json_dir.iterdir()
+        if p.suffix.lower() in (".json", ".jsonc") and p.name != "_in_service.json" and p.is_file()
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Validate specs against the component index")
+    ap.add_argument("specs", nargs="*", help="Spec files, relative to JSON_DIR (default: all of JSON_DIR)")
+    ap.add_argument("--jobs", type=int, default=None, help="Worker processes (default: one per core)")
+    ap.add_argument("--json", action="store_true", help="Print {spec: [errors]} as JSON")
+    ap.add_argument("--strict", action="store_true", help="Also check component configs against the catalog")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from yofaron_config import JSON_DIR
+    from generate_component_index import load_component_index
 
-    if errors:
-        print("❌ Validation failed:")
-        for e in errors:
-            print("  -", e)
-        return 1
+    started = time.perf_counter()
+    if args.specs:
+        paths = [p if p.is_absolute() or p.exists() else JSON_DIR / p for p in map(Path, args.specs)]
+        missing = [p for p in paths if not p.exists()]
+        if missing:
+            for p in missing:
+                print(f"❌ Spec not found: {p}")
+            return 2
+    else:
+        paths = spec_files(JSON_DIR)
+    index = load_component_index()
+    v = compile_validator(index, strict=args.strict)
+    results = validate_paths(paths, index, jobs=args.jobs, strict=args.strict)
+    elapsed = (time.perf_counter() - started) * 1000
 
-    print("✅ Spec validated successfully")
-    return 0
+    bad = {p: errs for p, errs in results.items() if errs}
+    if args.json:
+        print(json.dumps({"index": v.index_errors, "specs": results}, indent=2))
+    else:
+        for e in v.index_errors:
+            print(f"❌ component index: {e}")
+        for path, errs in bad.items():
+            print(f"❌ {Path(path).name} ({len(errs)} error{'s' if len(errs) != 1 else ''})")
+            for e in errs:
+                print("  -", e)
+        mark = "❌" if bad or v.index_errors else "✅"
+        print(f"{mark} {len(results) - len(bad)} of {len(results)} specs valid in {elapsed:.0f} ms")
+    return 1 if bad or v.index_errors else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+# builder/faronix_watch.py
+"""
+File watching for `faronix generate --watch`.
+
+Uses Linux inotify through ctypes (no extra dependency) and falls back to
+mtime polling elsewhere or when inotify is unavailable (e.g. watch limit
+reached, network filesystems). watch() debounces bursts of saves into a
+single on_change(set_of_paths) call.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    kind = "inotify"
+
+    def __init__(self, roots: list[Path]):
+        self.roots = [Path(r) for r in roots]
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        for root in self.roots:
+            self._add_tree(root)
+
+    def _add_tree(self, root: Path) -> None:
+        if not root.is_dir():
+            return
+        for d in [root, *(p for p in root.rglob("*") if p.is_dir())]:
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+            self._dirs[wd] = d
+
+    def read(self, timeout: float | None) -> set[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = buf[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self.roots)  # lost events: treat roots as changed
+                continue
+            base = self._dirs.get(wd)
+            if base is None:
+                continue
+            path = base / os.fsdecode(name) if name else base
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollWatcher:
+    kind = "polling"
+
+    def __init__(self, roots: list[Path], interval: float = 0.5):
+        self.roots = [Path(r) for r in roots]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snap = {}
+        for root in self.roots:
+            if not root.is_dir():
+                continue
+            for p in root.rglob("*"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                if p.is_file():
+                    snap[p] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def read(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval
+            if deadline is not None:
+                wait = min(wait, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+            snap = self._scan()
+            old, self._snapshot = self._snapshot, snap
+            changed = {p for p in snap.keys() | old.keys() if snap.get(p) != old.get(p)}
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(roots: list[Path], *, poll: bool = False):
+    if not poll:
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}); falling back to polling")
+    return PollWatcher(roots)
+
+
+def watch(roots: list[Path], on_change, *, debounce: float = 0.25, poll: bool = False) -> None:
+    """Call on_change(paths) once per burst of changes; runs until interrupted."""
+    watcher = open_watcher(roots, poll=poll)
+    print(f"👀 Watching ({watcher.kind}): " + ", ".join(str(r) for r in watcher.roots))
+    try:
+        while True:
+            changed = watcher.read(None)
+            if not changed:
+                continue
+            # debounce: keep collecting until the tree has been quiet for `debounce`
+            while True:
+                more = watcher.read(debounce)
+                if not more:
+                    break
+                changed |= more
+            on_change(changed)
+    finally:
+        watcher.close()
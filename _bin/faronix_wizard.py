@@ -342,9 +342,10 @@ def main():
     print(f"\n✅ Wrote {sot_file}")
 
     if yn("\nRun full scaffold now (index → validate → generate)?", True):
-        run([sys.executable, "generate_component_index.py"])
-        run([sys.executable, "yofaron_validate.py", sot_file.name])
-        run([sys.executable, "yofaron_generate.py", sot_file.name])
+        from faronix_generator import run_pipeline
+
+        if run_pipeline(sot_file) != 0:
+            sys.exit(1)
         print("\n🎉 Scaffolding complete.")
 
     print("\nNext:")
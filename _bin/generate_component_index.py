@@ -1,56 +1,336 @@
 # builder/generate_component_index.py
-import subprocess
+"""
+Component catalog (component_index.json) for tpl_py/ and tpl_html/.
+
+"components" lists component stems per category (what the validator and
+ctl_django's find_component() look up). "templates" has one entry per
+template file, keyed by its namespaced name ("html/forms/TextField.tpl.html",
+"py/view_template.tpl.py"):
+
+  {"path", "mtime_ns", "size", "sha256",
+   "category", "component",      # "html/forms", "TextField.tpl"
+   "refs": [...],                # {% include/extends/import/from %} names as written
+   "deps": [...],                # refs resolved to catalog keys
+   "unresolved": [...],          # refs not found in the catalog
+   "dynamic": bool,              # a reference is not a string literal
+   "syntax": "jinja" | "django",
+   "variables": [...],           # undeclared (context) variables
+   "attributes": [...],          # "table.headers": attributes read without a default
+   "error": str | null}          # why Jinja rejected it (the Django-syntax components)
+
+Variables of Jinja templates come from jinja2.meta. The runtime components
+in tpl_html are Django templates Jinja cannot parse; for those, variables
+and attributes are read from {{ ... }} and {% for/if %} tags instead.
+
+Each template is parsed once; a refresh re-parses only files whose mtime or
+size changed and rewrites the JSON only when something did. resolve(),
+closure(), dependents(), required_variables() and required_attributes()
+answer graph and context questions without reading or rendering templates.
+"""
 from pathlib import Path
-import os, json, glob, re, ast, sys
-import shutil
+import hashlib
+import json
+import os
+import re
 import time
 
+from jinja2 import Environment, TemplateSyntaxError, meta, nodes
 
 from yofaron_config import (
     ROOT,
-    PROJECT_ROOT,
-    CONFIG_DIR,
-    JSON_DIR,
     TPL_PY_DIR,
     TPL_HTML_DIR,
-    DEFAULT_SOT,
-    REGISTRY,
 )
+from faronix_buildcache import LITERAL_RE, REF_RE
+from faronix_templating import APP_OPTIONS, FILTERS, TEMPLATE_SUFFIXES, namespaced
 
 INDEX_PATH = ROOT / "component_index.json"
+INDEX_SCHEMA = 2
+NAMESPACE_ROOTS = (("py", TPL_PY_DIR), ("html", TPL_HTML_DIR))  # bare-name lookup order
+RUNTIME_PREFIX = "tpl/"  # how Django-side includes name the tpl_html library
+
+_index: dict | None = None  # in-memory copy, built once per process
+_parser = Environment(**APP_OPTIONS)
+_parser.filters.update(FILTERS)
+
+# Django-syntax fallback: {{ a.b|filter }}, {% for x, y in a.b %}, {% if a.b ... %}
+DJ_VAR_RE = re.compile(r"{{\s*(?:not\s+)?([A-Za-z_][\w.]*)\s*([^}]*)}}")
+DJ_FOR_RE = re.compile(r"{%-?\s*for\s+([\w\s,]+?)\s+in\s+([A-Za-z_][\w.]*)")
+DJ_IF_RE = re.compile(r"{%-?\s*(?:if|elif)\s+(?:not\s+)?([A-Za-z_][\w.]*)")
+DJ_WITH_RE = re.compile(r"\b(\w+)=|\bas\s+(\w+)")
+DJ_BUILTINS = {"forloop", "True", "False", "None"}
 
 
-component_index: dict[str, list[str]] = {}
+def _sha256_text(s: str) -> str:
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
-# Index HTML templates
-for tpl_file in TPL_HTML_DIR.rglob("*.tpl.html"):
+
+def _parse(path: Path, st: os.stat_result) -> dict:
+    entry = {
+        "path": str(path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": None,
+        "refs": [],
+        "dynamic": False,
+        "syntax": None,
+        "variables": [],
+        "attributes": [],
+        "error": None,
+    }
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        entry["error"] = str(e)
+        return entry
+    entry["sha256"] = _sha256_text(text)
+    refs = []
     try:
-        category = tpl_file.relative_to(TPL_HTML_DIR).parts[0]
-    except ValueError:
-        continue
-    component = tpl_file.stem
-    component_index.setdefault(f"html/{category}", []).append(component)
-
-# Index Python templates
-for tpl_file in TPL_PY_DIR.rglob("*.tpl.py"):
+        ast = _parser.parse(text)
+        variables = meta.find_undeclared_variables(ast)  # compiles: unknown filters raise here
+    except TemplateSyntaxError as e:
+        entry["syntax"] = "django"
+        entry["error"] = f"line {e.lineno}: {e.message}"
+        for ref in REF_RE.findall(text):
+            m = LITERAL_RE.match(ref)
+            if m:
+                refs.append(m.group(2))
+            else:
+                entry["dynamic"] = True
+        entry["variables"], entry["attributes"] = _django_variables(text)
+    else:
+        entry["syntax"] = "jinja"
+        for ref in meta.find_referenced_templates(ast):
+            if ref is None:
+                entry["dynamic"] = True
+            else:
+                refs.append(ref)
+        entry["variables"] = sorted(variables)
+        entry["attributes"] = sorted({
+            f"{n.node.name}.{n.attr}"
+            for n in ast.find_all(nodes.Getattr)
+            if isinstance(n.node, nodes.Name) and n.node.name in variables
+        })
+    entry["refs"] = sorted(set(refs))
+    return entry
+
+
+def _django_variables(text: str) -> tuple[list[str], list[str]]:
+    """(context variables, attributes read without a default) of a Django template."""
+    local = set(DJ_BUILTINS)
+    for targets, _ in DJ_FOR_RE.findall(text):
+        local.update(t.strip() for t in targets.split(","))
+    for tag in re.findall(r"{%-?\s*with\s[^%]*%}", text):
+        local.update(a or b for a, b in DJ_WITH_RE.findall(tag))
+    local.update(re.findall(r"{%[^%]*\sas\s+(\w+)\s*%}", text))
+
+    variables, attributes = set(), set()
+
+    def use(path: str, required: bool) -> None:
+        root, _, rest = path.partition(".")
+        if root in local or not root.isidentifier():
+            return
+        variables.add(root)
+        if required and rest:
+            attributes.add(f"{root}.{rest.split('.', 1)[0]}")
+
+    for path, tail in DJ_VAR_RE.findall(text):
+        use(path, "default" not in tail and not tail.lstrip().startswith("or "))
+    for _, path in DJ_FOR_RE.findall(text):
+        use(path, True)
+    for path in DJ_IF_RE.findall(text):
+        use(path, False)
+    return sorted(variables), sorted(attributes)
+
+
+def _previous() -> dict:
+    if _index is not None:
+        return _index.get("templates", {})
     try:
-        category = tpl_file.relative_to(TPL_PY_DIR).parts[0]
-    except ValueError:
-        continue
-    component = tpl_file.stem
-    component_index.setdefault(f"py/{category}", []).append(component)
-
-# deterministic ordering
-for components in component_index.values():
-    components.sort(key=str.lower)
-
-payload = {
-    "generated_at": int(time.time()),
-    "root": str(TPL_HTML_DIR),
-    "categories": sorted(component_index.keys()),
-    "components": component_index,
-}
-
-INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
-INDEX_PATH.write_text(json.dumps(payload, indent=2))
-print(f"✅ component_index.json generated at {INDEX_PATH}")
+        data = json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("schema") != INDEX_SCHEMA:
+        return {}
+    return data.get("templates", {})
+
+
+def build_component_index(previous: dict | None = None) -> dict:
+    """
+    Scan tpl_py/ and tpl_html/. Entries in `previous` (name -> entry) whose
+    file is unchanged are reused instead of re-parsed.
+    """
+    previous = _previous() if previous is None else previous
+    templates: dict[str, dict] = {}
+    parsed = 0
+    for ns, root in NAMESPACE_ROOTS:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith((".", "__"))]
+            for f in filenames:
+                if not f.endswith(TEMPLATE_SUFFIXES) or f.startswith("_compiled_"):
+                    continue
+                path = Path(dirpath) / f
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                rel = path.relative_to(root)
+                name = f"{ns}/{rel.as_posix()}"
+                old = previous.get(name)
+                if old and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size and old["path"] == str(path):
+                    entry = dict(old)
+                else:
+                    entry = _parse(path, st)
+                    parsed += 1
+                entry["category"] = f"{ns}/{rel.parts[0]}"
+                entry["component"] = path.name.rsplit(".", 1)[0]  # "TextField.tpl"
+                templates[name] = entry
+
+    for entry in templates.values():
+        deps, unresolved = [], []
+        for ref in entry["refs"]:
+            key = _resolve(templates, ref)
+            (deps if key else unresolved).append(key or ref)
+        entry["deps"], entry["unresolved"] = deps, unresolved
+
+    # components: the *.tpl.html / *.tpl.py stems per category (deterministic order)
+    component_index: dict[str, list[str]] = {}
+    for name, entry in templates.items():
+        if name.endswith((".tpl.html", ".tpl.py")):
+            component_index.setdefault(entry["category"], []).append(entry["component"])
+    for components in component_index.values():
+        components.sort(key=str.lower)
+
+    changed = parsed > 0 or previous.keys() != templates.keys()
+    return {
+        "schema": INDEX_SCHEMA,
+        "generated_at": int(time.time()),
+        "root": str(TPL_HTML_DIR),
+        "categories": sorted(component_index.keys()),
+        "components": component_index,
+        "templates": dict(sorted(templates.items())),
+        "_changed": changed,
+    }
+
+
+def write_component_index(payload: dict) -> None:
+    payload = {k: v for k, v in payload.items() if not k.startswith("_")}
+    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = INDEX_PATH.with_name(f".{INDEX_PATH.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp, INDEX_PATH)
+    print(f"✅ component_index.json generated at {INDEX_PATH}")
+
+
+def load_component_index(*, refresh: bool = False) -> dict:
+    """
+    Component catalog for this process. The first call (or refresh=True)
+    brings it up to date with the template dirs, re-parsing only changed
+    files, and rewrites component_index.json if anything changed; later
+    calls return the in-memory copy.
+    """
+    global _index
+    if _index is None or refresh:
+        index = build_component_index()
+        if index.pop("_changed") or not INDEX_PATH.exists():
+            write_component_index(index)
+        _index = index
+    return _index
+
+
+# ---------- graph queries
+def _resolve(templates: dict, name: str) -> str | None:
+    if name.startswith(RUNTIME_PREFIX):
+        return _resolve(templates, f"html/{name[len(RUNTIME_PREFIX):]}")
+    name = namespaced(name)
+    if name in templates:
+        return name
+    for ns, _ in NAMESPACE_ROOTS:
+        if f"{ns}/{name}" in templates:
+            return f"{ns}/{name}"
+    return None
+
+
+def resolve(index: dict, name: str) -> str | None:
+    """Catalog key for a template name: bare, namespaced, legacy or Django-side ("tpl/forms/...")."""
+    return _resolve(index.get("templates", {}), name)
+
+
+def closure(index: dict, name: str) -> tuple[dict, bool]:
+    """
+    ({name as referenced: sha256 | None}, has_dynamic_refs) for `name` and
+    everything it includes/extends — the build cache's template fingerprint.
+    """
+    templates = index.get("templates", {})
+    hashes: dict[str, str | None] = {}
+    dynamic = False
+    todo = [name]
+    while todo:
+        current = todo.pop()
+        if current in hashes:
+            continue
+        key = _resolve(templates, current)
+        entry = templates.get(key) if key else None
+        if entry is None:
+            hashes[current] = None
+            continue
+        hashes[current] = entry["sha256"]
+        dynamic = dynamic or entry["dynamic"]
+        todo.extend(entry["refs"])
+    return hashes, dynamic
+
+
+def dependents(index: dict, names) -> set[str]:
+    """Catalog keys of every template that (transitively) includes/extends any of `names`."""
+    templates = index.get("templates", {})
+    reverse: dict[str, set[str]] = {}
+    for key, entry in templates.items():
+        for dep in entry.get("deps", []):
+            reverse.setdefault(dep, set()).add(key)
+    found: set[str] = set()
+    todo = [k for k in (_resolve(templates, n) for n in names) if k]
+    while todo:
+        for parent in reverse.get(todo.pop(), ()):
+            if parent not in found:
+                found.add(parent)
+                todo.append(parent)
+    return found
+
+
+def _entry(index: dict, name: str) -> dict | None:
+    key = resolve(index, name)
+    return index.get("templates", {}).get(key) if key else None
+
+
+def required_variables(index: dict, name: str) -> list[str] | None:
+    """Context variables `name` reads (None when it is not in the catalog)."""
+    entry = _entry(index, name)
+    return entry["variables"] if entry else None
+
+
+def required_attributes(index: dict, name: str) -> list[str] | None:
+    """"var.attr" paths `name` reads without a default (None when it is not in the catalog)."""
+    entry = _entry(index, name)
+    return entry["attributes"] if entry else None
+
+
+def default_form_template(index: dict) -> str:
+    """Form template for tabs that name none: panels/FormTemplate if present, else the first form component."""
+    templates = index.get("templates", {})
+    if "html/panels/FormTemplate.tpl.html" in templates:
+        return "FormTemplate.tpl.html"
+    forms = index.get("components", {}).get("html/forms", [])
+    return f"{forms[0]}.html" if forms else "FormTemplate.tpl.html"
+
+
+def find_component(name: str) -> str | None:
+    """Namespaced template name of an html component, e.g. 'TextField' -> 'html/forms/TextField.tpl.html'."""
+    stem = name if name.endswith(".tpl") else f"{name}.tpl"
+    for category, components in load_component_index()["components"].items():
+        if category.startswith("html/") and stem in components:
+            return f"html/{category[5:]}/{stem}.html"
+    return None
+
+
+if __name__ == "__main__":
+    load_component_index()
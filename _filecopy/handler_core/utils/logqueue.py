@@ -0,0 +1,238 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from pathlib import Path
+
+# Non-blocking log shipping: request threads only filter and enqueue; one
+# writer thread formats records and appends them to a rotating JSONL file in
+# batches. Stdlib only (no Django), so it can be used outside the app too.
+
+_shippers = {}  # logger name -> LogShipper
+_install_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep every warning/error, every response with status >= 400 and every
+    request slower than slow_ms; keep sample_rate of the rest. Records
+    carry "status" and "ms" through extra=; records without them are kept.
+    """
+
+    def __init__(self, sample_rate=1.0, slow_ms=500.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if self.sample_rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        status = getattr(record, "status", None)
+        ms = getattr(record, "ms", None)
+        if status is None and ms is None:
+            return True
+        if (status or 0) >= 400 or (ms or 0) >= self.slow_ms:
+            return True
+        if random.random() < self.sample_rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler for a bounded queue: when it is full the record is dropped and counted."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # records with a payload are serialized on the writer thread; others are
+        # small, so their message is formatted now, before its args can change
+        if getattr(record, "payload", None) is None:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1  # unlocked: an approximate count is good enough
+
+
+class RotatingJSONLWriter:
+    """Append-only JSONL file rotated at max_bytes into .1 … .backup_count."""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.stream = self.path.open("a", encoding="utf-8")
+
+    def write(self, lines):
+        data = "".join(lines)
+        if self.max_bytes and self.stream.tell() + len(data) > self.max_bytes and self.stream.tell():
+            self.rotate()
+        self.stream.write(data)
+        self.stream.flush()
+
+    def rotate(self):
+        self.stream.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backup_count:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self.stream = self.path.open("a", encoding="utf-8")
+
+    def close(self):
+        self.stream.close()
+
+
+def record_to_json(record):
+    """The record's "payload" (extra=) if it has one, else the basic fields."""
+    entry = getattr(record, "payload", None)
+    if not isinstance(entry, dict):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+    return json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+
+class LogShipper:
+    """
+    Writer thread: drains the queue in batches of up to batch_size records,
+    waiting at most flush_interval seconds for a batch to fill, and writes
+    each batch with one write(). Drops and sampled-out records are reported
+    as a {"event": "log_stats"} line whenever they change.
+    """
+
+    def __init__(self, handler, writer, *, sampler=None, batch_size=256, flush_interval=1.0):
+        self.handler = handler
+        self.queue = handler.queue
+        self.writer = writer
+        self.sampler = sampler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._reported = (0, 0)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self, timeout=5.0):
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sampled_out": self.sampler.sampled_out if self.sampler else 0,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._write(self._next_batch())
+        while not self.queue.empty():  # flush what is left on shutdown
+            self._write(self._next_batch(wait=False))
+        self.writer.close()
+
+    def _next_batch(self, wait=True):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if wait and timeout > 0 and not self._stop.is_set():
+                    batch.append(self.queue.get(timeout=timeout))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        lines = []
+        for record in batch:
+            try:
+                lines.append(record_to_json(record))
+            except Exception:
+                continue  # one unserializable record must not lose the batch
+        counters = (self.handler.dropped, self.sampler.sampled_out if self.sampler else 0)
+        if counters != self._reported:
+            self._reported = counters
+            lines.append(json.dumps({"event": "log_stats", **self.stats()}) + "\n")
+        if not lines:
+            return
+        try:
+            self.writer.write(lines)
+        except OSError as e:
+            # the disk is the problem; say so once per batch without blocking anyone
+            print(f"log shipper: {len(lines)} line(s) lost: {e}", flush=True)
+
+
+def install(
+    logger_name,
+    path,
+    *,
+    sample_rate=1.0,
+    slow_ms=500.0,
+    max_queue=10000,
+    batch_size=256,
+    flush_interval=1.0,
+    max_bytes=10 * 1024 * 1024,
+    backup_count=5,
+):
+    """
+    Route logger_name through a bounded queue to a background JSONL writer.
+    Idempotent: a second call for the same logger returns the running shipper.
+
+    The logger stops propagating: ancestor handlers (Django's console handler
+    on the root logger) would otherwise format and write every record on the
+    request thread, which is the work the queue is there to take off it.
+    """
+    with _install_lock:
+        if logger_name in _shippers:
+            return _shippers[logger_name]
+        handler = DroppingQueueHandler(queue.Queue(maxsize=max_queue))
+        sampler = SamplingFilter(sample_rate, slow_ms)
+        handler.addFilter(sampler)
+        shipper = LogShipper(
+            handler,
+            RotatingJSONLWriter(path, max_bytes, backup_count),
+            sampler=sampler,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+        logger = logging.getLogger(logger_name)
+        logger.addHandler(handler)
+        logger.propagate = False
+        if logger.level == logging.NOTSET:
+            logger.setLevel(logging.INFO)
+        _shippers[logger_name] = shipper.start()
+        return shipper
@@ -1,43 +1,63 @@
-import threading
+import asyncio
+import contextvars
 import json
 import logging
 import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
 from django.shortcuts import redirect
 from urllib.parse import urlencode, urlsplit
 from django.urls import reverse, NoReverseMatch
-from django.utils.deprecation import MiddlewareMixin
 from django.utils.timezone import now
 from django.utils.crypto import get_random_string
-from django.db import connection
+from django.db import connections
+from core.utils import logqueue
 
-_thread_locals = threading.local()
+# Per-request state. Context variables rather than thread locals: under ASGI
+# many requests share a thread, and sync views run in a copied context.
+_debug_info = contextvars.ContextVar("debug_info", default=None)
+_request_stats = contextvars.ContextVar("request_stats", default=None)
 
 
 def set_debug_info(info):
-    _thread_locals.debug_info = info
+    return _debug_info.set(info)
 
 
 def get_debug_info():
-    return getattr(_thread_locals, "debug_info", None)
+    return _debug_info.get()
 
 
 REDACT = {"password", "new_password", "confirm_password", "csrfmiddlewaretoken"}
 
 
-class DebugInfoMiddleware:
+class AsyncCapableMiddleware:
     """
-    Middleware to collect debug info and make it available for templates.
-    Only active if settings.DEBUG is True.
+    Base for middleware that runs natively under both WSGI and ASGI. Django
+    passes an async get_response when the chain is async; the instance then
+    marks itself as a coroutine function and subclasses serve __call__
+    through their async __acall__, so no sync_to_async thread hop is needed.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
-    def __call__(self, request):
-        if settings.DEBUG:
-            # Example: collect request info, user, etc.
-            debug_info = {
+
+class DebugInfoMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware to collect debug info and make it available for templates.
+    Only active if settings.DEBUG is True.
+    """
+
+    def _collect(self, request):
+        # Example: collect request info, user, etc.
+        return set_debug_info(
+            {
                 "path": request.path,
                 "method": request.method,
                 "user": str(getattr(request, "user", None)),
@@ -45,14 +65,32 @@ class DebugInfoMiddleware:
                 "POST": dict(request.POST),
                 # Add more as needed
             }
-            set_debug_info(debug_info)
-        response = self.get_response(request)
-        return response
+        )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.DEBUG:
+            return self.get_response(request)
+        token = self._collect(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _debug_info.reset(token)
+
+    async def __acall__(self, request):
+        if not settings.DEBUG:
+            return await self.get_response(request)
+        token = self._collect(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _debug_info.reset(token)
 
 
-class HTMXLoginRedirectMiddleware:
+class HTMXLoginRedirectMiddleware(AsyncCapableMiddleware):
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         self.append_next = False  # Always disable appending next
 
     def _login_path(self) -> str:
@@ -67,8 +105,14 @@ class HTMXLoginRedirectMiddleware:
         return lu  # already a path like "/login/"
 
     def __call__(self, request):
-        resp = self.get_response(request)
+        if self.async_mode:
+            return self.__acall__(request)
+        return self._adjust(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._adjust(request, await self.get_response(request))
 
+    def _adjust(self, request, resp):
         # only adjust redirects
         if resp.status_code not in (301, 302):
             return resp
@@ -109,11 +153,9 @@ def _redact(d: dict) -> dict:
     return out
 
 
-class HtmxDebugSleepMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
+class HtmxDebugSleepMiddleware(AsyncCapableMiddleware):
+    def _delay(self, request) -> float:
+        """Seconds to hold an HTMX request back (DEBUG only), from X-Debug-Sleep or ?_sleep= ms."""
         if settings.DEBUG and request.headers.get("HX-Request") == "true":
             ms = request.headers.get("X-Debug-Sleep") or request.GET.get("_sleep")
             try:
@@ -121,9 +163,23 @@ class HtmxDebugSleepMiddleware:
             except ValueError:
                 delay = 0
             if delay > 0:
-                time.sleep(delay / 1000.0)
+                return delay / 1000.0
+        return 0.0
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        delay = self._delay(request)
+        if delay:
+            time.sleep(delay)
         return self.get_response(request)
 
+    async def __acall__(self, request):
+        delay = self._delay(request)
+        if delay:
+            await asyncio.sleep(delay)  # the event loop keeps serving other requests
+        return await self.get_response(request)
+
 
 logger = logging.getLogger("htmx")
 REDACT = {"password", "new_password", "confirm_password", "csrfmiddlewaretoken"}
@@ -133,56 +189,214 @@ def _redact(d: dict) -> dict:
     return {k: ("***" if k in REDACT else v) for k, v in d.items()}
 
 
-class HTMXRequestLogger(MiddlewareMixin):
-    def process_request(self, request):
+class _RequestStats:
+    """Per-request counters filled by the SQL wrapper and the render timer."""
+
+    __slots__ = ("queries", "sql_ms", "render_ms", "render_depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.render_ms = 0.0
+        self.render_depth = 0
+
+
+def get_request_stats():
+    return _request_stats.get()
+
+
+def _count_query(execute, sql, params, many, context):
+    """Execute wrapper on every connection; counts for the request being logged."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_ms += (time.perf_counter() - t0) * 1000.0
+
+
+def _add_query_counter(sender=None, connection=None, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def _install_query_counter():
+    """
+    Connections are per thread, and async views run their queries in
+    sync_to_async threads, so a wrapper entered around the request would
+    miss them. Every connection gets _count_query instead; the context
+    variable says which request (if any) a query belongs to.
+    """
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_add_query_counter, dispatch_uid="htmx_query_counter")
+    for conn in connections.all(initialized_only=True):
+        _add_query_counter(connection=conn)
+
+
+def _install_render_timer():
+    """
+    Time Template.render for the request being logged. Includes render
+    through Template.render too, so only the outermost call is counted.
+    """
+    from django.template.base import Template
+
+    if getattr(Template.render, "_htmx_timed", False):
+        return
+    render = Template.render
+
+    def timed_render(self, context):
+        stats = get_request_stats()
+        if stats is None:
+            return render(self, context)
+        stats.render_depth += 1
+        t0 = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            stats.render_depth -= 1
+            if not stats.render_depth:
+                stats.render_ms += (time.perf_counter() - t0) * 1000.0
+
+    timed_render._htmx_timed = True
+    Template.render = timed_render
+
+
+def _server_timing(stats: _RequestStats, total_ms: float) -> str:
+    return (
+        f'db;desc="{stats.queries} queries";dur={stats.sql_ms:.1f}, '
+        f"tpl;dur={stats.render_ms:.1f}, total;dur={total_ms:.1f}"
+    )
+
+
+class HTMXRequestLogger(AsyncCapableMiddleware):
+    """
+    Log one record per HTMX request (settings.HTMX_SERVER_LOG): status,
+    total ms, SQL query count and time, template render time and response
+    bytes, with the X-Tab / X-Partial headers that identify the tab.
+    HTMX_SERVER_TIMING (default: HTMX_ECHO_REQUEST_ID) also sends them to
+    the browser as Server-Timing headers.
+
+    With HTMX_LOG_PATH set, records go through core.utils.logqueue to a
+    rotating JSONL file, one payload per line. Fast successful requests
+    are kept at HTMX_LOG_SAMPLE_RATE; errors and requests slower than
+    HTMX_LOG_SLOW_MS always are.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.queued = False
+        if getattr(settings, "HTMX_SERVER_LOG", False):
+            _install_query_counter()
+            _install_render_timer()
+            if getattr(settings, "HTMX_LOG_PATH", None):
+                # queue + background writer: the request thread never touches the file
+                logqueue.install(
+                    "htmx",
+                    settings.HTMX_LOG_PATH,
+                    sample_rate=getattr(settings, "HTMX_LOG_SAMPLE_RATE", 1.0),
+                    slow_ms=getattr(settings, "HTMX_LOG_SLOW_MS", 500),
+                    max_queue=getattr(settings, "HTMX_LOG_QUEUE_SIZE", 10000),
+                    max_bytes=getattr(settings, "HTMX_LOG_MAX_BYTES", 10 * 1024 * 1024),
+                    backup_count=getattr(settings, "HTMX_LOG_BACKUPS", 5),
+                )
+                self.queued = True
+
+    def _tracked(self, request) -> bool:
         # only track when we actually intend to log (prod or env toggle)
-        if (
+        return (
             getattr(settings, "HTMX_SERVER_LOG", False)
             and request.headers.get("HX-Request") == "true"
-        ):
-            request.__t0 = time.perf_counter()
-            request.__req_id = (
-                request.headers.get("X-Request-ID") or f"hx-{get_random_string(8)}"
-            )
+        )
 
-    def process_response(self, request, response):
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._tracked(request):
+            return self.get_response(request)
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        dt_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        user = getattr(getattr(request, "user", None), "username", None)
+        return self._log(request, response, stats, dt_ms, user)
+
+    async def __acall__(self, request):
+        if not self._tracked(request):
+            return await self.get_response(request)
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        t0 = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        dt_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        user = None
+        if hasattr(request, "auser"):  # request.user would query the DB synchronously
+            user = getattr(await request.auser(), "username", None)
+        return self._log(request, response, stats, dt_ms, user)
+
+    def _log(self, request, response, stats, dt_ms, user):
+        req_id = request.headers.get("X-Request-ID") or f"hx-{get_random_string(8)}"
         try:
-            if getattr(settings, "HTMX_SERVER_LOG", False) and hasattr(
-                request, "__req_id"
+            # In prod, keep server-only by default:
+            if getattr(settings, "HTMX_ECHO_REQUEST_ID", False):
+                response.headers["X-Request-ID"] = req_id
+            if getattr(
+                settings,
+                "HTMX_SERVER_TIMING",
+                getattr(settings, "HTMX_ECHO_REQUEST_ID", False),
             ):
-                # In prod, keep server-only by default:
-                if getattr(settings, "HTMX_ECHO_REQUEST_ID", False):
-                    response.headers["X-Request-ID"] = request.__req_id
-
-                dt_ms = (
-                    round((time.perf_counter() - request.__t0) * 1000.0, 1)
-                    if hasattr(request, "__t0")
-                    else None
-                )
+                response.headers["Server-Timing"] = _server_timing(stats, dt_ms)
 
-                post_data = {}
-                if request.method in ("POST", "PUT", "PATCH"):
-                    try:
-                        post_data = _redact(dict(request.POST.items()))
-                    except Exception:
-                        post_data = {"_warn": "unreadable_post"}
-
-                payload = {
-                    "id": request.__req_id,
-                    "method": request.method,
-                    "path": request.path,
-                    "status": getattr(response, "status_code", None),
-                    "ms": dt_ms,
-                    "user": getattr(getattr(request, "user", None), "username", None),
-                    "hx": request.headers.get("HX-Request"),
-                    "x_tab": request.headers.get("X-Tab"),
-                    "x_partial": request.headers.get("X-Partial"),
-                    "ua": request.META.get("HTTP_USER_AGENT"),
-                    "post": post_data,
-                    "ts": now().isoformat(),
-                    "db_queries": q_count,
-                    "referer": request.META.get("HTTP_REFERER"),
-                }
-                logger.info(json.dumps(payload, ensure_ascii=False))
-        finally:
-            return response
+            post_data = {}
+            if request.method in ("POST", "PUT", "PATCH"):
+                try:
+                    post_data = _redact(dict(request.POST.items()))
+                except Exception:
+                    post_data = {"_warn": "unreadable_post"}
+
+            payload = {
+                "id": req_id,
+                "method": request.method,
+                "path": request.path,
+                "status": getattr(response, "status_code", None),
+                "ms": dt_ms,
+                "db_queries": stats.queries,
+                "db_ms": round(stats.sql_ms, 1),
+                "render_ms": round(stats.render_ms, 1),
+                "bytes": (
+                    None
+                    if getattr(response, "streaming", False)
+                    else len(response.content)
+                ),
+                "user": user,
+                "hx": request.headers.get("HX-Request"),
+                "x_tab": request.headers.get("X-Tab"),
+                "x_partial": request.headers.get("X-Partial"),
+                "ua": request.META.get("HTTP_USER_AGENT"),
+                "post": post_data,
+                "ts": now().isoformat(),
+                "referer": request.META.get("HTTP_REFERER"),
+            }
+            extra = {"payload": payload, "status": payload["status"], "ms": dt_ms}
+            if self.queued:
+                # the JSONL writer thread serializes the payload
+                logger.info(
+                    "%s %s %s %.1fms", request.method, request.path, payload["status"], dt_ms, extra=extra
+                )
+            else:
+                # configured handlers (console, file) keep getting one JSON line
+                logger.info(json.dumps(payload, ensure_ascii=False, default=str), extra=extra)
+        except Exception:
+            # logging must never break the response
+            logger.exception("htmx request log failed for %s", request.path)
+        return response
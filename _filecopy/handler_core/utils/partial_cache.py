@@ -0,0 +1,135 @@
+import hashlib
+import json
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+# Rendered HTMX tab partials, cached per the spec's per-tab "cache" directive:
+#
+#   "cache": {"ttl": 300, "vary": ["rank", "lti"], "invalidate_on": ["page"]}
+#
+# Keys carry a generation number per source ("page" → pageCreated/Updated/
+# Deleted). invalidate() bumps the generation, so every partial built from
+# that source misses at once, without knowing or scanning its keys.
+
+EVENT_SUFFIXES = ("Created", "Updated", "Deleted")
+LOCK_TIMEOUT = 10  # seconds a recompute may hold the single-flight lock
+WAIT_STEP = 0.05
+
+_local_locks = {}  # cache key -> threading.Lock, one recompute per process
+_local_locks_guard = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, "PARTIAL_CACHE_ALIAS", "default")]
+
+
+def _gen_key(source):
+    return f"partials:gen:{source}"
+
+
+def event_sources(events):
+    """'pageCreated, postDeleted' or an HX-Trigger JSON object → {"page", "post"}."""
+    if not events:
+        return set()
+    events = events.strip()
+    if events.startswith("{"):
+        try:
+            names = list(json.loads(events))
+        except ValueError:
+            names = []
+    else:
+        names = [e.strip() for e in events.split(",")]
+    return {
+        name[: -len(suffix)]
+        for name in names
+        for suffix in EVENT_SUFFIXES
+        if name.endswith(suffix) and len(name) > len(suffix)
+    }
+
+
+def invalidate(events):
+    """Drop every cached partial that depends on the sources of these events."""
+    cache = _cache()
+    for source in event_sources(events):
+        key = _gen_key(source)
+        try:
+            cache.incr(key)
+        except ValueError:  # no generation yet (or evicted): start a new one
+            cache.set(key, time.time_ns(), None)
+
+
+def _key(request, view, tab, template, vary, sources, is_lti):
+    cache = _cache()
+    gens = cache.get_many([_gen_key(s) for s in sources])
+    parts = [view, tab, template] + [f"{s}={gens.get(_gen_key(s), 0)}" for s in sources]
+    user = request.user
+    if "rank" in vary:
+        parts.append(f"rank={getattr(user, 'rank', 0)}")
+    if "lti" in vary:
+        parts.append(f"lti={int(bool(is_lti))}")
+    if "user" in vary:
+        parts.append(f"user={user.pk}")
+    # hashed: template paths and many parts would break memcached's key rules
+    digest = hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()[:32]
+    return f"partials:{view}:{digest}"
+
+
+def _local_lock(key):
+    with _local_locks_guard:
+        lock = _local_locks.get(key)
+        if lock is None:
+            if len(_local_locks) > 1024:
+                _local_locks.clear()  # only held briefly; losing an entry costs a duplicate render
+            lock = _local_locks[key] = threading.Lock()
+        return lock
+
+
+def cached_partial(request, view, tab, template, context, *, ttl, vary=(), invalidate_on=(), is_lti=None):
+    """
+    The tab partial from the cache, rendering it on a miss. Concurrent
+    misses for one key render it once: within a process behind a lock, across
+    processes behind a cache.add() lock whose losers wait for the winner's
+    result (and render themselves if it does not arrive in LOCK_TIMEOUT).
+    Partials with a CSRF token are only stored when they vary by user.
+    """
+    if is_lti is None:
+        is_lti = bool(getattr(request, "session", {}).get("is_lti"))
+    cache = _cache()
+    key = _key(request, view, tab, template, vary, invalidate_on or (view,), is_lti)
+    html, state = cache.get(key), "hit"
+    if html is None:
+        with _local_lock(key):
+            html = cache.get(key)
+            if html is None:
+                html, state = _recompute(request, key, template, context, ttl, "user" in vary)
+    resp = HttpResponse(html)
+    resp["X-Partial-Cache"] = state
+    return resp
+
+
+def _recompute(request, key, template, context, ttl, per_user):
+    """(html, "miss"), or (html, "hit") when another process rendered it meanwhile."""
+    cache = _cache()
+    lock = f"{key}:lock"
+    locked = cache.add(lock, 1, LOCK_TIMEOUT)
+    if not locked:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_STEP)
+            html = cache.get(key)
+            if html is not None:
+                return html, "hit"
+            if cache.get(lock) is None:  # the winner gave up without storing it
+                break
+    try:
+        html = render_to_string(template, context, request=request)
+        if per_user or "csrfmiddlewaretoken" not in html:
+            cache.set(key, html, ttl)
+        return html, "miss"
+    finally:
+        if locked:
+            cache.delete(lock)
@@ -0,0 +1,140 @@
+# benchmarks/bench_context.py
+"""
+global_vars context processor benchmark: the frozen, precomputed site context
+vs the old processor that rebuilt the whole dict literal on every request.
+
+The old processor is reproduced exactly: a function returning the literal of
+site_context.json. Each case times, per request:
+  processor   calling the context processor
+  render      rendering a sidebar-style menu: {% url item.url_name %} per
+              item (old) vs {{ item.href }} (new)
+and reports the bytes allocated per processor call (tracemalloc).
+
+Needs Django; routes for every menu url_name are registered under "core".
+
+    python benchmarks/bench_context.py --number 20000 --repeat 5
+"""
+import argparse
+import json
+import pprint
+import statistics
+import sys
+import tempfile
+import timeit
+import tracemalloc
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HANDLER_CORE = ROOT / "_filecopy" / "handler_core"
+
+MENU_OLD = (
+    "{% for section, items in menu.items %}<h6>{{ section }}</h6><ul>"
+    "{% for item in items %}<li><a href=\"{% url item.url_name %}\">"
+    "<i class=\"{{ item.fa_icon }}\"></i> {{ item.label }}</a></li>{% endfor %}</ul>{% endfor %}"
+)
+MENU_NEW = MENU_OLD.replace("{% url item.url_name %}", "{{ item.href }}")
+
+
+def setup_django(data: dict, tmp: Path) -> None:
+    import django
+    from django.conf import settings
+    from django.urls import include, path
+
+    # the app is deployed as "core"; expose handler_core under that name
+    (tmp / "core").symlink_to(HANDLER_CORE, target_is_directory=True)
+    sys.path.insert(0, str(tmp))
+
+    def view(request):
+        return None
+
+    names = sorted(
+        {i["url_name"].split(":", 1)[1] for items in data["menu"].values() for i in items}
+    )
+    urls = types.ModuleType("bench_context_urls")
+    urls.urlpatterns = [
+        path("", include(([path(f"{n}/", view, name=n) for n in names], "core")))
+    ]
+    sys.modules[urls.__name__] = urls
+    settings.configure(
+        DEBUG=False,
+        ROOT_URLCONF=urls.__name__,
+        INSTALLED_APPS=[],
+        SITE_CONTEXT_PATH=str(HANDLER_CORE / "site_context.json"),
+    )
+    django.setup()
+
+
+def legacy_processor(data: dict):
+    # the pre-site_context.json processor: one dict literal built per call
+    source = f"def global_vars(request):\n    return {pprint.pformat(data, width=100, sort_dicts=False)}\n"
+    namespace = {}
+    exec(compile(source, "<legacy global_vars>", "exec"), namespace)
+    return namespace["global_vars"]
+
+
+def allocated_per_call(fn, calls: int = 1000) -> float:
+    fn(None)
+    keep = [None] * calls  # results stay alive, so what they allocated shows up
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(calls):
+        keep[i] = fn(None)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del keep
+    return max(grown, 0) / calls
+
+
+def per_call_us(fn, number: int, repeat: int) -> tuple[float, float]:
+    times = timeit.repeat(fn, number=number, repeat=repeat)
+    return statistics.median(times) / number * 1e6, min(times) / number * 1e6
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--number", type=int, default=20000, help="calls per timing run")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    data = json.loads((HANDLER_CORE / "site_context.json").read_text(encoding="utf-8"))
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(data, Path(tmp))
+        from django.template import Engine, RequestContext
+
+        from core.utils import context_processors
+
+        old = legacy_processor(data)
+        new = context_processors.global_vars
+        engine = Engine()
+        old_tpl, new_tpl = engine.from_string(MENU_OLD), engine.from_string(MENU_NEW)
+
+        def render(tpl, processor):
+            # as a view renders: the processor runs inside RequestContext binding
+            return tpl.render(RequestContext(None, processors=[processor]))
+
+        correct = render(old_tpl, old) == render(new_tpl, new)
+
+        cases = {
+            "processor old": lambda: old(None),
+            "processor new": lambda: new(None),
+            "render old": lambda: render(old_tpl, old),
+            "render new": lambda: render(new_tpl, new),
+        }
+        items = sum(len(v) for v in data["menu"].values())
+        print(f"📏 site context: {len(json.dumps(data))} bytes of JSON, {items} menu items")
+        print(f"{'case':14} {'median':>10} {'min':>10} {'alloc/call':>11}")
+        for name, fn in cases.items():
+            number = args.number if name.startswith("processor") else max(1, args.number // 20)
+            med, best = per_call_us(fn, number, args.repeat)
+            alloc = ""
+            if name.startswith("processor"):
+                alloc = f"{allocated_per_call(old if name.endswith('old') else new):9.0f} B"
+            print(f"{name:14} {med:8.2f}µs {best:8.2f}µs {alloc:>11}")
+        print(f"menu markup identical: {correct}")
+    return 0 if correct else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+# benchmarks/bench_generator.py
+"""
+Generator throughput benchmark over a synthetic spec corpus.
+
+Builds a throwaway project (see corpus.py) with N specs × M tabs × K fields,
+a --model-ratio share of them with a `model`, then times in-process:
+  load_ctx       per spec
+  validate_ctx   per spec
+  render_to_file per template (every call, grouped by template name)
+  generate_all   per spec, end to end (build cache bypassed with force=True)
+and reports specs/sec, p50/p95 per stage and template, and peak RSS.
+
+Templates that raise are counted under "errors" and the run continues, so
+one broken template does not hide the cost of the others. A spec with any
+failed render counts as failed and is left out of specs/sec and the
+generate_all timings.
+
+    python benchmarks/bench_generator.py --specs 50 --tabs 4 --fields 8
+    python benchmarks/bench_generator.py --save benchmarks/baselines/gen.json
+    python benchmarks/bench_generator.py --compare benchmarks/baselines/gen.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import make_project, write_corpus  # noqa: E402
+
+BASELINE_SCHEMA = 1
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[k]
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "total_ms": round(sum(samples) * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(kb / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def instrument(gen, samples: dict, errors: dict) -> None:
+    """Time every render_to_file call by template name; count failures."""
+    original = gen.render_to_file
+
+    def timed(template_name, context, output_path, **kwargs):
+        started = time.perf_counter()
+        try:
+            original(template_name, context, output_path, **kwargs)
+        except Exception as e:
+            errors[template_name][f"{type(e).__name__}: {str(e)[:80]}"] += 1
+        finally:
+            samples[template_name].append(time.perf_counter() - started)
+
+    gen.render_to_file = timed
+
+
+def error_count(errors: dict) -> int:
+    return sum(sum(by_msg.values()) for by_msg in errors.values())
+
+
+def run(args) -> dict:
+    root = make_project(args.workdir)
+    specs = write_corpus(root, args.specs, args.tabs, args.fields, args.model_ratio)
+    os.chdir(root)
+    os.environ.setdefault("FARONIX_JINJA_CACHE", str(root / ".jinja-cache"))
+    sys.path.insert(0, str(root / "builder"))
+
+    quiet = contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext()
+    with quiet:
+        import faronix_generator as gen
+
+        gen.load_component_index(refresh=True)
+
+    stages = defaultdict(list)
+    templates = defaultdict(list)
+    errors = defaultdict(lambda: defaultdict(int))
+    failed = 0
+    instrument(gen, templates, errors)
+
+    for rnd in range(args.warmup + args.repeat):
+        measured = rnd >= args.warmup
+        for spec in specs:
+            with quiet:
+                t0 = time.perf_counter()
+                ctx = gen.load_ctx(spec)
+                t1 = time.perf_counter()
+                gen.validate_ctx(ctx)
+                t2 = time.perf_counter()
+                before = error_count(errors)
+                try:
+                    gen.generate_all(spec, force=True)
+                    ok = True
+                except (Exception, SystemExit):
+                    ok = False
+                t3 = time.perf_counter()
+            # instrument() swallows render errors, so check whether any were recorded
+            ok = ok and error_count(errors) == before
+            if measured:
+                stages["load_ctx"].append(t1 - t0)
+                stages["validate_ctx"].append(t2 - t1)
+                if ok:
+                    stages["generate_all"].append(t3 - t2)
+                else:
+                    failed += 1
+        if not measured:
+            templates.clear()
+            errors.clear()
+
+    gen_total = sum(stages["generate_all"])
+    return {
+        "schema": BASELINE_SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "corpus": {
+            "specs": args.specs,
+            "tabs": args.tabs,
+            "fields": args.fields,
+            "model_ratio": args.model_ratio,
+            "repeat": args.repeat,
+        },
+        "specs_per_sec": round(len(stages["generate_all"]) / gen_total, 2) if gen_total else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "ok_specs": len(stages["generate_all"]),
+        "failed_specs": failed,
+        "stages": {name: summarize(s) for name, s in stages.items()},
+        "templates": {
+            name: {**summarize(s), "errors": dict(errors.get(name, {}))}
+            for name, s in sorted(templates.items())
+        },
+    }
+
+
+def print_report(result: dict) -> None:
+    c = result["corpus"]
+    print(
+        f"📊 {c['specs']} specs × {c['tabs']} tabs × {c['fields']} fields "
+        f"(model ratio {c['model_ratio']}), {c['repeat']} round(s)"
+    )
+    runs = result["ok_specs"] + result["failed_specs"]
+    print(f"   specs/sec: {result['specs_per_sec']} (successful specs)   peak RSS: {result['peak_rss_mb']} MB"
+          f"   failed specs: {result['failed_specs']} of {runs}")
+    print(f"\n{'stage / template':44} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'total ms':>10}")
+    rows = [(k, v) for k, v in result["stages"].items()] + [
+        (f"  {k}", v) for k, v in result["templates"].items()
+    ]
+    for name, s in rows:
+        err = sum(s.get("errors", {}).values())
+        flag = f"  ⚠️ {err} errors" if err else ""
+        print(f"{name:44} {s['n']:>6} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['total_ms']:>10.1f}{flag}")
+
+
+def compare(result: dict, baseline: dict, threshold: float) -> int:
+    """Print p50 deltas against a saved baseline; returns the number of regressions."""
+    if baseline.get("corpus") != result["corpus"]:
+        print("⚠️  Baseline was recorded with a different corpus; deltas are indicative only")
+    regressions = 0
+    print(f"\n{'metric':50} {'baseline':>10} {'current':>10} {'delta':>8}")
+
+    def row(name, old, new, higher_is_better=False):
+        nonlocal regressions
+        if old in (None, 0) or new is None:
+            return
+        delta = (new - old) / old
+        worse = -delta if higher_is_better else delta
+        mark = ""
+        if worse > threshold:
+            regressions += 1
+            mark = "  ❌"
+        print(f"{name:50} {old:>10.3f} {new:>10.3f} {delta:>+7.1%}{mark}")
+
+    row("specs_per_sec", baseline.get("specs_per_sec"), result["specs_per_sec"], higher_is_better=True)
+    row("peak_rss_mb", baseline.get("peak_rss_mb"), result["peak_rss_mb"])
+    for section in ("stages", "templates"):
+        for name, s in result[section].items():
+            old = baseline.get(section, {}).get(name)
+            if old:
+                row(f"{name} p50 ms", old["p50_ms"], s["p50_ms"])
+    print(f"\n{'❌' if regressions else '✅'} {regressions} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Generator throughput benchmark")
+    ap.add_argument("--specs", type=int, default=20)
+    ap.add_argument("--tabs", type=int, default=3)
+    ap.add_argument("--fields", type=int, default=6)
+    ap.add_argument("--model-ratio", type=float, default=0.5, help="share of specs with a model (0..1)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--warmup", type=int, default=1)
+    ap.add_argument("--workdir", type=Path, default=None, help="project dir (default: a temp dir)")
+    ap.add_argument("--save", type=Path, help="write the result as a JSON baseline")
+    ap.add_argument("--compare", type=Path, help="compare against a JSON baseline")
+    ap.add_argument("--threshold", type=float, default=0.10, help="regression threshold (default 10%%)")
+    ap.add_argument("--verbose", action="store_true", help="show generator output")
+    args = ap.parse_args(argv)
+
+    save = args.save.resolve() if args.save else None
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+
+    with tempfile.TemporaryDirectory(prefix="faronix-bench-") as tmp:
+        if args.workdir is None:
+            args.workdir = Path(tmp)
+        result = run(args)
+
+    print_report(result)
+    if save:
+        save.parent.mkdir(parents=True, exist_ok=True)
+        save.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"\n💾 Baseline saved → {save}")
+    if baseline is not None:
+        return 1 if compare(result, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# benchmarks/bench_jsonc.py
+"""
+JSONC loader benchmark: faronix_jsonc (string-aware scanner) vs the old
+regex comment stripper that read_json_any used.
+
+Synthesizes a layout-style .jsonc spec of roughly --mb megabytes (tabs with
+hx_get URLs, // and /* */ comments, trailing commas) and times:
+  regex    json.loads(_strip_jsonc(text))   (old path; corrupts "https://",
+           so on these specs only its comment-stripping pass is timed)
+  loads    faronix_jsonc.loads(text)
+  load     faronix_jsonc.read_jsonc(path)   (chunked file scan)
+  plain    json.loads on the same spec without comments (lower bound)
+
+    python benchmarks/bench_jsonc.py --mb 8 --repeat 5
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "_bin"))
+
+import faronix_jsonc  # noqa: E402
+
+
+def _strip_jsonc(s: str) -> str:
+    # the pre-faronix_jsonc implementation, kept here as the baseline
+    s = re.sub(r"//.*?$", "", s, flags=re.MULTILINE)
+    s = re.sub(r"/\*.*?\*/", "", s, flags=re.DOTALL)
+    return s
+
+
+def synth_spec(target_bytes: int) -> tuple[str, str]:
+    """Return (jsonc_text, plain_json_text) for the same document."""
+    tab_lines, plain_tabs = [], []
+    i = 0
+    size = 0
+    while size < target_bytes:
+        tab = {
+            "slug": f"tab_{i}",
+            "label": f"Tab {i}",
+            "hx_get": f"https://example.com/core/view_{i}/?next=//home",
+            "hx_target": ".main-content",
+            "hx_swap": "innerHTML",
+            "fields": [
+                {"name": f"field_{i}_{k}", "type": "text", "opts": "max_length=200"}
+                for k in range(4)
+            ],
+        }
+        body = json.dumps(tab, indent=2)
+        comment = (
+            f"    /* tab {i}\n       generated for the benchmark */\n"
+            if i % 3 == 0
+            else f"    // tab {i}: rank-gated\n"
+        )
+        # trailing comma inside the tab object
+        tab_lines.append(comment + "    " + body[:-2] + ",\n  }")
+        plain_tabs.append("    " + body)
+        size += len(tab_lines[-1])
+        i += 1
+    jsonc = (
+        "{\n  // layout spec\n  \"kind\": \"layout\",\n  \"view_name\": \"Bench\",\n"
+        "  \"tabs\": [\n" + ",\n".join(tab_lines) + ",\n  ],\n}\n"
+    )
+    plain = (
+        '{\n  "kind": "layout",\n  "view_name": "Bench",\n'
+        '  "tabs": [\n' + ",\n".join(plain_tabs) + "\n  ]\n}\n"
+    )
+    return jsonc, plain
+
+
+def timeit(fn, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--mb", type=float, default=4.0, help="approximate spec size")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    jsonc, plain = synth_spec(int(args.mb * 1024 * 1024))
+    expected = json.loads(plain)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.jsonc"
+        path.write_text(jsonc, encoding="utf-8")
+
+        cases = {
+            "regex": lambda: json.loads(_strip_jsonc(jsonc)),
+            "loads": lambda: faronix_jsonc.loads(jsonc),
+            "load": lambda: faronix_jsonc.read_jsonc(path),
+            "plain": lambda: json.loads(plain),
+        }
+        print(f"📏 spec: {len(jsonc) / 1e6:.1f} MB jsonc, {len(expected['tabs'])} tabs")
+        print(f"{'case':8} {'median':>10} {'min':>10} {'MB/s':>8}  correct")
+        for name, fn in cases.items():
+            try:
+                correct = fn() == expected
+            except ValueError as e:
+                correct = f"error: {e}"
+            if correct is not True and name == "regex":
+                fn = lambda: _strip_jsonc(jsonc)  # noqa: E731  strip pass only
+                name = "regex*"
+            times = timeit(fn, args.repeat) if correct is True or name == "regex*" else []
+            if not times:
+                print(f"{name:8} {'-':>10} {'-':>10} {'-':>8}  {correct}")
+                continue
+            med = statistics.median(times)
+            print(
+                f"{name:8} {med * 1000:9.1f}ms {min(times) * 1000:9.1f}ms "
+                f"{len(jsonc) / 1e6 / med:8.1f}  {correct}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
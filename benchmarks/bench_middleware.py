@@ -0,0 +1,138 @@
+# benchmarks/bench_middleware.py
+"""
+Core middleware stack under ASGI: async-capable middleware vs the same
+middleware marked sync-only, which is how the stack ran before (Django then
+wraps each one in a sync_to_async thread hop).
+
+The stack is DebugInfoMiddleware, HTMXLoginRedirectMiddleware,
+HtmxDebugSleepMiddleware and HTMXRequestLogger (HTMX_SERVER_LOG on, the
+log line itself discarded) around an async view returning a small
+response. Cases, per HTMX request:
+  sync-only   async handler, every middleware adapted with sync_to_async
+  async       async handler, native async __acall__ all the way
+  wsgi        sync handler and sync view, for reference
+
+Needs Django.
+
+    python benchmarks/bench_middleware.py --requests 2000 --repeat 5
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HANDLER_CORE = ROOT / "_filecopy" / "handler_core"
+STACK = (
+    "DebugInfoMiddleware",
+    "HTMXLoginRedirectMiddleware",
+    "HtmxDebugSleepMiddleware",
+    "HTMXRequestLogger",
+)
+
+
+def setup_django(tmp: Path) -> types.ModuleType:
+    import django
+    from django.conf import settings
+    from django.http import HttpResponse
+    from django.urls import path
+
+    (tmp / "core").symlink_to(HANDLER_CORE, target_is_directory=True)
+    sys.path.insert(0, str(tmp))
+
+    async def async_view(request):
+        return HttpResponse("<div>tab</div>")
+
+    def sync_view(request):
+        return HttpResponse("<div>tab</div>")
+
+    mod = types.ModuleType("bench_middleware_site")
+    mod.urlpatterns = [path("a/", async_view), path("s/", sync_view)]
+    sys.modules[mod.__name__] = mod
+    settings.configure(
+        DEBUG=True,
+        SECRET_KEY="bench",
+        ALLOWED_HOSTS=["*"],
+        ROOT_URLCONF=mod.__name__,
+        INSTALLED_APPS=[],
+        DATABASES={},
+        HTMX_SERVER_LOG=True,
+    )
+    django.setup()
+    logging.getLogger("htmx").disabled = True
+
+    from core.utils import middleware
+
+    # the pre-async classes: same code, but Django may only call them synchronously
+    for name in STACK:
+        setattr(mod, name, type(name, (getattr(middleware, name),), {"async_capable": False}))
+    return mod
+
+
+def handler_for(middleware_module: str, is_async: bool):
+    from django.conf import settings
+    from django.core.handlers.base import BaseHandler
+
+    settings.MIDDLEWARE = [f"{middleware_module}.{name}" for name in STACK]
+    handler = BaseHandler()
+    handler.load_middleware(is_async=is_async)
+    return handler
+
+
+def run_async(handler, n: int) -> float:
+    from django.test import AsyncRequestFactory
+
+    request = AsyncRequestFactory().get("/a/", headers={"HX-Request": "true", "X-Tab": "main"})
+
+    async def loop():
+        t0 = time.perf_counter()
+        for _ in range(n):
+            await handler.get_response_async(request)
+        return time.perf_counter() - t0
+
+    return asyncio.run(loop())
+
+
+def run_sync(handler, n: int) -> float:
+    from django.test import RequestFactory
+
+    request = RequestFactory().get("/s/", headers={"HX-Request": "true", "X-Tab": "main"})
+    t0 = time.perf_counter()
+    for _ in range(n):
+        handler.get_response(request)
+    return time.perf_counter() - t0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--requests", type=int, default=2000, help="requests per timing run")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        site = setup_django(Path(tmp))
+        cases = {
+            "sync-only": (handler_for(site.__name__, True), run_async),
+            "async": (handler_for("core.utils.middleware", True), run_async),
+            "wsgi": (handler_for("core.utils.middleware", False), run_sync),
+        }
+        print(f"📏 {len(STACK)} middleware, {args.requests} HTMX requests per run")
+        print(f"{'case':10} {'median':>10} {'min':>10}")
+        medians = {}
+        for name, (handler, run) in cases.items():
+            run(handler, min(100, args.requests))  # warm-up
+            times = [run(handler, args.requests) / args.requests for _ in range(args.repeat)]
+            medians[name] = statistics.median(times)
+            print(f"{name:10} {medians[name] * 1e6:8.1f}µs {min(times) * 1e6:8.1f}µs")
+        saved = medians["sync-only"] - medians["async"]
+        print(f"thread hops removed: {saved * 1e6:.1f}µs per request ({saved / medians['sync-only']:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
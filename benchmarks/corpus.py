@@ -0,0 +1,126 @@
+# benchmarks/corpus.py
+"""
+Synthetic spec corpora and throwaway project trees for the benchmarks.
+
+make_project() lays out a project the way a deployment does (builder/ holds
+the _bin modules, tpl_py/tpl_html and a yofaron_config.py pointing at the
+project's own directories), so the generator runs unmodified against it.
+write_corpus() fills builder/json with N specs × M tabs × K fields.
+"""
+import json
+import shutil
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+BIN = REPO / "_bin"
+TPL = REPO / "tpl"
+
+FIELD_TYPES = [
+    ("text", "CharField", "max_length=200"),
+    ("int", "IntegerField", "default=0"),
+    ("bool", "BooleanField", "default=True"),
+    ("date", "DateField", "null=True, blank=True"),
+    ("slug", "SlugField", "max_length=120"),
+]
+
+CONFIG_TEMPLATE = '''\
+# yofaron_config.py (benchmark project)
+from pathlib import Path
+
+ROOT = Path({root!r})
+PROJECT_ROOT = ROOT
+BASE_DIR = ROOT
+BUILDER_DIR = ROOT / "builder"
+CONFIG_DIR = ROOT / "config"
+JSON_DIR = BUILDER_DIR / "json"
+TPL_PY_DIR = BUILDER_DIR / "tpl" / "tpl_py"
+TPL_HTML_DIR = BUILDER_DIR / "tpl" / "tpl_html"
+OUTPUT_DIR = ROOT / "core"
+VIEW_PATH = OUTPUT_DIR / "views"
+FORM_PATH = OUTPUT_DIR / "forms"
+MODEL_PATH = OUTPUT_DIR / "models"
+URLS_PATH = OUTPUT_DIR / "urls"
+UTILS_PATH = OUTPUT_DIR / "utils"
+TEMPLATE_PATH = ROOT / "templates"
+TEMPLATE_PARTIALS_PATH = TEMPLATE_PATH / "partials"
+REGISTRY = BUILDER_DIR / "_in_service.json"
+DEFAULT_SOT = JSON_DIR / "yofaron_scaffolded.json"
+ROLE_RANK = {{"guest": 0, "member": 10, "staff": 40, "manager": 60, "admin": 80, "superadmin": 100}}
+MODEL_TYPE_MAP = {model_type_map!r}
+DEFAULT_CONFIG = {{"app_label": "core", "view_name": "Default", "tabs": []}}
+'''
+
+
+def make_project(root: Path) -> Path:
+    """Create (or refresh) a benchmark project under root; returns root."""
+    root = Path(root).resolve()
+    builder = root / "builder"
+    builder.mkdir(parents=True, exist_ok=True)
+    for src in BIN.glob("*.py"):
+        shutil.copy2(src, builder / src.name)
+    for sub in ("tpl_py", "tpl_html"):
+        dest = builder / "tpl" / sub
+        if dest.exists():
+            shutil.rmtree(dest)
+        shutil.copytree(TPL / sub, dest)
+    type_map = {name: django for name, django, _ in FIELD_TYPES}
+    (builder / "yofaron_config.py").write_text(
+        CONFIG_TEMPLATE.format(root=str(root), model_type_map=type_map), encoding="utf-8"
+    )
+    for d in ("builder/json", "config", "core/views", "core/forms", "core/models", "core/urls", "templates/partials"):
+        (root / d).mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def synth_spec(i: int, tabs: int, fields: int, model: bool) -> dict:
+    name = f"Bench{i:04d}"
+    slug = name.lower()
+    model_fields = [
+        {"name": f"f{k}", "type": FIELD_TYPES[k % len(FIELD_TYPES)][0], "opts": FIELD_TYPES[k % len(FIELD_TYPES)][2]}
+        for k in range(fields)
+    ]
+    spec = {
+        "app_label": "core",
+        "view_name": name,
+        "view_slug": slug,
+        "sidebar_heading": name,
+        "model": f"{name}Item" if model else None,
+        "table": f"core_{slug}item" if model else None,
+        "constraints": {"unique_together": [], "indexes": []},
+        "fields": model_fields if model else [],
+        "tabs": [],
+    }
+    for t in range(tabs):
+        spec["tabs"].append(
+            {
+                "slug": f"{slug}_t{t}",
+                "label": f"Tab {t}",
+                "required_rank": "staff",
+                "form_template": f"{slug}_t{t}_form.html",
+                "hx_get": f"/core/{slug}/t{t}/",
+                "hx_target": ".main-content",
+                "hx_trigger": "load" if t == 0 else "click",
+                "hx_swap": "innerHTML",
+                "hx_push_url": "false",
+                "fields": [
+                    {"name": f"f{k}", "type": FIELD_TYPES[k % len(FIELD_TYPES)][0], "label": f"Field {k}", "required": k == 0}
+                    for k in range(fields)
+                ],
+            }
+        )
+    return spec
+
+
+def write_corpus(root: Path, specs: int, tabs: int, fields: int, model_ratio: float) -> list[Path]:
+    """Write the corpus into builder/json (replacing earlier bench specs); returns the spec paths."""
+    json_dir = Path(root) / "builder" / "json"
+    for old in json_dir.glob("bench*.json"):
+        old.unlink()
+    with_model = round(specs * model_ratio)
+    paths = []
+    for i in range(specs):
+        spec = synth_spec(i, tabs, fields, model=i < with_model)
+        path = json_dir / f"{spec['view_slug']}.json"
+        path.write_text(json.dumps(spec, indent=2), encoding="utf-8")
+        paths.append(path)
+    return paths
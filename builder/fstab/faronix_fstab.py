@@ -4,9 +4,10 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] ))
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / '_bin'))
 
 import subprocess
-from jinja2 import Environment, FileSystemLoader
+from faronix_templating import bundle_path, register_namespace, shared_env  # type: ignore
 import json
 
 from dotenv import load_dotenv # type: ignore
@@ -50,12 +51,13 @@ if not service_manifest.exists():
         manifest = json.load(f)
 
 # === Setup Jinja2 ===
-env = Environment(loader=FileSystemLoader(TPLGET))
+register_namespace("fstab", [TPLGET], bundle=bundle_path(TPLGET, "fstab"))
+env = shared_env()  # templates are addressed as "fstab/<name>"
 
 # === Render Function ===
 def fstab_render(manifest_path: Path):
     data = json.loads(manifest_path.read_text())
-    tpl = env.get_template("fstab.tpl")
+    tpl = env.get_template("fstab/fstab.tpl")
     output = tpl.render(mounts=data.get("mounts", []))
 
     out_file = Path("/etc/fstab") if Path("/etc/faronix.prod").exists() else SYSCONF / "fstab.conf"
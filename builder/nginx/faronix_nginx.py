@@ -5,10 +5,11 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] ))
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / '_bin'))
 
 import subprocess
 
-from jinja2 import Environment, FileSystemLoader
+from faronix_templating import bundle_path, register_namespace, shared_env  # type: ignore
 import json
 
 from dotenv import load_dotenv # type: ignore
@@ -53,7 +54,8 @@ if not service_manifest.exists():
 
 # === Setup Jinja2 ===
 
-env = Environment(loader=FileSystemLoader(str(TPLGET)))
+register_namespace("nginx", [TPLGET], bundle=bundle_path(TPLGET, "nginx"))
+env = shared_env()  # templates are addressed as "nginx/<name>"
 
 def nginx_generator(manifest_path: Path):
     data = json.loads(manifest_path.read_text(encoding="utf-8"))
@@ -65,7 +67,7 @@ def nginx_generator(manifest_path: Path):
         template_type = str("django")
         domain = data.get("server_name")
         tpl_name = f"{template_type}.tpl"
-        tpl = env.get_template(tpl_name)
+        tpl = env.get_template(f"nginx/{tpl_name}")
     
         nameconf = Path(f"/etc/nginx/sites-available/{domain}.conf")
         site = data.get("sites", {})
@@ -1,10 +1,11 @@
 import os
+import sys
 from pathlib import Path
 import json
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / '_bin'))
 
-from jinja2 import Environment, FileSystemLoader
 # env = Environment(loader=FileSystemLoader( Path(__file__).resolve().parent / ".env" ))
 
 # IS_PRODUCTION = Path("/etc/faronix.prod").exists()
@@ -19,10 +20,11 @@ import json
 import argparse
 from pathlib import Path
 import subprocess
-from jinja2 import Environment, FileSystemLoader
+from faronix_templating import bundle_path, register_namespace, shared_env  # type: ignore
 
 TEMPLATE_DIR = Path(__file__).parent / "tpl"
-TEMPLATE_ENV = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+register_namespace("systemd", [TEMPLATE_DIR], bundle=bundle_path(TEMPLATE_DIR, "systemd"))
+TEMPLATE_ENV = shared_env()  # templates are addressed as "systemd/<name>"
 
 DEFAULT_OUTPUT = Path("sysconf")
 
@@ -31,7 +33,7 @@ def load_manifest(path: Path) -> dict:
         return json.load(f)
 
 def render(template_name: str, context: dict) -> str:
-    template = TEMPLATE_ENV.get_template(template_name)
+    template = TEMPLATE_ENV.get_template(f"systemd/{template_name}")
     return template.render(context)
 
 def write_unit(name: str, content: str, output_dir: Path):
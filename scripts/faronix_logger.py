@@ -1,22 +1,64 @@
 # _script/faronix_logger.py
 
+import atexit
 import logging
 import logging.handlers
+import os
+import queue
+import sys
+
+# Callers only enqueue: a QueueListener thread does the (possibly slow)
+# syslog / file writes. The queue is bounded; when it is full, records are
+# dropped and counted in dropped_records instead of blocking the caller.
+LOG_QUEUE_SIZE = int(os.getenv("FARONIX_LOG_QUEUE", "10000"))
+# Echo log() lines to stdout: on for a terminal, FARONIX_LOG_ECHO=0/1 overrides
+ECHO = os.getenv("FARONIX_LOG_ECHO", "1" if sys.stdout.isatty() else "0") == "1"
 
 logger = logging.getLogger("faronix")
 logger.setLevel(logging.INFO)
+dropped_records = 0
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    def enqueue(self, record):
+        global dropped_records
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_records += 1
+
 
 try:
     handler = logging.handlers.SysLogHandler(address="/dev/log")
     formatter = logging.Formatter("[faronix] %(message)s")
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    fallback_reason = None
 except Exception as e:
-    fallback = logging.FileHandler("/tmp/faronix.log")
-    fallback.setFormatter(logging.Formatter("[faronix:FALLBACK] %(message)s"))
-    logger.addHandler(fallback)
-    logger.error(f"⚠️ Could not bind to syslog. Logging to /tmp/faronix.log. Reason: {e}")
+    handler = logging.FileHandler("/tmp/faronix.log")
+    handler.setFormatter(logging.Formatter("[faronix:FALLBACK] %(message)s"))
+    fallback_reason = e
+
+_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+logger.addHandler(_DroppingQueueHandler(_queue))
+listener = logging.handlers.QueueListener(_queue, handler, respect_handler_level=True)
+listener.start()
+
+
+def _shutdown():
+    listener.stop()  # drains the queue
+    if dropped_records:
+        handler.handle(logger.makeRecord(
+            logger.name, logging.WARNING, __file__, 0,
+            f"⚠️ {dropped_records} log record(s) dropped: log queue full", None, None,
+        ))
+
+
+atexit.register(_shutdown)
+
+if fallback_reason is not None:
+    logger.error(f"⚠️ Could not bind to syslog. Logging to /tmp/faronix.log. Reason: {fallback_reason}")
 
 def log(msg, level="INFO"):
     logger.log(getattr(logging, level), msg)
-    print(f"[faronix:{level}] {msg}")
\ No newline at end of file
+    if ECHO:
+        print(f"[faronix:{level}] {msg}")
@@ -0,0 +1,122 @@
+# tests/conftest.py
+# _bin is deployed as app/builder/ and its modules import each other as
+# top-level modules; put it on sys.path the same way the builder runs them.
+import json
+import os
+import shutil
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "_bin"))
+
+TEMPLATES = {
+    "rows.html": "<ul>{% for u in users %}<li>{{ u }}</li>{% endfor %}</ul>{% include 'cell.html' %}",
+    "cell.html": "<i>{{ users|length }}</i>",
+}
+
+
+@pytest.fixture(scope="session")
+def core_app(tmp_path_factory):
+    """_filecopy/handler_core importable as "core", the app name it is deployed under."""
+    site = tmp_path_factory.mktemp("site")
+    (site / "core").symlink_to(ROOT / "_filecopy" / "handler_core", target_is_directory=True)
+    sys.path.insert(0, str(site))
+    return site
+
+
+@pytest.fixture(scope="session")
+def django_app(core_app):
+    """Minimal configured Django (sqlite file DB, locmem cache and templates); urlpatterns to extend."""
+    django = pytest.importorskip("django")
+    from django.conf import settings
+    from django.core.management import call_command
+
+    urls = types.ModuleType("tests_urls")
+    urls.urlpatterns = []
+    sys.modules[urls.__name__] = urls
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY="tests",
+        ALLOWED_HOSTS=["*"],
+        ROOT_URLCONF=urls.__name__,
+        INSTALLED_APPS=["django.contrib.contenttypes", "django.contrib.auth"],
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": str(core_app / "db.sqlite3")}},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        TEMPLATES=[
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "OPTIONS": {"loaders": [("django.template.loaders.locmem.Loader", TEMPLATES)]},
+            }
+        ],
+    )
+    django.setup()
+    call_command("migrate", verbosity=0)
+    return urls
+
+
+YOFARON_CONFIG = """\
+from pathlib import Path
+ROOT = Path({root!r}); PROJECT_ROOT = ROOT; BASE_DIR = ROOT
+BUILDER_DIR = ROOT / "builder"; CONFIG_DIR = ROOT / "config"; JSON_DIR = ROOT / "builder/json"
+TPL_PY_DIR = ROOT / "builder/tpl/tpl_py"; TPL_HTML_DIR = ROOT / "builder/tpl/tpl_html"
+OUTPUT_DIR = ROOT / "core"; VIEW_PATH = OUTPUT_DIR / "views"; FORM_PATH = OUTPUT_DIR / "forms"
+MODEL_PATH = OUTPUT_DIR / "models"; URLS_PATH = OUTPUT_DIR / "urls"; UTILS_PATH = OUTPUT_DIR / "utils"
+TEMPLATE_PATH = ROOT / "templates"; TEMPLATE_PARTIALS_PATH = TEMPLATE_PATH / "partials"
+REGISTRY = ROOT / "builder/_in_service.json"; DEFAULT_SOT = JSON_DIR / "yofaron_scaffolded.json"
+ROLE_RANK = {{"guest": 0, "staff": 40, "admin": 80, "superadmin": 100}}
+MODEL_TYPE_MAP = {{"text": "CharField", "int": "IntegerField"}}
+DEFAULT_CONFIG = {{"app_label": "core", "view_name": "Default", "tabs": []}}
+"""
+
+
+class GeneratorProject:
+    """A deployed-layout app (app/builder = _bin + tpl + yofaron_config) to run the generator in."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.builder = root / "builder"
+        self.partials = root / "templates" / "partials"
+        self.env = {**os.environ, "FARONIX_JINJA_CACHE": str(root / ".jinja-cache")}
+        for d in ("builder/json", "config", "core/views", "core/urls", "core/forms", "core/models", "templates/partials"):
+            (root / d).mkdir(parents=True, exist_ok=True)
+        for src in (ROOT / "_bin").glob("*.py"):
+            shutil.copy2(src, self.builder / src.name)
+        for name in ("tpl_py", "tpl_html"):
+            shutil.copytree(ROOT / "tpl" / name, self.builder / "tpl" / name)
+        (self.builder / "yofaron_config.py").write_text(YOFARON_CONFIG.format(root=str(root)))
+        # the generated view includes this; it is not part of tpl_html
+        self.template("view_content_partial.tpl.html", "<div>{{ view_name }}</div>\n")
+        # the stock form template needs a full form context; a tab slug is enough here
+        self.template("panels/FormTemplate.tpl.html", "<form>{{ tab.slug }}</form>\n")
+        shutil.copy2(ROOT / "json" / "django_json" / "homepanel.json", self.builder / "json")
+
+    def template(self, name: str, source: str) -> None:
+        path = self.builder / "tpl" / "tpl_html" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+
+    def spec(self, name: str = "homepanel.json") -> dict:
+        return json.loads((self.builder / "json" / name).read_text())
+
+    def write_spec(self, spec: dict, name: str = "homepanel.json") -> None:
+        (self.builder / "json" / name).write_text(json.dumps(spec, indent=2))
+
+    def generate(self, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+        proc = subprocess.run(
+            [sys.executable, "builder/faronix_generator.py", *args],
+            cwd=self.root, env=self.env, capture_output=True, text=True,
+        )
+        if check:
+            assert proc.returncode == 0, proc.stdout + proc.stderr
+        return proc
+
+
+@pytest.fixture
+def generator_project(tmp_path):
+    pytest.importorskip("jinja2")
+    return GeneratorProject(tmp_path / "app")
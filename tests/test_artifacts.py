@@ -0,0 +1,48 @@
+import stat
+
+from faronix_artifacts import ArtifactStore, link_into_place
+from faronix_minify import MinifyStats, minify_file
+
+
+def mode(path):
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+def test_objects_are_stored_once_and_read_only(tmp_path):
+    store = ArtifactStore(tmp_path / "_artifacts")
+    digest, obj = store.put("<div>a</div>\n")
+    assert store.put("<div>a</div>\n") == (digest, obj)
+    assert obj.read_text() == "<div>a</div>\n"
+    assert mode(obj) == 0o444
+
+
+def test_older_writable_objects_are_made_read_only(tmp_path):
+    store = ArtifactStore(tmp_path / "_artifacts")
+    _, obj = store.put("x")
+    obj.chmod(0o644)
+    store.put("x")
+    assert mode(obj) == 0o444
+
+
+def test_minify_file_does_not_write_through_the_link(tmp_path):
+    store = ArtifactStore(tmp_path / "_artifacts")
+    source = "<ul>\n    <li>a</li>\n</ul>\n"
+    _, obj = store.put(source)
+    partial = tmp_path / "templates" / "partials" / "home_nav.html"
+    link_into_place(obj, partial)
+
+    assert minify_file(partial, MinifyStats())
+    assert partial.read_text() == "<ul><li>a</li></ul>"
+    assert obj.read_text() == source  # the stored version is untouched
+    assert not list(partial.parent.glob(".*.tmp"))
+
+
+def test_rollback_relinks_the_previous_version(tmp_path):
+    store = ArtifactStore(tmp_path / "_artifacts")
+    partial = tmp_path / "home_nav.html"
+    for content in ("v1", "v2"):
+        digest, obj = store.put(content)
+        link_into_place(obj, partial)
+        store.record(str(partial), digest)
+    store.rollback("home_nav.html")
+    assert partial.read_text() == "v1"
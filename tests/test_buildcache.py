@@ -0,0 +1,112 @@
+from jinja2 import DictLoader, Environment
+
+from faronix_buildcache import BuildCache, digest
+
+
+def make_env(templates, **globals_):
+    env = Environment(loader=DictLoader(templates))
+    env.globals.update(globals_)
+    return env
+
+
+def render_all(cache, out, template="page.tpl", context=None):
+    """One render_to_file()-style check; writes the output when stale."""
+    _, reasons = cache.check(template, context or {"a": 1}, out)
+    if reasons and not cache.plan:
+        out.write_text("rendered")
+    return reasons
+
+
+def rerun(tmp_path, templates, *, version="1", plan=False, force=False, **globals_):
+    return BuildCache(tmp_path / "cache.json", make_env(templates, **globals_), version, plan=plan, force=force)
+
+
+TEMPLATES = {"page.tpl": "{% include 'part.tpl' %}{{ a }}", "part.tpl": "x"}
+
+
+def test_digest_is_stable():
+    assert digest({"b": 1, "a": {2, 1}}) == digest({"a": {1, 2}, "b": 1})
+    assert digest({"a": object()}) == digest({"a": object()})  # by type, not address
+
+
+def test_unchanged_inputs_are_fresh(tmp_path):
+    out = tmp_path / "out.html"
+    first = rerun(tmp_path, TEMPLATES)
+    assert render_all(first, out) == ["new output"]
+    first.save()
+    second = rerun(tmp_path, TEMPLATES)
+    assert render_all(second, out) == []
+    assert second.fresh == [out]
+
+
+def test_each_input_is_part_of_the_fingerprint(tmp_path):
+    out = tmp_path / "out.html"
+    cache = rerun(tmp_path, TEMPLATES, SITE="a")
+    render_all(cache, out)
+    cache.save()
+
+    def reasons(**kw):
+        templates = kw.pop("templates", TEMPLATES)
+        context = kw.pop("context", None)
+        return render_all(rerun(tmp_path, templates, plan=True, **{"SITE": "a", **kw}), out, context=context)
+
+    assert reasons(templates={**TEMPLATES, "part.tpl": "y"}) == ["template changed: part.tpl"]
+    assert reasons(context={"a": 2}) == ["context changed"]
+    assert reasons(SITE="b") == ["env.globals changed"]
+    assert reasons(lower="ignored") == []  # only UPPERCASE globals come from yofaron_config
+    assert reasons(version="2") == ["generator version 1 → 2"]
+    out.unlink()
+    assert reasons() == ["output missing"]
+
+
+def test_dynamic_include_is_always_stale(tmp_path):
+    out = tmp_path / "out.html"
+    templates = {"page.tpl": "{% include name %}"}
+    cache = rerun(tmp_path, templates)
+    render_all(cache, out)
+    cache.save()
+    assert render_all(rerun(tmp_path, templates), out) == ["dynamic include"]
+
+
+def test_plan_and_force(tmp_path, capsys):
+    out = tmp_path / "out.html"
+    plan = rerun(tmp_path, TEMPLATES, plan=True)
+    assert render_all(plan, out) == ["new output"]
+    plan.save()
+    assert not (tmp_path / "cache.json").exists() and not out.exists()  # --plan changes nothing
+    plan.report()
+    assert "1 stale, 0 fresh" in capsys.readouterr().out
+
+    cache = rerun(tmp_path, TEMPLATES)
+    render_all(cache, out)
+    cache.save()
+    assert render_all(rerun(tmp_path, TEMPLATES, force=True), out) == ["forced"]
+
+
+def test_second_render_of_one_output_in_a_run(tmp_path):
+    out = tmp_path / "out.html"
+    cache = rerun(tmp_path, TEMPLATES)
+    render_all(cache, out)
+    render_all(cache, out, template="part.tpl")
+    cache.save()
+    again = rerun(tmp_path, {**TEMPLATES, "page.tpl": "changed"})
+    assert render_all(again, out) == ["template changed: page.tpl"]
+    assert render_all(again, out, template="part.tpl") == ["rewritten earlier in run"]
+
+
+def test_generator_plan_lists_stale_outputs_without_writing(generator_project):
+    generator_project.generate("homepanel.json")
+    partial = generator_project.partials / "homepanel_partial.html"
+    before = partial.read_text(), partial.stat().st_mtime_ns
+
+    fresh = generator_project.generate("homepanel.json", "--plan")
+    assert "Build plan: 0 stale" in fresh.stdout
+
+    generator_project.template("view_content_partial.tpl.html", "<main>{{ view_name }}</main>\n")
+    stale = generator_project.generate("homepanel.json", "--plan")
+    assert "Build plan: 1 stale" in stale.stdout
+    assert f"{partial}: template changed: view_content_partial.tpl.html" in stale.stdout
+    assert (partial.read_text(), partial.stat().st_mtime_ns) == before
+
+    generator_project.generate("homepanel.json")
+    assert partial.read_text() == "<main>HomePanel</main>"
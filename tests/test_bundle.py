@@ -0,0 +1,87 @@
+import hashlib
+import shutil
+import subprocess
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from faronix_bundle import DEPLOYED_MANIFEST, build_bundle
+
+pytestmark = pytest.mark.skipif(shutil.which("sha256sum") is None, reason="apply.sh needs sha256sum")
+
+
+def manifest(root: Path, rels: list[str]) -> dict:
+    outputs = {}
+    for rel in rels:
+        data = (root / rel).read_bytes()
+        outputs[rel] = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data), "spec": None}
+    return {"schema": 1, "root": str(root), "outputs": outputs}
+
+
+def apply(bundle: Path, workdir: Path, target: Path, *, drop_files_dir=False) -> str:
+    with tarfile.open(bundle) as tar:
+        tar.extractall(workdir)
+    if drop_files_dir:
+        shutil.rmtree(workdir / "files")
+    proc = subprocess.run(["sh", str(workdir / "apply.sh"), str(target)], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "build"
+    (root / "core" / "views").mkdir(parents=True)
+    (root / "core" / "views" / "home.py").write_text("home = 1\n")
+    (root / "core" / "views" / "old.py").write_text("old = 1\n")
+    deployed = tmp_path / "srv"
+    shutil.copytree(root, deployed)
+    since = manifest(root, ["core/views/home.py", "core/views/old.py"])
+    return root, deployed, since
+
+
+def test_delta_bundle_applies_changes_and_deletions(tmp_path, project):
+    root, deployed, since = project
+    (root / "core" / "views" / "home.py").write_text("home = 2\n")
+    (root / "core" / "views" / "old.py").unlink()
+    (root / "templates").mkdir()
+    (root / "templates" / "home.html").write_text("<p>home</p>\n")
+    current = manifest(root, ["core/views/home.py", "templates/home.html"])
+
+    result = build_bundle(current, since, tmp_path / "delta.tar.gz")
+    assert result["files"] == ["core/views/home.py", "templates/home.html"]
+    assert result["deleted"] == ["core/views/old.py"]
+
+    out = apply(tmp_path / "delta.tar.gz", tmp_path / "x", deployed)
+    assert "applied 2 file(s), removed 1" in out
+    assert (deployed / "core" / "views" / "home.py").read_text() == "home = 2\n"
+    assert (deployed / "templates" / "home.html").read_text() == "<p>home</p>\n"
+    assert not (deployed / "core" / "views" / "old.py").exists()
+    assert (deployed / DEPLOYED_MANIFEST).exists()
+    assert not list(deployed.rglob("*.faronix-new"))
+
+
+def test_delete_only_bundle(tmp_path, project):
+    root, deployed, since = project
+    (root / "core" / "views" / "old.py").unlink()
+    current = manifest(root, ["core/views/home.py"])
+
+    result = build_bundle(current, since, tmp_path / "delta.tar.gz")
+    assert result["files"] == [] and result["deleted"] == ["core/views/old.py"]
+    with tarfile.open(tmp_path / "delta.tar.gz") as tar:
+        assert tar.getmember("files").isdir()
+
+    out = apply(tmp_path / "delta.tar.gz", tmp_path / "x", deployed)
+    assert "applied 0 file(s), removed 1" in out
+    assert not (deployed / "core" / "views" / "old.py").exists()
+    assert (deployed / "core" / "views" / "home.py").read_text() == "home = 1\n"
+
+
+def test_apply_without_files_dir(tmp_path, project):
+    root, deployed, since = project
+    (root / "core" / "views" / "old.py").unlink()
+    build_bundle(manifest(root, ["core/views/home.py"]), since, tmp_path / "delta.tar.gz")
+
+    apply(tmp_path / "delta.tar.gz", tmp_path / "x", deployed, drop_files_dir=True)
+    assert not (deployed / "core" / "views" / "old.py").exists()
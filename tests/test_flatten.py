@@ -0,0 +1,66 @@
+from faronix_flatten import flatten
+
+SOURCES = {
+    "tpl/forms/TextField.tpl.html": "{% load i18n %}\n<input name=\"{{ name }}\">",
+    "tpl/forms/Group.tpl.html": "<div>{% include \"tpl/forms/TextField.tpl.html\" %}</div>",
+    "tpl/layout/Base.tpl.html": "{% block body %}{% endblock %}",
+    "tpl/loop/A.tpl.html": "{% include \"tpl/loop/A.tpl.html\" %}",
+}
+
+
+def test_static_include_is_inlined_with_its_arguments():
+    result = flatten('<form>{% include "tpl/forms/TextField.tpl.html" with name=n %}</form>', SOURCES.get)
+    assert result.text == '{% load i18n %}\n<form>{% with name=n %}<input name="{{ name }}">{% endwith %}</form>'
+    assert result.inlined == ["tpl/forms/TextField.tpl.html"]
+
+
+def test_nested_includes_are_inlined():
+    result = flatten('{% include "tpl/forms/Group.tpl.html" %}', SOURCES.get)
+    assert "include" not in result.text
+    assert '<div><input name="{{ name }}"></div>' in result.text
+    assert sorted(result.inlined) == ["tpl/forms/Group.tpl.html", "tpl/forms/TextField.tpl.html"]
+
+
+def test_includes_that_would_change_meaning_are_kept():
+    for tag in (
+        '{% include "tpl/forms/TextField.tpl.html" only %}',
+        '{% include "tpl/layout/Base.tpl.html" %}',
+        "{% include tab.template %}",
+        '{% include "tpl/unknown.tpl.html" %}',
+    ):
+        result = flatten(tag, SOURCES.get)
+        assert result.text == tag, tag
+        assert result.skipped and not result.inlined
+
+
+def test_recursive_include_stops():
+    result = flatten('{% include "tpl/loop/A.tpl.html" %}', SOURCES.get)
+    assert "include" in result.text
+    assert result.skipped
+
+
+def test_verbatim_and_comment_bodies_are_untouched():
+    src = '{% verbatim %}{% include "tpl/forms/TextField.tpl.html" %}{% endverbatim %}'
+    assert flatten(src, SOURCES.get).text == src
+    src = '{% comment %}{% include "tpl/forms/TextField.tpl.html" %}{% endcomment %}'
+    assert flatten(src, SOURCES.get).text == src
+
+
+def test_generator_flattens_before_staging(generator_project):
+    # the stored artifact itself is flattened: nothing rewrites the partial after commit
+    generator_project.template(
+        "panels/FormTemplate.tpl.html",
+        '<form>{{ tab.slug }}{% raw %}{% include "tpl/display/Card.tpl.html" with title="x" %}{% endraw %}</form>\n',
+    )
+    proc = generator_project.generate("homepanel.json", "--flatten")
+    assert "Inlined 1 include(s) into main_form.html" in proc.stdout
+    partial = generator_project.partials / "main_form.html"
+    text = partial.read_text()
+    assert "{% include" not in text and '{% with title="x" %}' in text
+    objects = list((generator_project.builder / "_artifacts" / "objects").glob("*/*.html"))
+    assert any(obj.samefile(partial) for obj in objects)
+
+    # unchanged inputs: the flattened output is cached, not redone
+    again = generator_project.generate("homepanel.json", "--flatten")
+    assert "Inlined" not in again.stdout
+    assert partial.read_text() == text
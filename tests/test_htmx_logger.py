@@ -0,0 +1,106 @@
+import json
+import logging
+
+import pytest
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def htmx_records(django_app):
+    handler = ListHandler()
+    logger = logging.getLogger("htmx")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+def hx_get(path="/t/"):
+    from django.test import RequestFactory
+
+    return RequestFactory().get(path, headers={"HX-Request": "true", "X-Tab": "main"})
+
+
+def test_message_is_json_without_the_queue(htmx_records):
+    from django.http import HttpResponse
+    from django.test import override_settings
+
+    from core.utils.middleware import HTMXRequestLogger
+
+    with override_settings(HTMX_SERVER_LOG=True):
+        mw = HTMXRequestLogger(lambda request: HttpResponse("ok"))
+        mw(hx_get())
+    assert not mw.queued
+    (record,) = htmx_records
+    message = json.loads(record.getMessage())
+    assert message["path"] == "/t/" and message["x_tab"] == "main"
+    assert record.payload == message
+
+
+def view_work():
+    from django.contrib.auth.models import User
+    from django.template.loader import render_to_string
+
+    list(User.objects.all())
+    User.objects.count()
+    return render_to_string("rows.html", {"users": ["a", "b"]})
+
+
+def test_queries_and_render_time_are_accounted(htmx_records):
+    from django.contrib.auth.models import User
+    from django.http import HttpResponse
+    from django.test import override_settings
+
+    from core.utils.middleware import HTMXRequestLogger
+
+    with override_settings(HTMX_SERVER_LOG=True, HTMX_SERVER_TIMING=True):
+        mw = HTMXRequestLogger(lambda request: HttpResponse(view_work()))
+        response = mw(hx_get())
+        User.objects.count()  # outside a tracked request: not counted anywhere
+    payload = htmx_records[-1].payload
+    assert payload["db_queries"] == 2
+    assert 0 < payload["render_ms"] <= payload["ms"]  # the include is not counted twice
+    assert payload["db_ms"] >= 0
+    assert payload["bytes"] == len(response.content)
+    assert response["Server-Timing"].startswith('db;desc="2 queries"')
+
+
+def test_untracked_requests_are_not_logged(htmx_records):
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from core.utils.middleware import HTMXRequestLogger
+
+    with override_settings(HTMX_SERVER_LOG=True):
+        HTMXRequestLogger(lambda request: HttpResponse("ok"))(RequestFactory().get("/t/"))
+    assert htmx_records == []
+
+
+def test_async_requests_are_accounted(htmx_records):
+    import asyncio
+
+    from asgiref.sync import sync_to_async
+    from django.http import HttpResponse
+    from django.test import AsyncRequestFactory, override_settings
+
+    from core.utils.middleware import HTMXRequestLogger
+
+    async def view(request):
+        # sync ORM and template work in a worker thread, as async views do
+        return HttpResponse(await sync_to_async(view_work)())
+
+    request = AsyncRequestFactory().get("/t/", headers={"HX-Request": "true"})
+    with override_settings(HTMX_SERVER_LOG=True):
+        mw = HTMXRequestLogger(view)
+        assert mw.async_mode
+        asyncio.run(mw(request))
+    payload = htmx_records[-1].payload
+    assert payload["db_queries"] == 2 and payload["render_ms"] > 0
@@ -0,0 +1,54 @@
+import io
+import json
+
+import pytest
+
+from faronix_jsonc import JSONCError, load, loads
+
+DOCS = [
+    # (jsonc, expected)
+    ('{"a": 1}', {"a": 1}),
+    ('{"url": "https://example.com/x"} // trailing', {"url": "https://example.com/x"}),
+    ('{"a": "/* not a comment */", "b": "// nor this"}', {"a": "/* not a comment */", "b": "// nor this"}),
+    ('{"q": "say \\"hi\\" // still a string", "n": 2}', {"q": 'say "hi" // still a string', "n": 2}),
+    ('{"p": "C:\\\\dir\\\\", /* after an escaped backslash */ "n": 1}', {"p": "C:\\dir\\", "n": 1}),
+    ('[1, 2, 3,]', [1, 2, 3]),
+    ('{"a": [1, 2,\n  ],\n "b": {"c": 3,},\n}', {"a": [1, 2], "b": {"c": 3}}),
+    ('{"a": 1, // comment\n /* block\n comment */ }', {"a": 1}),
+    ('[1, /* a */ 2, // b\n 3 /* c */, ]', [1, 2, 3]),
+    ('{"a": "x,", "b": "]"}', {"a": "x,", "b": "]"}),
+    ('{"s": "a/b", "t": "/", "u": "*/"}', {"s": "a/b", "t": "/", "u": "*/"}),
+    ('// header\n/* and\n   more */\n{"k": [ "v" , ] }\n', {"k": ["v"]}),
+]
+
+
+@pytest.mark.parametrize("doc,expected", DOCS)
+def test_loads(doc, expected):
+    assert loads(doc) == expected
+
+
+@pytest.mark.parametrize("doc,expected", DOCS)
+def test_every_chunk_boundary(doc, expected):
+    # a boundary may fall inside any string, comment, escape or trailing comma
+    for size in range(1, len(doc) + 1):
+        assert load(io.StringIO(doc), chunk_size=size) == expected, size
+
+
+def test_plain_json_is_decoded_unchanged():
+    doc = json.dumps({"a": [1, {"b": "c // d"}]})
+    assert loads(doc) == json.loads(doc)
+
+
+def test_errors_point_into_the_original_file():
+    doc = '{\n  // comment\n  "a": 1,\n  "b": ]\n}'
+    for size in (3, 7, 1 << 20):
+        with pytest.raises(JSONCError) as exc:
+            load(io.StringIO(doc), source="spec.jsonc", chunk_size=size)
+        assert (exc.value.lineno, exc.value.colno) == (4, 8)
+        assert exc.value.source == "spec.jsonc"
+
+
+def test_unterminated_block_comment():
+    for size in (2, 5, 1 << 20):
+        with pytest.raises(JSONCError, match="Unterminated block comment"):
+            load(io.StringIO('{"a": 1 /* open'), chunk_size=size)
@@ -0,0 +1,77 @@
+import json
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def logqueue(core_app):
+    from core.utils import logqueue
+
+    return logqueue
+
+
+@pytest.fixture
+def shipped(logqueue, tmp_path, request):
+    """install() on a logger of its own; stopped and removed afterwards."""
+    name = f"tests.{request.node.name}"
+    yield name, tmp_path / "log.jsonl"
+    shipper = logqueue._shippers.pop(name, None)
+    if shipper is not None:
+        shipper.stop()
+        logging.getLogger(name).removeHandler(shipper.handler)
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_payloads_are_written_as_jsonl(logqueue, shipped):
+    name, path = shipped
+    shipper = logqueue.install(name, path, flush_interval=0.05)
+    logger = logging.getLogger(name)
+    logger.info("GET /x 200", extra={"payload": {"path": "/x", "status": 200}, "status": 200, "ms": 3.0})
+    logger.warning("plain %s", "message")
+    shipper.stop()
+    lines = read_lines(path)
+    assert lines[0] == {"path": "/x", "status": 200}
+    assert lines[1]["msg"] == "plain message" and lines[1]["level"] == "WARNING"
+
+
+def test_install_stops_propagation(logqueue, shipped, caplog):
+    name, path = shipped
+    assert logqueue.install(name, path) is logqueue.install(name, path)
+    logger = logging.getLogger(name)
+    assert logger.propagate is False
+    with caplog.at_level(logging.INFO):
+        logger.info("queued only")
+    assert "queued only" not in caplog.text
+
+
+def test_sampling_keeps_errors_and_slow_requests(logqueue):
+    sampler = logqueue.SamplingFilter(sample_rate=0.0, slow_ms=100)
+
+    def record(status, ms):
+        r = logging.LogRecord("t", logging.INFO, __file__, 1, "m", None, None)
+        r.status, r.ms = status, ms
+        return r
+
+    assert not sampler.filter(record(200, 5))
+    assert sampler.filter(record(500, 5))
+    assert sampler.filter(record(200, 250))
+    assert sampler.sampled_out == 1
+
+
+def test_full_queue_drops_instead_of_blocking(logqueue):
+    import queue
+
+    handler = logqueue.DroppingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("tests.dropping")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for _ in range(3):
+            logger.warning("x")
+    finally:
+        logger.removeHandler(handler)
+    assert handler.dropped == 2
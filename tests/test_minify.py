@@ -0,0 +1,47 @@
+import shutil
+
+from faronix_minify import MinifyStats, copy_minified, minify_html
+
+
+def test_whitespace_around_block_tags_is_dropped():
+    assert minify_html("<div>\n  <p>a</p>\n</div>\n") == "<div><p>a</p></div>"
+
+
+def test_inline_whitespace_collapses_but_stays():
+    assert minify_html("<span>a</span>   <b>b</b>") == "<span>a</span> <b>b</b>"
+    assert minify_html("<span>a</span>\n\n   <b>b</b>") == "<span>a</span>\n<b>b</b>"
+
+
+def test_comments():
+    assert minify_html("<p>a</p><!-- note --><p>b</p>") == "<p>a</p><p>b</p>"
+    kept = "<!--[if IE]><p>old</p><![endif]-->"
+    assert minify_html(kept) == kept
+    assert "{% if x %}" in minify_html("<!-- {% if x %}y{% endif %} -->")
+
+
+def test_protected_content_is_untouched():
+    for block in (
+        "<pre>  a\n    b</pre>",
+        "<textarea>  x  </textarea>",
+        "<script>if (a  &&  b) {\n  go();\n}</script>",
+        "<style>p  {  color: red; }</style>",
+        "{% verbatim %}  {{ a }}  {% endverbatim %}",
+    ):
+        assert block in minify_html(f"<div>\n  {block}\n</div>")
+
+
+def test_django_tags_and_attribute_values_are_untouched():
+    src = '<a   href="{% url \'x\' %}"   title="a  b">{{  name  }}</a>'
+    assert minify_html(src) == '<a href="{% url \'x\' %}" title="a  b">{{  name  }}</a>'
+
+
+def test_copytree_minifies_html_while_copying(tmp_path):
+    src, dst = tmp_path / "handler_base", tmp_path / "templates"
+    (src / "base").mkdir(parents=True)
+    (src / "base" / "page.html").write_text("<div>\n  <p>a</p>\n</div>\n")
+    (src / "base" / "app.css").write_text("p  {  }\n")
+    stats = MinifyStats()
+    shutil.copytree(src, dst, copy_function=lambda s, d: copy_minified(s, d, stats=stats))
+    assert (dst / "base" / "page.html").read_text() == "<div><p>a</p></div>"
+    assert (dst / "base" / "app.css").read_text() == "p  {  }\n"  # not HTML: copied as is
+    assert stats.files == 1 and stats.after < stats.before
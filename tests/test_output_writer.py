@@ -0,0 +1,127 @@
+import json
+from pathlib import Path
+
+from faronix_output import OutputWriter
+
+
+def tmp_files(directory: Path) -> list[str]:
+    return sorted(p.name for p in directory.rglob("*.tmp"))
+
+
+def test_commit_moves_staged_files_into_place(tmp_path):
+    out = tmp_path / "views" / "page.py"
+    writer = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    assert writer.write(out, "a = 1\n", spec="page.json")
+    assert not out.exists()  # staged only
+    assert writer.commit() == 1
+    assert out.read_text() == "a = 1\n"
+    assert tmp_files(tmp_path) == []
+    assert writer.produced()[str(out.resolve())]["spec"] == "page.json"
+
+
+def test_unchanged_output_is_not_restaged(tmp_path):
+    out = tmp_path / "page.py"
+    OutputWriter(tmp_path / "manifest.json", fsync=False).write(out, "x\n")
+    first = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    first.write(out, "x\n")
+    first.commit()
+    again = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    assert not again.write(out, "x\n")
+    assert again.unchanged == 1
+    assert again.commit() == 0
+
+
+def test_abort_leaves_previous_outputs(tmp_path):
+    out = tmp_path / "page.py"
+    out.write_text("old\n")
+    writer = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    writer.write(out, "new\n")
+    assert writer.abort() == 1
+    assert out.read_text() == "old\n"
+    assert tmp_files(tmp_path) == []
+
+
+def test_restaging_a_target_keeps_one_temp_file(tmp_path):
+    out = tmp_path / "page.py"
+    writer = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    writer.write(out, "one\n")
+    writer.write(out, "two\n")
+    assert len(tmp_files(tmp_path)) == 1
+    writer.commit()
+    assert out.read_text() == "two\n"
+
+
+def test_merge_last_export_wins(tmp_path):
+    out = tmp_path / "page.py"
+    a = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    b = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    a.write(out, "from a\n", spec="a.json")
+    b.write(out, "from b\n", spec="b.json")
+    parent = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    assert parent.merge([a.export(), b.export()]) == [str(out.resolve())]
+    parent.commit()
+    assert out.read_text() == "from b\n"
+    assert tmp_files(tmp_path) == []
+
+
+def test_merge_specs_sharing_an_output_in_one_worker(tmp_path):
+    # two specs with the same tab slug both render partials/overview_form.html;
+    # one pool worker handles both, exporting after each spec
+    out = tmp_path / "partials" / "overview_form.html"
+    worker = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    worker.write(out, "<form>a</form>\n", spec="a.json")
+    first = worker.export()
+    worker.write(out, "<form>b</form>\n", spec="b.json")
+    second = worker.export()
+    assert first["pending"][str(out.resolve())]["tmp"] != second["pending"][str(out.resolve())]["tmp"]
+
+    parent = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    assert parent.merge([first, second]) == [str(out.resolve())]
+    assert parent.commit() == 1
+    assert out.read_text() == "<form>b</form>\n"
+    assert tmp_files(tmp_path) == []
+
+
+def test_merge_keeps_a_temp_file_exported_twice(tmp_path):
+    out = tmp_path / "page.py"
+    worker = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    worker.write(out, "x\n")
+    exp = worker.export()
+    parent = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    parent.merge([exp, {**exp, "unchanged": 0}])
+    assert parent.commit() == 1
+    assert out.read_text() == "x\n"
+
+
+def test_staged_returns_the_pending_content(tmp_path):
+    out = tmp_path / "static" / "sidebar.json"
+    writer = OutputWriter(tmp_path / "manifest.json", fsync=False)
+    assert writer.staged(out) is None
+    writer.write(out, '{"sidebar": []}')
+    assert writer.staged(out) == '{"sidebar": []}'
+    writer.abort()
+
+
+def test_generator_stages_sidebar_json_with_the_run(generator_project):
+    sidebar = generator_project.root / "static" / "sidebar.json"
+    sidebar.parent.mkdir()
+    sidebar.write_text("old")
+    # the sidebar partials render after sidebar.json is staged: failing there
+    # aborts the run and leaves the old file in place
+    side_menu = generator_project.builder / "tpl" / "tpl_html" / "panels" / "SideMenu.tpl.html"
+    original = side_menu.read_text()
+    generator_project.template("panels/SideMenu.tpl.html", "{{ missing() }}\n")
+    proc = generator_project.generate("homepanel.json", check=False)
+    assert proc.returncode != 0
+    assert sidebar.read_text() == "old"
+    assert not list(sidebar.parent.glob(".*.tmp"))
+
+    generator_project.template("panels/SideMenu.tpl.html", original)
+    generator_project.generate("homepanel.json")
+    assert json.loads(sidebar.read_text()) == {"sidebar": [], "tabbed": False}
+
+
+def test_build_manifest_lists_sidebar_json(generator_project):
+    generator_project.generate("homepanel.json")
+    manifest = json.loads((generator_project.builder / "_build_manifest.json").read_text())
+    assert "static/sidebar.json" in manifest["outputs"]
@@ -0,0 +1,73 @@
+import pytest
+
+
+@pytest.fixture
+def partial_cache(django_app):
+    from django.core.cache import cache
+
+    from core.utils import partial_cache
+
+    cache.clear()
+    return partial_cache
+
+
+def make_request(rank=0, pk=1):
+    from django.test import RequestFactory
+
+    request = RequestFactory().get("/t/", headers={"HX-Request": "true"})
+    request.user = type("User", (), {"rank": rank, "pk": pk})()
+    return request
+
+
+def key(partial_cache, request, vary=("rank",), sources=("page",)):
+    return partial_cache._key(request, "Page", "main", "rows.html", vary, sources, False)
+
+
+def test_event_sources(partial_cache):
+    assert partial_cache.event_sources("pageCreated, postDeleted") == {"page", "post"}
+    assert partial_cache.event_sources('{"pageUpdated": {}, "closeModal": null}') == {"page"}
+    assert partial_cache.event_sources("Updated") == set()
+    assert partial_cache.event_sources("") == set()
+
+
+def test_key_is_stable_and_varies(partial_cache):
+    request = make_request(rank=10)
+    k = key(partial_cache, request)
+    assert k == key(partial_cache, request)
+    assert k.startswith("partials:Page:")
+    assert key(partial_cache, make_request(rank=20)) != k  # vary by rank
+    assert key(partial_cache, make_request(rank=20), vary=()) == key(partial_cache, request, vary=())
+
+
+def test_invalidate_bumps_the_generation(partial_cache):
+    from django.core.cache import cache
+
+    request = make_request()
+    before = key(partial_cache, request)
+    partial_cache.invalidate("postUpdated")  # another source: no effect
+    assert key(partial_cache, request) == before
+    partial_cache.invalidate("pageUpdated")  # no generation yet: one is started
+    first = cache.get(partial_cache._gen_key("page"))
+    assert first is not None
+    bumped = key(partial_cache, request)
+    assert bumped != before
+    partial_cache.invalidate('{"pageDeleted": {}}')  # HX-Trigger JSON form
+    assert cache.get(partial_cache._gen_key("page")) == first + 1
+    assert key(partial_cache, request) not in (before, bumped)
+
+
+def test_cached_partial_hits_until_invalidated(partial_cache):
+    request = make_request()
+
+    def get(users):
+        return partial_cache.cached_partial(
+            request, "Page", "main", "rows.html", {"users": users}, ttl=60, invalidate_on=("page",)
+        )
+
+    first = get(["a"])
+    assert first["X-Partial-Cache"] == "miss" and b"<li>a</li>" in first.content
+    second = get(["b"])  # same key: served from the cache
+    assert second["X-Partial-Cache"] == "hit" and second.content == first.content
+    partial_cache.invalidate("pageCreated")
+    third = get(["b"])
+    assert third["X-Partial-Cache"] == "miss" and b"<li>b</li>" in third.content
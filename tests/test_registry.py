@@ -0,0 +1,17 @@
+import json
+import os
+
+
+def test_only_the_newest_wizard_snapshot_is_active(generator_project):
+    spec = generator_project.spec()
+    old = "yofaron_scaffolded_2025-01-01_00-00-00.json"
+    new = "yofaron_scaffolded_2025-02-01_00-00-00.json"
+    generator_project.write_spec({**spec, "view_title": "Old"}, old)
+    generator_project.write_spec({**spec, "view_title": "New"}, new)
+    os.utime(generator_project.builder / "json" / old, (1_000_000_000, 1_000_000_000))
+
+    generator_project.generate("--all", "--jobs", "1")
+    registry = json.loads((generator_project.builder / "_in_service.json").read_text())
+    active = {os.path.basename(e["path"]): e["active"] for e in registry["specs"]}
+    assert active[new] is True
+    assert active[old] is False
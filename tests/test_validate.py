@@ -0,0 +1,47 @@
+import faronix_validate
+from faronix_validate import compile_validator
+
+
+def index(*names):
+    return {"components": {"forms": list(names)}}
+
+
+def test_validator_is_reused_per_index_content():
+    first = compile_validator(index("card"))
+    assert compile_validator(index("card")) is first  # equal content, new object
+    assert compile_validator(index("card", "table")) is not first
+    assert compile_validator(index("card"), strict=True) is not first
+
+
+def test_compiled_validators_are_bounded():
+    for n in range(faronix_validate._COMPILED_MAX * 3):
+        compile_validator(index(f"comp{n}"))
+    assert len(faronix_validate._compiled) <= faronix_validate._COMPILED_MAX
+
+
+def test_mutated_index_is_recompiled():
+    idx = index("card")
+    before = compile_validator(idx)
+    idx["components"]["forms"].append("table")
+    after = compile_validator(idx)
+    assert after is not before
+    assert after.components == frozenset({"card", "table"})
+
+
+def cache_errors(cache):
+    spec = {"tabs": [{"slug": "main", "cache": cache}]}
+    return [e for e in compile_validator().check(spec) if "cache" in e]
+
+
+def test_tab_cache_directive():
+    assert cache_errors({"ttl": 60, "vary": ["rank", "lti"], "invalidate_on": ["page"]}) == []
+    assert cache_errors(False) == []  # explicitly uncached
+    assert cache_errors(True) == ["tab main: cache is not an object"]
+    assert cache_errors(60) == ["tab main: cache is not an object"]
+    assert cache_errors({"ttl": 0}) == ["tab main: cache.ttl must be a positive number of seconds"]
+
+
+def test_tab_cache_vary_items_are_type_checked():
+    # unhashable items used to raise TypeError from set(vary)
+    for vary in ([["rank"]], [{"rank": 1}], ["rank", 1], ["group"]):
+        assert cache_errors({"vary": vary}) == ["tab main: cache.vary must be a list of lti, rank, user"]
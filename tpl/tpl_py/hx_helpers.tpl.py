@@ -1,8 +1,11 @@
 # hx_helpers.tpl.py — AUTO-GENERATED: small HX utilities
 from django.http import HttpResponse
+from core.utils.partial_cache import invalidate
 
 
 def trigger(event: str, body: str = "") -> HttpResponse:
+    # <view>Created/Updated/Deleted also drops the tab partials cached from that view
+    invalidate(event)
     resp = HttpResponse(body)
     resp["HX-Trigger"] = event
     return resp
@@ -3,6 +3,9 @@ import importlib
 from django.shortcuts import render
 from django.http import HttpResponse, HttpResponseForbidden
 from django.views.generic import TemplateView
+{% if tab_cache %}
+from core.utils.partial_cache import cached_partial, invalidate
+{% endif %}
 
 {# convenience #}
 {% set single = (tabs|length == 1) %}
@@ -31,7 +34,15 @@ def {{ view_name|lower }}(request):
     # HTMX partial behavior (optional header "X-Partial": true)
     {% set tab_tpl = tabs[0].form_template %}
     if getattr(request, "htmx", False) and request.headers.get("X-Partial"):
+        {% if tab_cache %}
+        # cached per the spec's "cache" directive (see core.utils.partial_cache)
+        return cached_partial(
+            request, {{ view_name|lower|pyrepr }}, tab, "{{ tab_tpl }}",
+            {"tab": tab, "user": request.user}, **{{ tab_cache[default_tab]|pyrepr }},
+        )
+        {% else %}
         return render(request, "{{ tab_tpl }}", {"tab": tab, "user": request.user})
+        {% endif %}
 
     # Optional form handling for POST
     if request.method == "POST":
@@ -49,6 +60,9 @@ def {{ view_name|lower }}(request):
         form = form_cls(request.POST, request.FILES)
         if form.is_valid():
             obj = form.save() if hasattr(form, "save") else None
+            {% if tab_cache %}
+            invalidate("{{ view_name|lower }}Updated")
+            {% endif %}
             resp = render(request, "{{ tab_tpl }}", {"tab": tab, "user": request.user, "saved": True, "obj": obj})
             resp["HX-Trigger"] = '{"toast": {"message": "Saved!", "type": "success"}}'
             return resp
@@ -79,6 +93,10 @@ class {{ view_name }}(TemplateView):
     {% else %}
     PARTIALS_LTI = PARTIALS
     {% endif %}
+    {% if tab_cache %}
+    # per-tab partial cache options from the spec: ttl, vary, invalidate_on
+    CACHE = {{ tab_cache|pyrepr }}
+    {% endif %}
 
     def _tab(self):
         tab = (self.request.headers.get("X-Tab") or {{ default_tab|pyrepr }}).lower()
@@ -113,6 +131,14 @@ class {{ view_name }}(TemplateView):
 
         partials = self._partials()
         if getattr(request, "htmx", False) and request.headers.get("X-Partial"):
+            {% if tab_cache %}
+            if tab in self.CACHE:
+                is_lti = getattr(self, "is_lti", lambda: False)
+                return cached_partial(
+                    request, {{ view_name|lower|pyrepr }}, tab, partials[tab],
+                    {"tab": tab, "user": request.user}, is_lti=is_lti(), **self.CACHE[tab],
+                )
+            {% endif %}
             return render(request, partials[tab], {"tab": tab, "user": request.user})
         return super().get(request, *args, **kwargs)
 
@@ -129,6 +155,9 @@ class {{ view_name }}(TemplateView):
         form = form_cls(request.POST, request.FILES)
         if form.is_valid():
             obj = form.save() if hasattr(form, "save") else None
+            {% if tab_cache %}
+            invalidate("{{ view_name|lower }}Updated")
+            {% endif %}
             resp = render(request, partials[tab], {"tab": tab, "user": request.user, "saved": True, "obj": obj})
             resp["HX-Trigger"] = '{"toast": {"message": "Saved!", "type": "success"}}'
             return resp